@@ -26,6 +26,7 @@ These mathematical tools are provided::
     polyeval     -- fast evaluation of an n-dimensional polynomial
     poly1d       -- generate a 1d polynomial instance
     gridpts      -- generate a set of regularly spaced points
+    igridpts     -- iterate over a set of regularly spaced points
     samplepts    -- generate a set of randomly sampled points 
     almostEqual  -- test if equal within some absolute or relative tolerance
 
@@ -33,7 +34,7 @@ These mathematical tools are provided::
 """
 # functions and tools
 from poly import polyeval, poly1d
-from grid import gridpts, samplepts
+from grid import gridpts, igridpts, samplepts
 from approx import almostEqual
 
 
@@ -13,13 +13,36 @@ def gridpts(q):
 takes a list of lists of arbitrary length q = [[1,2],[3,4]]
 and produces a list of gridpoints g = [[1,3],[1,4],[2,3],[2,4]]
     """
-    w = [[] for i in range(len(q[-1]))]
-    for j in range(len(q)-1,-1,-1):
-      for k in range(len(q[j])):
-        for l in range(k*len(w)/len(q[j]), (k+1)*len(w)/len(q[j])):
-          w[l].append(q[j][k])
-      if j: w += [i[:] for i in w[:]*(len(q[j-1])-1)]
-    return [list(reversed(w[i])) for i in range(len(w))]
+    return list(igridpts(q))
+
+
+def igridpts(q, chunksize=None):
+    """
+takes a list of lists of arbitrary length q = [[1,2],[3,4]]
+and produces an iterator over the gridpoints [1,3], [1,4], [2,3], [2,4]
+
+Inputs:
+    q  --  a list of the points in each dimension
+    chunksize  --  if given, produce lists of (up to) chunksize gridpoints
+
+The gridpoints are generated in the same order as gridpts, but the grid is
+never built in full; each chunk of gridpoints is computed from its indices
+in the grid (as with numpy.unravel_index).
+    """
+    import numpy
+    q = [numpy.array(list(qi) + [None], dtype=object)[:-1] for qi in q]
+    shape = tuple(len(qi) for qi in q)
+    npts = reduce(lambda i,j: i*j, shape, 1) if shape else 0
+    size = chunksize or 1024
+    for start in xrange(0, npts, size):
+        index = numpy.arange(start, min(start + size, npts))
+        index = numpy.unravel_index(index, shape)
+        points = numpy.column_stack([qi[i] for (qi,i) in zip(q,index)])
+        if chunksize:
+            yield points.tolist()
+        else:
+            for point in points.tolist():
+                yield point
 
 
 def samplepts(lb,ub,npts):
@@ -9,4 +9,7 @@
 from klepto import lru_cache, lfu_cache, mru_cache
 from klepto import rr_cache, inf_cache, no_cache
 
+# archives for on-disk caching
+from klepto.archives import dict_archive, dir_archive, file_archive
+
 # end of file
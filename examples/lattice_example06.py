@@ -28,7 +28,7 @@ from mystic.models.poly import chebyshev8coeffs
 try:
     from pathos.multiprocessing import ProcessingPool as Pool
 except ImportError:
-    from mystic.python import PythonSerial as Pool
+    from mystic.multiprocess import ProcessPool as Pool
 
 # tools
 from mystic.termination import NormalizedChangeOverGeneration as NCOG
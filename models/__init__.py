@@ -26,6 +26,11 @@ functions are provided::
     wavy1      -- a simple sine-based multi-minima function
     wavy2      -- another simple sine-based multi-minima function
 
+Each function also accepts a 2-D array of coefficients, of shape (npts,ndim),
+and then returns the value of the function at each of the npts points, as
+computed with numpy broadcasting.  Thus, the functions may be used as a batch
+cost function (i.e. solver.SetObjective(rosen, batch=True)).
+
 
 Models
 ======
@@ -12,7 +12,9 @@ Base classes for mystic's provided models::
 
 """
 from numpy import sum as numpysum
+from numpy import asarray
 from mystic.forward_model import CostFactory as CF
+from mystic.tools import isbatch
 
 class AbstractFunction(object):
     """
@@ -23,8 +25,13 @@ calls to the class instance to mimic calls to the function object.
 
 For example, if function is overwritten with the Rosenbrock function:
     >>> rosen = Rosenbrock()
-    >>> rosen(1,1,1)
+    >>> rosen([1,1,1])
     0.
+
+Calls with a 2-D array of coefficients, of shape (n,ndim), are passed to the
+'batch' method, and return the n values f(x) for each row x of the array:
+    >>> rosen([[1,1,1],[0,0,0]])
+    array([ 0.,  2.])
    """
 
     def __init__(self):
@@ -36,16 +43,18 @@ Takes no inputs.
         return
 
     def __call__(self,*args,**kwds):
+        if args and isbatch(args[0]): return self.batch(*args,**kwds)
         return self.function(*args,**kwds)
 
     def function(self,coeffs):
         """takes a list of coefficients x, returns f(x)"""
         raise NotImplementedError, "overwrite for each derived class"
 
-#   def forward(self,pts):
-#       """takes points p=(x,y,...), returns f(xi,yi,...)"""
-#       pts = asarray(pts) #XXX: converting to numpy.array slows by 10x
-#       return [self.function(i) for i in pts.transpose()] #FIXME: requires pts is a numpy.array
+    def batch(self,coeffs):
+        """takes an array of coefficients X, shape (n,ndim), returns f(x) for
+each row x of X (overwrite with a vectorized implementation)"""
+        return asarray([self.function(x) for x in coeffs])
+
     pass
 
 
@@ -59,6 +68,11 @@ forward model.  Additionally, two common ways to generate a cost function are
 built into the model.  For "standard models", the cost function generator will
 work with no modifications.
 
+The 'batch' method evaluates the model for an array of coefficients, and is
+used by the generated cost functions to evaluate a batch of parameter vectors
+(see `mystic.forward_model.CostFactory.getCostFunction`).  The default loops
+over the coefficients; overwrite it with a vectorized implementation.
+
 See `mystic.models.poly` for a few basic examples.
     """
 
@@ -94,6 +108,11 @@ Inputs::
         """takes list of coefficients & evaluation points, returns f(x)"""
         raise NotImplementedError, "overwrite for each derived class"
 
+    def batch(self,coeffs,x):
+        """takes an array of coefficients C, shape (n,ncoeffs), & evaluation
+points, returns f(x) for each row of C"""
+        return asarray([self.evaluate(c,x) for c in coeffs])
+
     def ForwardFactory(self,coeffs):
         """generates a forward model instance from a list of coefficients"""
         raise NotImplementedError, "overwrite for each derived class"
@@ -103,7 +122,7 @@ Inputs::
 and evaluation points"""
         datapts = self.evaluate(target,pts)
         F = CF()
-        F.addModel(self.ForwardFactory,self.__name__,len(target))
+        F.addModel(self.ForwardFactory,self.__name__,len(target),batch=self.batch)
         self.__cost__ = F.getCostFunction(evalpts=pts,observations=datapts,sigma=self.__sigma__,metric=self.__metric__)
         return self.__cost__
 
@@ -111,7 +130,7 @@ and evaluation points"""
         """generates a cost function instance from datapoints 
 and evaluation points"""
         F = CF()
-        F.addModel(self.ForwardFactory,self.__name__,nparams)
+        F.addModel(self.ForwardFactory,self.__name__,nparams,batch=self.batch)
         self.__cost__ = F.getCostFunction(evalpts=pts,observations=datapts,sigma=self.__sigma__,metric=self.__metric__)
         return self.__cost__
 
@@ -15,7 +15,7 @@ References::
 """
 from abstract_model import AbstractModel
 
-from numpy import array, asarray
+from numpy import array, asarray, transpose
 from numpy import sum as numpysum
 from numpy import exp, sqrt
 from mystic.forward_model import CostFactory as CF
@@ -37,6 +37,11 @@ coeffs = (a1,a2,a3,a4,a5)"""
         t = asarray(evalpts) #XXX: requires a numpy.array
         return a1 + a2*exp(-t/a4) + a3*exp(-t/a5)
 
+    def batch(self,coeffs,evalpts):
+        """evaluate dual exponential decay over given evalpts, for each row
+of an array of coeffs, with shape (npts,5)"""
+        return self.evaluate(transpose(asarray(coeffs))[:,:,None],evalpts)
+
     def ForwardFactory(self,coeffs):
         """generates a dual decay model instance from a list of coefficients"""
         a1,a2,a3,a4,a5 = coeffs
@@ -50,14 +55,14 @@ with (a1,a2,a3,a4,a5) = (%s,%s,%s,%s,%s)""" % (a1,a2,a3,a4,a5)
         """generates a cost function instance from list of coefficients & evaluation points"""
         datapts = self.evaluate(target,pts)
         F = CF()
-        F.addModel(self.ForwardFactory,self.__name__,len(target))
+        F.addModel(self.ForwardFactory,self.__name__,len(target),batch=self.batch)
         self.__cost__ = F.getCostFunction(evalpts=pts,observations=datapts,sigma=sqrt(datapts),metric=self.__metric__)
         return self.__cost__
 
     def CostFactory2(self,pts,datapts,nparams):
         """generates a cost function instance from datapoints & evaluation points"""
         F = CF()
-        F.addModel(self.ForwardFactory,self.__name__,nparams)
+        F.addModel(self.ForwardFactory,self.__name__,nparams,batch=self.batch)
         self.__cost__ = F.getCostFunction(evalpts=pts,observations=datapts,sigma=sqrt(datapts),metric=self.__metric__)
         return self.__cost__
 
@@ -21,7 +21,7 @@ from abstract_model import AbstractFunction
 
 from numpy import asarray
 from math import pow
-from numpy import sign, floor
+from numpy import sign, floor, where
 
 class Corana(AbstractFunction):
     """Corana's function:
@@ -47,6 +47,16 @@ minimum is f(x)=0.0 at xi=0.0"""
                 r += d[j] * x[j] * x[j]
         return r
 
+    def batch(self,coeffs):
+        """evaluates the Corana function for an array of coeffs
+
+returns f(x) for each row x of coeffs, with shape (npts,4)"""
+        d = asarray([1., 1000., 10., 100.])
+        x = asarray(coeffs, dtype=float)[:,:4]
+        z = floor( abs(x/0.2) + 0.49999 ) * sign(x) * 0.2
+        r = where(abs(x-z) < 0.05, 0.15 * (z - 0.05*sign(z))**2 * d, d * x * x)
+        return r.sum(axis=1)
+
 #   def forward(self,pts):
 #       """n-dimensional Corana; returns f(xi) for each xi in pts"""
 #       return AbstractFunction.forward(self,pts)
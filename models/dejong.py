@@ -23,6 +23,8 @@ from abstract_model import AbstractFunction
 from numpy import sum as numpysum
 from numpy import asarray, transpose
 from numpy import zeros_like, diag, zeros, atleast_1d
+from numpy import ones, arange, where, hstack
+import numpy
 from math import floor
 import random
 from math import pow
@@ -44,9 +46,15 @@ minimum is f(x)=0.0 at xi=1.0"""
         x = asarray(x) #XXX: must be a numpy.array
         return numpysum(100.0*(x[1:]-x[:-1]**2.0)**2.0 + (1-x[:-1])**2.0)#,axis=0)
 
-    #def forward(self,pts):
-    #    """n-dimensional Rosenbrock; returns f(xi,yi,...) for pts=(x,y,...)"""
-    #    return AbstractFunction.forward(self,pts)
+    def batch(self,coeffs):
+        """evaluates n-dimensional Rosenbrock function for an array of coeffs
+
+returns f(x) for each row x of coeffs, with shape (npts,ndim)"""
+        x = asarray(coeffs, dtype=float)
+        if x.shape[1] < 2: # ensure that there are 2 coefficients
+            x = hstack((x, ones((len(x), 2 - x.shape[1]))))
+        return numpysum(100.0*(x[:,1:]-x[:,:-1]**2.0)**2.0 + \
+                        (1-x[:,:-1])**2.0, axis=1)
 
     def derivative(self,coeffs):
         """evaluates n-dimensional Rosenbrock derivative for a list of coeffs
@@ -117,9 +125,14 @@ minimum is f(x)=0.0 at xi=-5-n where n=[0.0,0.12]"""
                 f += 30 * (5.12 - c)
         return f
 
-#   def forward(self,pts):
-#       """n-dimensional De Jong step; returns f(xi,yi,...) for pts=(x,y,...)"""
-#       return AbstractFunction.forward(self,pts)
+    def batch(self,coeffs):
+        """evaluates n-dimensional De Jong step function for an array of coeffs
+
+returns f(x) for each row x of coeffs, with shape (npts,ndim)"""
+        x = asarray(coeffs, dtype=float)
+        f = where(abs(x) <= 5.12, numpy.floor(x), \
+            where(x > 5.12, 30 * (x - 5.12), 30 * (5.12 - x)))
+        return 30. + numpysum(f, axis=1)
 
     pass
 
@@ -141,9 +154,14 @@ minimum is f(x)=random, but statistically at xi=0"""
             f += pow(c,4) * (j+1.0) + random.random()
         return f
 
-#   def forward(self,pts):
-#       """n-dimensional De Jong quartic; returns f(xi,yi,...) for pts=(x,y,...)"""
-#       return AbstractFunction.forward(self,pts)
+    def batch(self,coeffs):
+        """evaluates n-dimensional De Jong quartic function for an array of coeffs
+
+returns f(x) for each row x of coeffs, with shape (npts,ndim), where the
+noise is drawn from numpy.random (instead of python's random module)"""
+        x = asarray(coeffs, dtype=float)
+        j = arange(1.0, x.shape[1] + 1)
+        return numpysum(x**4 * j + numpy.random.random(x.shape), axis=1)
 
     pass
 
@@ -170,9 +188,18 @@ minimum is f(x)=0.0 at x(-32,-32)"""
             r += 1.0/ (1.0*i + pow(x-a1[i],6) + pow(y-a2[i],6) + 1e-15)
         return 1.0/(0.002 + r)
 
-#   def forward(self,pts):
-#       """2-D Shekel; returns f(xi,yi) for pts=(x,y)"""
-#       return AbstractFunction.forward(self,pts)
+    def batch(self,coeffs):
+        """evaluates 2-D Shekel's function for an array of coeffs
+
+returns f(x,y) for each row (x,y) of coeffs, with shape (npts,2)"""
+        A = asarray([-32., -16., 0., 16., 32.])
+        a1 = numpy.tile(A, 5)
+        a2 = numpy.repeat(A, 5)
+
+        x,y = transpose(asarray(coeffs, dtype=float))
+        x,y = x[:,None], y[:,None]
+        r = numpysum(1.0/ (arange(25.) + (x-a1)**6 + (y-a2)**6 + 1e-15), axis=1)
+        return 1.0/(0.002 + r)
 
     pass
 
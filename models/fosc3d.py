@@ -14,6 +14,8 @@ References::
 from abstract_model import AbstractFunction
 
 from math import sin, exp
+from numpy import asarray, transpose, where
+import numpy
 
 class fOsc3D(AbstractFunction):
     """fOsc3D Mathematica function:
@@ -33,6 +35,16 @@ minimum is f(x)=? at x=(?,?)"""
         if y < 0: penalty = 100.*y*y
         return func + penalty
 
+    def batch(self,coeffs):
+        """evaluates the fOsc3D function for an array of coeffs
+
+returns f(x,y) for each row (x,y) of coeffs, with shape (npts,2)"""
+        x,y = transpose(asarray(coeffs, dtype=float))
+        func =  -4. * numpy.exp( -x*x - y*y ) + \
+                numpy.sin(6. * x) * numpy.sin(5. *y)
+        penalty = where(y < 0, 100.*y*y, 0)
+        return func + penalty
+
 #   def forward(self,pts):
 #       """2-D fOsc3D; returns f(xi,yi) for pts=(x,y)"""
 #       return AbstractFunction.forward(self,pts)
@@ -21,6 +21,8 @@ from abstract_model import AbstractFunction
 
 from numpy import asarray
 from math import cos, sqrt
+from numpy import zeros, arange
+import numpy
 
 class Griewangk(AbstractFunction):
     """Griewangk function:
@@ -45,6 +47,19 @@ minimum is f(x)=0.0 at xi=0.0"""
             term2 = term2 * cos( x[i] / sqrt(i+1.0) )
         return term1 - term2 + 1
 
+    def batch(self,coeffs):
+        """evaluates the Griewangk function for an array of coeffs
+
+returns f(x) for each row x of coeffs, with shape (npts,ndim)"""
+        coeffs = asarray(coeffs, dtype=float)
+        # ensure that there are 10 coefficients
+        x = zeros((len(coeffs), max(10, coeffs.shape[1])))
+        x[:,:coeffs.shape[1]] = coeffs
+
+        term1 = (x*x).sum(axis=1)/4000
+        term2 = numpy.cos( x[:,:10] / numpy.sqrt(arange(1.0, 11.0)) ).prod(axis=1)
+        return term1 - term2 + 1
+
 
 #   def forward(self,pts):
 #       """10-D Griewangk; returns f(xi,yi,...) for pts=(x,y,...)"""
@@ -14,7 +14,7 @@ References::
 from abstract_model import AbstractModel
 
 from numpy import sum as numpysum
-from numpy import array, pi, asarray, arange
+from numpy import array, pi, asarray, arange, transpose
 from numpy import random
 
 class Lorentzian(AbstractModel):
@@ -33,6 +33,11 @@ coeffs = (a1,a2,a3,A0,E0,G0,n)"""
         x = asarray(evalpts) #XXX: requires a numpy.array
         return (a1 + a2*x + a3*x*x + A0 * ( G0/(2*pi) )/( (x-E0)*(x-E0)+(G0/2)*(G0/2) ))/n
 
+    def batch(self,coeffs,evalpts):
+        """evaluate lorentzian over given evalpts, for each row of an array
+of coeffs, with shape (npts,7)"""
+        return self.evaluate(transpose(asarray(coeffs))[:,:,None],evalpts)
+
     def ForwardFactory(self,coeffs):
         """generates a lorentzian model instance from a list of coefficients"""
         a1,a2,a3,A0,E0,G0,n = coeffs
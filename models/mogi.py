@@ -17,7 +17,7 @@ References::
 from abstract_model import AbstractModel
 
 from numpy import sum as numpysum
-from numpy import array, pi
+from numpy import array, pi, asarray, transpose
 
 class Mogi(AbstractModel):
     """
@@ -42,6 +42,12 @@ pressure source in an elastic half space [3].
         C = c / pow(r2, 1.5)
         return array((C*dx,C*dy,C*dz)) #XXX: requires a numpy.array
 
+    def batch(self,coeffs,evalpts):
+        """evaluate a single Mogi peak over a 2D (2 by N) numpy array of
+evalpts, for each row of an array of coeffs, with shape (npts,4)"""
+        coeffs = transpose(asarray(coeffs))[:,:,None]
+        return self.evaluate(coeffs,evalpts).swapaxes(0,1)
+
     def ForwardFactory(self,coeffs):
         """generates a mogi source instance from a list of coefficients"""
         x0,y0,z0,dV = coeffs
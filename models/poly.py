@@ -20,7 +20,7 @@ References::
 from abstract_model import AbstractModel
 
 from numpy import sum as numpysum
-from numpy import asarray
+from numpy import asarray, transpose
 from mystic.math import polyeval, poly1d
 
 
@@ -36,6 +36,11 @@ class Polynomial(AbstractModel):
 thus, [a3, a2, a1, a0] yields  a3 x^3 + a2 x^2 + a1 x^1 + a0"""
         return polyeval(coeffs,x)
 
+    def batch(self,coeffs,x):
+        """takes an array of coefficients, shape (npts,ncoeffs), & evaluation
+points, returns f(x) for each row of coefficients"""
+        return polyeval(transpose(asarray(coeffs))[:,:,None],asarray(x))
+
     def ForwardFactory(self,coeffs):
         """generates a 1-D polynomial instance from a list of coefficients
 using numpy.poly1d(coeffs)"""
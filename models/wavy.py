@@ -32,6 +32,13 @@ minimum is f(x)=0.0 at xi=0.0"""
         x = asarray(coeffs) #XXX: must be numpy.array
         return abs(x+3.*sin(x+pi)+pi)
 
+    def batch(self,coeffs):
+        """evaluates the function for an array of coeffs
+
+returns f(x) for each row x of coeffs, with shape (npts,ndim); as the
+function is evaluated elementwise, the result has the same shape as coeffs"""
+        return self.function(asarray(coeffs))
+
 #   def forward(self,pts):
 #       """n-D Wavy; returns f(xi,yi,...) for pts=(x,y,...)"""
 #       return AbstractFunction.forward(self,pts)
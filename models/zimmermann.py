@@ -19,6 +19,8 @@ References::
 """
 from abstract_model import AbstractFunction
 
+from numpy import asarray, transpose, where, maximum
+
 class Zimmermann(AbstractFunction):
     """Zimmermann function:
 a non-continuous function, Equation (24-26) of [2]"""
@@ -41,6 +43,19 @@ minimum is f(x)=0.0 at x=(7.0,2.0)"""
         if x0 * x1 > 14: c3 = 100 * (x0*x1-14.)
         return max(f8,c0,c1,c2,c3)
 
+    def batch(self,coeffs):
+        """evaluates the Zimmermann function for an array of coeffs
+
+returns f(x) for each row x of coeffs, with shape (npts,2)"""
+        x0, x1 = transpose(asarray(coeffs, dtype=float))
+        f8 = 9 - x0 - x1
+        c0 = where(x0 < 0, -100 * x0, 0)
+        c1 = where(x1 < 0, -100 * x1, 0)
+        xx =  (x0-3.)*(x0-3) + (x1-2.)*(x1-2)
+        c2 = where(xx > 16, 100 * (xx-16), 0)
+        c3 = where(x0 * x1 > 14, 100 * (x0*x1-14.), 0)
+        return reduce(maximum, (f8,c0,c1,c2,c3))
+
 #   def forward(self,pts):
 #       """2-D Zimmermann; returns f(xi,yi) for pts=(x,y)"""
 #       return AbstractFunction.forward(self,pts)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+"""
+incremental (append-only) solver restart files
+
+An incremental restart file starts with a header line ('mystic.checkpoint'
+and the format version), followed by a sequence of dill records::
+    - a base record, holding the solver (and the state of the random
+      number generators) when the file was created
+    - any number of delta records, each holding the solver state that
+      may have changed since the previous record, the monitor entries
+      logged since the previous record, and the state of the random
+      number generators
+
+The solver's cost function, constraints, penalty, and map are only written
+again if they have been replaced, while entries in the generation and
+evaluation monitors are only written once.  Thus, the size of each delta
+record does not grow with the number of solver iterations.  Monitors that
+drop entries (i.e. monitors of bounded size) are written whole, as are the
+genealogy records of a DE solver (see SetGenealogy to limit their size).
+
+Records may be written in a background thread (see Writer), so the solver is
+not blocked while the record is written to disk.
+
+If the last record in a file is incomplete (e.g. the solver was killed while
+writing), the record is ignored when the file is read, and is overwritten
+when the next record is written.
+
+The solver's cost function is wrapped with the evaluation counter and the
+evaluation monitor, and so the counter and the monitors are updated in place
+when a delta record is read (unless the cost function was also replaced).
+Thus, a restarted solver continues to count and log its evaluations.
+"""
+
+import os
+import dill
+
+MAGIC = 'mystic.checkpoint.1\n'
+
+# monitors, where only the new entries are written to each record
+_monitors = ('_stepmon', '_evalmon')
+# members that are only written to a record if they have been replaced
+_static = ('_cost', '_cached', '_cache', '_constraints', '_penalty', \
+           '_map', '_mapconfig')
+# members that are not written to a delta record (i.e. rebuilt by Solve,
+# or not part of the solver state, such as the per-phase timing)
+_transient = ('_checkpoint', 'signal_handler', '_writer', '_stats')
+# members that the wrapped cost function updates (i.e. the evaluation counter
+# and the monitors), and so are updated in place when a record is read
+_shared = ('_fcalls',) + _monitors
+
+
+def rng_state():
+    """get the state of the random number generators"""
+    import random, numpy
+    return random.getstate(), numpy.random.get_state()
+
+def set_rng_state(state):
+    """set the state of the random number generators"""
+    import random, numpy
+    random.setstate(state[0])
+    numpy.random.set_state(state[1])
+    return
+
+def _appendable(monitor):
+    """True if the monitor only grows by appending entries"""
+    from mystic.monitors import Monitor, _BoundedMonitor
+    return isinstance(monitor, Monitor) and \
+       not isinstance(monitor, _BoundedMonitor)
+
+def _count(monitor):
+    """get the number of entries and info messages in the monitor"""
+    if not _appendable(monitor): return 0, 0
+    return len(monitor._x), len(monitor._info)
+
+def _state(solver):
+    """get the state to be pickled for the solver"""
+    if hasattr(solver, '__getstate__'): return solver.__getstate__()
+    return solver.__dict__
+
+def _update(solver, delta):
+    """update the solver state with a delta record, where the members that
+are used by the (unchanged) cost function are updated in place"""
+    if '_cost' not in delta:
+        for key in _shared:
+            value = delta.get(key)
+            current = solver.__dict__.get(key)
+            if value is None or type(current) is not type(value): continue
+            if isinstance(current, list): # the evaluation counter
+                current[:] = value
+            else: # a monitor that is written whole
+                current.__dict__.update(value.__dict__)
+            del delta[key]
+    solver.__dict__.update(delta)
+    return
+
+def _track(solver, filename, size):
+    """record what has been written to the restart file"""
+    state = _state(solver)
+    static = dict((key, state[key]) for key in _static if key in state)
+    counts = dict((key, (state[key],) + _count(state[key])) \
+                  for key in _monitors if key in state)
+    solver._checkpoint = dict(filename=filename, size=size, \
+                              static=static, counts=counts)
+    return
+
+
+def _write(filename, data, offset=None):
+    """write data to a new file; or, if offset is given, truncate the file
+at the offset and then append the data"""
+    if offset is None:
+        f = open(filename, 'wb')
+    else:
+        f = open(filename, 'r+b')
+        f.seek(offset)
+        f.truncate()
+    try:
+        f.write(data)
+    finally:
+        f.close()
+    return
+
+
+class Writer(object):
+    """write to files in a background thread, one write at a time
+
+The data to be written is prepared by the caller, so the solver may continue
+to change while the data is written.  Any error raised while writing is
+raised on the following call to wait (or to the writer)."""
+    def __init__(self):
+        self.__thread = None
+        self.__error = None
+        return
+    def __call__(self, filename, data, offset=None):
+        """write the data, once the previous write is complete"""
+        import threading
+        self.wait()
+        self.__thread = threading.Thread(target=self.__write, \
+                                         args=(filename, data, offset))
+        self.__thread.start()
+        return
+    def __write(self, filename, data, offset):
+        try:
+            _write(filename, data, offset)
+        except Exception, error:
+            self.__error = error
+        return
+    def wait(self):
+        """wait for the previous write to complete"""
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        error, self.__error = self.__error, None
+        if error is not None: raise error
+        return
+    def __getstate__(self):
+        # a write in progress is not saved
+        return {}
+    def __setstate__(self, state):
+        self.__init__()
+        return
+    pass
+
+
+def write(solver, filename, writer=_write, **kwds):
+    """append the solver state to an incremental restart file
+
+If the file has not been written by this solver, then a new file is created.
+The record is written with writer(filename, data, offset), where offset is
+None for a new file.  Additional keywords are passed to dill.dumps."""
+    tracked = solver._checkpoint
+    if tracked is None or tracked['filename'] != filename or \
+       not os.path.exists(filename) or os.path.getsize(filename) < tracked['size']:
+        # write the header and a base record
+        solver._checkpoint = None
+        data = MAGIC + dill.dumps(dict(solver=solver, rng=rng_state()), **kwds)
+        writer(filename, data)
+        _track(solver, filename, len(data))
+        return
+    # build a delta record
+    state = _state(solver)
+    static, counts = tracked['static'], tracked['counts']
+    delta, rows = {}, {}
+    for key, value in state.items():
+        if key in _transient or key in _monitors: continue
+        if key in static and static[key] is value: continue
+        delta[key] = value
+    # a replaced cost function is written with the monitors it logs to
+    replaced = '_cost' in delta
+    for key in _monitors:
+        if key not in state: continue
+        monitor = state[key]
+        last = counts.get(key)
+        if last is not None and last[0] is monitor and _appendable(monitor) \
+           and not replaced:
+            n, m = last[1:]
+            rows[key] = (monitor._x[n:], monitor._y[n:], monitor._id[n:], \
+                         monitor._info[m:])
+        else:
+            delta[key] = monitor
+    # append the record, overwriting any incomplete record
+    data = dill.dumps(dict(state=delta, rows=rows, rng=rng_state()), **kwds)
+    writer(filename, data, tracked['size'])
+    _track(solver, filename, tracked['size'] + len(data))
+    return
+
+
+def isincremental(file):
+    """True if the (open) file is an incremental restart file; if so, the
+file is positioned at the base record, otherwise it is rewound"""
+    if file.read(len(MAGIC)) == MAGIC: return True
+    file.seek(0)
+    return False
+
+
+def read(file):
+    """read the solver state from an (open) incremental restart file,
+positioned at the base record
+
+Returns the solver, and the state of the random number generators."""
+    from mystic.monitors import Monitor
+    record = dill.load(file)
+    solver, rng = record['solver'], record['rng']
+    size = file.tell()
+    while True:
+        try:
+            record = dill.load(file)
+            delta, rows = record['state'], record['rows']
+        except Exception: # end of file, or an incomplete record
+            break
+        size = file.tell()
+        _update(solver, delta)
+        for key, (x, y, id, info) in rows.items():
+            entries = Monitor()
+            entries._x, entries._y = list(x), list(y)
+            entries._id, entries._info = list(id), list(info)
+            solver.__dict__[key].extend(entries)
+        rng = record['rng']
+    # the restart file may be appended to by the loaded solver
+    _track(solver, file.name, size)
+    return solver, rng
+
+
+# end of file
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+"""
+per-phase timing of the solver loop
+
+When profiling is enabled on a solver (see enable_profiling), the parts of the
+solver loop are timed as the following phases::
+    - cost: the user's cost function
+    - monitors: the evaluation monitor
+    - cache: the cache lookup (see SetCache)
+    - bounds: the check of the strict ranges
+    - penalty: the penalty function
+    - constraints: the constraints function
+    - strategy: the mutation strategy (differential evolution solvers)
+    - step: the rest of each solver iteration (i.e. the algorithm, and the
+      generation monitor)
+    - termination: the check of the termination conditions
+    - checkpoint: the saving of restart files
+
+The time of each phase excludes the time spent in any other phase called from
+within it (e.g. the time in 'step' excludes the time in 'cost'), so the times
+of the phases add up to the time spent in the solver loop.  Evaluations made
+in another process (e.g. with a process pool) are not seen by the solver, and
+their time is included in 'step'.
+"""
+
+from timeit import default_timer as _timer
+import threading
+
+
+class Stats(object):
+    """cumulative time and call counts for each phase of the solver loop
+
+Important class members:
+    phases      - the totals, as {phase: [calls, seconds]}
+    generations - the calls and seconds for each phase in each iteration, as
+                  a list of {phase: (calls, seconds)}, where each entry holds
+                  the phases timed since the previous iteration
+    """
+    def __init__(self):
+        self.phases = {}
+        self.generations = []
+        self.__last = {} # the totals at the end of the previous iteration
+        self.__lock = threading.Lock()
+        self.__local = threading.local() # the stack of nested phases
+        return
+
+    def timed(self, phase, function):
+        """get a function that adds the time of each call to the phase"""
+        def timed_function(*args, **kwds):
+            local = self.__local
+            stack = getattr(local, 'stack', None)
+            if stack is None: stack = local.stack = []
+            stack.append(0.0) # time spent in nested phases
+            start = _timer()
+            try:
+                return function(*args, **kwds)
+            finally:
+                elapsed = _timer() - start
+                nested = stack.pop()
+                if stack: stack[-1] += elapsed
+                self.record(phase, elapsed - nested)
+        return timed_function
+
+    def record(self, phase, seconds, calls=1):
+        """add the calls and seconds to the phase"""
+        with self.__lock:
+            total = self.phases.get(phase)
+            if total is None: total = self.phases[phase] = [0, 0.0]
+            total[0] += calls
+            total[1] += seconds
+        return
+
+    def mark(self):
+        """end an iteration, recording the phases timed since the last mark"""
+        with self.__lock:
+            last, self.__last = self.__last, {}
+            entry = {}
+            for phase, (calls, seconds) in self.phases.items():
+                self.__last[phase] = (calls, seconds)
+                _calls, _seconds = last.get(phase, (0, 0.0))
+                if calls != _calls:
+                    entry[phase] = (calls - _calls, seconds - _seconds)
+            self.generations.append(entry)
+        return
+
+    def clear(self):
+        """discard all recorded times"""
+        with self.__lock:
+            self.phases = {}
+            self.generations = []
+            self.__last = {}
+        return
+
+    def dict(self):
+        """get the recorded times as a dict (of builtin types)"""
+        def _entry(calls, seconds):
+            return {'calls': calls, 'seconds': seconds}
+        with self.__lock:
+            phases = dict((phase, _entry(*total)) \
+                          for (phase, total) in self.phases.items())
+            generations = [dict((phase, _entry(*total)) \
+                                for (phase, total) in entry.items()) \
+                           for entry in self.generations]
+        return {'phases': phases, 'generations': generations}
+
+    def json(self, **kwds):
+        """get the recorded times as a JSON string; kwds are for json.dumps"""
+        import json
+        return json.dumps(self.dict(), **kwds)
+
+    def __repr__(self):
+        phases = sorted(self.phases.items(), key=lambda item: -item[1][1])
+        phases = ', '.join("%s=%.3gs/%d" % (phase, seconds, calls) \
+                           for (phase, (calls, seconds)) in phases)
+        return "Stats(%s)" % phases
+
+    def __getstate__(self):
+        # the lock and the stack of nested phases are not saved
+        return {'phases': self.phases, 'generations': self.generations, \
+                'last': self.__last}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.phases = state['phases']
+        self.generations = state['generations']
+        self.__last = state['last']
+        return
+    pass
+
+
+# end of file
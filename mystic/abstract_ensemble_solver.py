@@ -74,13 +74,52 @@ the solver is running.  ***NOTE: The handler currently is disabled
 when the solver has been launched in parallel.*** 
 
 """
-__all__ = ['AbstractEnsembleSolver']
+__all__ = ['AbstractEnsembleSolver','Result']
 
 
+import numpy
 from mystic.monitors import Null
 from mystic.abstract_map_solver import AbstractMapSolver
 
 
+class Result(object):
+    """
+compact record of the results of a nested solver
+
+Important class members:
+    id          - the rank of the nested solver.
+    x           - the best parameter set found by the solver.
+    y           - the best energy found by the solver.
+    evaluations - the number of function evaluations.
+    generations - the number of solver iterations.
+    message     - the termination message of the solver.
+    stepmon     - the generation monitor of the solver  [default = None]
+    evalmon     - the evaluation monitor of the solver  [default = None]
+    """
+    def __init__(self, solver, monitors=False):
+        """
+Takes one initial input:
+    solver   -- a solver instance, after Solve
+
+Additional inputs:
+    monitors -- if True, keep the solver's monitors.        [default = False]
+        """
+        self.id = solver.id
+        self.x = solver.bestSolution
+        self.y = solver.bestEnergy
+        self.evaluations = solver.evaluations
+        self.generations = solver.generations
+        self.message = solver.CheckTermination(info=True)
+        self.stepmon = solver._stepmon if monitors else None
+        self.evalmon = solver._evalmon if monitors else None
+        return
+
+    def __repr__(self):
+        return "Result(id=%s, y=%s, evaluations=%s)" % \
+               (self.id, self.y, self.evaluations)
+    pass
+
+
 class AbstractEnsembleSolver(AbstractMapSolver):
     """
 AbstractEnsembleSolver base class for mystic optimizers that are called within
@@ -104,11 +143,14 @@ Important class members:
     evaluations      - an evaluation counter.
     bestEnergy       - current best energy.
     bestSolution     - current best parameter set.           [size = dim]
-    popEnergy        - set of all trial energy solutions.    [size = npop]
-    population       - set of all trial parameter solutions. [size = dim*npop]
+    popEnergy        - set of all trial energy solutions.    [shape = (npop,)]
+    population       - set of all trial parameter solutions. [shape = (npop,dim)]
     solution_history - history of bestSolution status.       [StepMonitor.x]
     energy_history   - history of bestEnergy status.         [StepMonitor.y]
     signal_handler   - catches the interrupt signal.         [***disabled***]
+
+After Solve, the population holds the best parameter set found by each of
+the nested solvers (ordered by rank), while popEnergy holds the energies.
         """
         super(AbstractEnsembleSolver, self).__init__(dim, **kwds)
        #self.signal_handler   = None
@@ -126,8 +168,55 @@ Important class members:
         self._npts            = npts
         from mystic.solvers import NelderMeadSimplexSolver
         self._solver          = NelderMeadSimplexSolver
-        self._bestSolver      = None # 'best' solver (after Solve)
+        self._bestResult      = None # 'best' nested result (after Solve)
+        self._results         = [] # results of nested solvers (after Solve)
         self._total_evals     = 0 # total function calls (after Solve)
+        self._retain          = False # if True, results keep their monitors
+        self._race            = None # (generations, fraction) for racing
+        return
+
+    def SetRacing(self, generations=None, fraction=0.5):
+        """race the nested solvers, giving more generations to the best
+
+input::
+    - generations: number of generations each nested solver is advanced
+      in the first round [default = None, i.e. no racing]
+    - fraction: fraction of the (unfinished) nested solvers that are kept
+      after each round (0 < fraction < 1) [default = 0.5]
+
+note::
+    With racing (i.e. successive halving), the nested solvers are advanced
+    in rounds. After each round, the nested solvers that have met their
+    termination conditions (or evaluation limits) are finished, and only
+    the best fraction of the remaining nested solvers are kept. Those kept
+    are advanced by 1/fraction times as many generations in the next round.
+    The nested solvers are returned by the mapper after each round, so
+    racing is best used when the cost dominates the transfer of a solver.
+
+    Each list of starting points (e.g. each round of a ClusterSolver) is
+    raced separately."""
+        if generations is None:
+            self._race = None
+            return
+        if not 0 < fraction < 1:
+            raise ValueError, "fraction must be between 0 and 1"
+        self._race = (max(1, int(generations)), fraction)
+        return
+
+    def SetNestedMonitors(self, retain=False):
+        """set whether the results of the nested solvers keep their monitors
+
+input::
+    - retain: if True, keep the monitors of each nested solver
+
+note::
+    By default, each nested solver only returns a compact result record
+    (see Result), and the generation monitor logs the best solution found
+    as each nested solver finishes. If retain=True, the monitors of every
+    nested solver are kept (and returned by the mapper), and the monitors
+    of the best nested solver are used as the generation and evaluation
+    monitors."""
+        self._retain = bool(retain)
         return
 
     def SetNestedSolver(self, solver):
@@ -167,6 +256,112 @@ input::
         solver.SetPenalty(self._penalty)
         return solver
 
+    def __solve(self, cost, solver, initial_values, disp=False, callback=None):
+        """solve with a copy of the nested solver at each of the initial values
+
+The initial values are given as an iterable of lists of starting points, and
+each list is sent to the mapper in turn (so the starting points need not all
+be generated at once). The results are collected as the nested solvers
+finish, so the best solution (and the generation monitor) is updated as
+each result arrives."""
+        from copy import deepcopy as copy
+        solver = copy(solver) # the nested solvers are copied from a template
+        retain = self._retain
+
+        # generate the functions to start and optimize a nested solver
+        def local_start(x0, rank=None):
+            solver_ = copy(solver)
+            solver_.id = rank
+            solver_.SetInitialPoints(x0)
+            if solver_._useStrictRange: #XXX: always, settable, or sync'd ?
+                solver_.SetStrictRanges(min=solver_._strictMin, \
+                                        max=solver_._strictMax) # or lower,upper ?
+            return solver_
+
+        def local_optimize(x0, rank=None, disp=disp):
+            solver_ = local_start(x0, rank)
+            solver_.Solve(cost, disp=disp)
+            return Result(solver_, monitors=retain)
+
+        # generate the functions to advance and finish a raced solver
+        def local_advance(solver_, generations):
+            settings = solver_._process_inputs({})
+            if not len(solver_._stepmon): # do generation = 0
+                solver_.Step(cost)
+                solver_._termination(solver_)
+                solver_._SetEvaluationLimits()
+            for i in range(generations):
+                if solver_.CheckTermination(): break
+                solver_.Step(**settings)
+            return solver_
+
+        def local_finish(solver_):
+            msg = solver_.CheckTermination(info=True)
+            if msg: # the solver terminated, and was not eliminated
+                solver_._exitMain()
+                solver_._stepmon.info('STOP("%s")' % msg)
+            solver_._flush_monitors()
+            return Result(solver_, monitors=retain)
+
+        # race the solvers, finishing the solvers that terminate or lose
+        def race(x0, id):
+            generations, fraction = self._race
+            solvers = map(local_start, x0, id)
+            while solvers:
+                solvers = self._map(local_advance, solvers, \
+                                    [generations]*len(solvers), **self._mapconfig)
+                running = []
+                for solver_ in solvers:
+                    if solver_.CheckTermination(): yield local_finish(solver_)
+                    else: running.append(solver_)
+                running.sort(key=lambda solver_: solver_.bestEnergy)
+                keep = int(numpy.ceil(fraction * len(running)))
+                for solver_ in running[keep:]:
+                    yield local_finish(solver_)
+                solvers = running[:keep]
+                generations = int(numpy.ceil(generations / fraction))
+
+        # map:: result = local_optimize(x0, id), for each list of x0
+        def results():
+            rank = 0
+            for x0 in initial_values:
+                id = xrange(rank, rank + len(x0))
+                rank += len(x0)
+                if self._race is None:
+                    _results = self._uimap(local_optimize, x0, id)
+                else:
+                    _results = race(x0, id)
+                for result in _results:
+                    yield result
+
+        # get the results with the lowest energy, as they arrive
+        self._bestResult = best = None
+        self._results = []
+        self._total_evals = 0
+        for result in results():
+            self._results.append(result)
+            self._total_evals += result.evaluations # add func evals
+            if best is None or result.y < best.y:
+                self._bestResult = best = result
+                self.bestSolution = best.x
+                self.bestEnergy = best.y
+            if not retain: # log the best solution found so far
+                self._stepmon(best.x, best.y, best.id)
+            if callback is not None:
+                callback(self.bestSolution)
+            self._AbstractSolver__save_state()
+        self._results.sort(key=lambda result: result.id)
+
+        # return results to internals
+        self.population = numpy.array([result.x for result in self._results])
+        self.popEnergy = numpy.array([result.y for result in self._results])
+        self.trialSolution = best.x
+        self._fcalls = [best.evaluations]
+        if retain: # write 'bests' to monitors
+            self._stepmon = best.stepmon #XXX: pointer? copy?
+            self._evalmon = best.evalmon #XXX: pointer? copy?
+        return
+
     def SetInitialPoints(self, x0, radius=0.05):
         """Set Initial Points with Guess (x0)
 
@@ -213,33 +408,25 @@ Note::
     If no termination conditions are given, the solver's stored
     termination conditions will be used.
         """
-        if self._bestSolver:
-            solver = self._bestSolver
+        best = self._bestResult
+        if termination == None and best is not None:
+            # the termination message of the best nested solver
+            msg = best.message
         else:
-            solver = self
-        if termination == None:
-            termination = solver._termination
-
-        # check for termination messages
-        msg = termination(solver, info=True)
-        lim = "EvaluationLimits with %s" % {'evaluations':solver._maxfun,
-                                            'generations':solver._maxiter}
+            if termination == None:
+                termination = self._termination
+            msg = termination(self, info=True)
 
         # push solver internals to scipy.optimize.fmin interface
-        if solver._fcalls[0] >= solver._maxfun and solver._maxfun is not None:
-            msg = lim #XXX: prefer the default stop ?
-            if disp:
-                print "Warning: Maximum number of function evaluations has "\
-                      "been exceeded."
-        elif solver.generations >= solver._maxiter and solver._maxiter is not None:
-            msg = lim #XXX: prefer the default stop ?
-            if disp:
-                print "Warning: Maximum number of iterations has been exceeded"
+        if msg and disp and msg.startswith("EvaluationLimits"):
+            print "Warning: Maximum number of function evaluations or "\
+                  "iterations has been exceeded."
         elif msg and disp:
             print "Optimization terminated successfully."
-            print "         Current function value: %f" % solver.bestEnergy
-            print "         Iterations: %d" % solver.generations
-            print "         Function evaluations: %d" % solver._fcalls[0]
+            if best is not None:
+                print "         Current function value: %f" % best.y
+                print "         Iterations: %d" % best.generations
+                print "         Function evaluations: %d" % best.evaluations
             print "         Total Function evaluations: %d" % self._total_evals
 
         if info:
@@ -21,6 +21,14 @@ distributed and high-performance computing mappers and launchers
 can be obtained within the "pathos" package, found here::
     - http://dev.danse.us/trac/pathos
 
+A worker pool with persistent local processes is provided by
+mystic.multiprocess.ProcessPool.  For example, to use all the
+processors on a node, use 'solver.SetMapper(ProcessPool().map)'.
+For cost functions that release the GIL (or wait on I/O), a pool
+of threads is provided by mystic.threads.ThreadPool.  Evaluation
+monitors are only updated for maps that evaluate in this process
+(i.e. python_map, PythonSerial, or ThreadPool).
+
 
 Usage
 =====
@@ -97,8 +105,8 @@ Important class members:
     evaluations      - an evaluation counter.
     bestEnergy       - current best energy.
     bestSolution     - current best parameter set.           [size = dim]
-    popEnergy        - set of all trial energy solutions.    [size = npop]
-    population       - set of all trial parameter solutions. [size = dim*npop]
+    popEnergy        - set of all trial energy solutions.    [shape = (npop,)]
+    population       - set of all trial parameter solutions. [shape = (npop,dim)]
     solution_history - history of bestSolution status.       [StepMonitor.x]
     energy_history   - history of bestEnergy status.         [StepMonitor.y]
     signal_handler   - catches the interrupt signal.         [***disabled***]
@@ -107,8 +115,8 @@ Important class members:
        #AbstractSolver.__init__(self,dim,**kwds)
        #self.signal_handler   = None
        #self._handle_sigint   = False
-        trialPop = [[0.0 for i in range(dim)] for j in range(self.nPop)]
-        self.trialSolution    = trialPop
+        from numpy import zeros
+        self.trialSolution    = zeros((self.nPop, dim)) # trial population
         self._map_solver      = True
 
         # import 'map' defaults
@@ -207,6 +215,41 @@ Additional inputs:
         self._mapconfig['nodes'] = nnodes
         return
 
+    def _shared_map(self):
+        """True if the map evaluates in this process (i.e. shares monitors)"""
+        from python_map import python_map
+        if self._map == python_map: return True
+        from python import PythonSerial
+        from threads import ThreadPool
+        pool = getattr(self._map, 'im_self', None)
+        return isinstance(pool, (PythonSerial, ThreadPool))
+
+    def _map_lock(self):
+        """get the (shared) lock for updating the evaluation counter and
+monitor, if the map evaluates in threads; otherwise, None"""
+        from threads import ThreadPool
+        from mystic.tools import _lock
+        pool = getattr(self._map, 'im_self', None)
+        return _lock if isinstance(pool, ThreadPool) else None
+
+    def _uimap(self, f, *args):
+        """map f over args, returning an iterator over the results
+
+The results are returned in the order they complete, if the mapper is the
+map of a pool that provides an unordered (or ordered) iterative map."""
+        from python_map import python_map
+        from itertools import imap
+        if self._map == python_map: return imap(f, *args)
+        from abstract_launcher import AbstractWorkerPool
+        pool = getattr(self._map, 'im_self', None)
+        for name in ('uimap', 'imap'):
+            method = getattr(pool, name, None)
+            if getattr(method, 'im_func', None) in (None, \
+               getattr(AbstractWorkerPool, name).im_func): # not implemented
+                continue
+            return method(f, *args, **self._mapconfig)
+        return iter(self._map(f, *args, **self._mapconfig))
+
     def SelectScheduler(self, scheduler, queue, timelimit=None):
         """Select scheduler and queue (and optionally) timelimit.
 
@@ -78,7 +78,7 @@ __all__ = ['AbstractSolver']
 import numpy
 from numpy import inf, shape, asarray, absolute, asfarray
 from mystic.tools import wrap_function, wrap_nested
-from mystic.tools import wrap_bounds, wrap_penalty
+from mystic.tools import wrap_bounds, wrap_penalty, wrap_batch, wrap_cache
 
 abs = absolute
 
@@ -102,8 +102,8 @@ Important class members:
     evaluations      - an evaluation counter.
     bestEnergy       - current best energy.
     bestSolution     - current best parameter set.           [size = dim]
-    popEnergy        - set of all trial energy solutions.    [size = npop]
-    population       - set of all trial parameter solutions. [size = dim*npop]
+    popEnergy        - set of all trial energy solutions.    [shape = (npop,)]
+    population       - set of all trial parameter solutions. [shape = (npop,dim)]
     solution_history - history of bestSolution status.       [StepMonitor.x]
     energy_history   - history of bestEnergy status.         [StepMonitor.y]
     signal_handler   - catches the interrupt signal.
@@ -114,9 +114,10 @@ Important class members:
         self.nDim             = dim
         self.nPop             = NP
         self._init_popEnergy  = inf
-        self.popEnergy	      = [self._init_popEnergy] * NP
-        self.population	      = [[0.0 for i in range(dim)] for j in range(NP)]
-        self.trialSolution    = [0.0] * dim
+        # population and energies are contiguous arrays (rows are views)
+        self.popEnergy	      = numpy.ones(NP) * self._init_popEnergy
+        self.population	      = numpy.zeros((NP, dim))
+        self.trialSolution    = numpy.zeros(dim)
         self._map_solver      = False
         self._bestEnergy      = None
         self._bestSolution    = None
@@ -133,7 +134,12 @@ Important class members:
         self._maxiter         = None
         self._maxfun          = None
         self._saveiter        = None
-       #self._saveeval        = None
+        self._saveeval        = None
+        self._savetime        = None
+        self._lastsave        = None     # (evaluations, time) at last save
+        self._writer          = None     # if not None, writes in background
+        self._incremental     = False    # if True, append to restart file
+        self._checkpoint      = None     # what is in the restart file
 
         from mystic.monitors import Null, Monitor
         self._evalmon         = Null()
@@ -146,6 +152,11 @@ Important class members:
         self._constraints     = lambda x: x
         self._penalty         = lambda x: 0.0
         self._cost            = (None, None)
+        self._batch           = False    # if True, cost takes a population
+        self._cache           = None     # cache decorator for the cost
+        self._cached          = None     # the cached cost (provides info)
+        self._termcache       = None     # shared by termination conditions
+        self._stats           = None     # per-phase timing, if profiling
         self._termination     = lambda x, *ar, **kw: False if len(ar) < 1 or ar[0] is False or kw.get('info',True) == False else '' #XXX: better default ?
         # (get termination details with self._termination.__doc__)
 
@@ -161,6 +172,10 @@ Important class members:
         """get the number of function calls"""
         return self._fcalls[0]
 
+    def __stats(self):
+        """get the per-phase timing (None, unless profiling is enabled)"""
+        return self._stats
+
     def __generations(self):
         """get the number of iterations"""
         return max(0,len(self.energy_history)-1)
@@ -256,8 +271,8 @@ input::
                 self._stepmon = monitor #FIXME: need .prepend(current)
         else:
             raise TypeError, "'%s' is not a monitor instance" % monitor
-        self.energy_history   = self._stepmon.y
-        self.solution_history = self._stepmon.x
+        self.energy_history   = None # sync with _stepmon.y
+        self.solution_history = None # sync with _stepmon.x
         return
 
     def SetEvaluationMonitor(self, monitor, new=False):
@@ -367,9 +382,9 @@ input::
             if max[i] == None: max[i] = self._defaultMax[0]
         import random
         #generate random initial values
-        for i in range(len(self.population)):
-            for j in range(self.nDim):
-                self.population[i][j] = random.uniform(min[j],max[j])
+        self.population[:] = [[random.uniform(min[j],max[j]) \
+                               for j in range(self.nDim)] \
+                               for i in range(len(self.population))]
 
     def SetMultinormalInitialPoints(self, mean, var = None):
         """Generate Initial Points from Multivariate Normal.
@@ -404,6 +419,27 @@ input::
         """disable workflow interrupt handler while solver is running"""
         self._handle_sigint = False
 
+    def enable_profiling(self):
+        """time each phase of the solver loop (the results are in 'stats')
+
+note::
+    The cost function, monitors, bounds, penalty, and constraints are only
+    timed if profiling is enabled before the objective is registered (with
+    SetObjective or Solve). See mystic._profile for the phases."""
+        from mystic._profile import Stats
+        if self._stats is None: self._stats = Stats()
+        return
+
+    def disable_profiling(self):
+        """stop timing the solver loop, and discard the 'stats'"""
+        self._stats = None
+        return
+
+    def _timed(self, phase, function):
+        """get the function, timed as the given phase if profiling"""
+        if self._stats is None: return function
+        return self._stats.timed(phase, function)
+
     def _generateHandler(self,sigint_callback):
         """factory to generate signal handler
 
@@ -415,6 +451,7 @@ Available switches::
 """
         def handler(signum, frame):
             import inspect
+            self._flush_monitors()
             print inspect.getframeinfo(frame)
             print inspect.trace()
             while 1:
@@ -446,18 +483,46 @@ Available switches::
         self.signal_handler = handler
         return
 
-    def SetSaveFrequency(self, generations=None, filename=None, **kwds):
+    def SetSaveFrequency(self, generations=None, filename=None, \
+                         incremental=False, evaluations=None, seconds=None, \
+                         background=False, **kwds):
         """set frequency for saving solver restart file
 
 input::
     - generations = number of solver iterations before next save of state
     - filename = name of file in which to save solver state
+    - incremental = if True, append the changes in solver state to the file
+    - evaluations = number of function evaluations before next save of state
+    - seconds = wall-clock time (in seconds) before next save of state
+    - background = if True, write the restart file in a background thread
 
 note::
-    SetSaveFrequency(None) will disable saving solver restart file"""
+    SetSaveFrequency(None) will disable saving solver restart file
+
+    The state is saved when any of the chosen frequencies is met, where
+    evaluations and seconds are counted from the last save. Thus, use
+    evaluations or seconds when the cost of a generation varies widely.
+
+    With background=True, the solver is serialized as usual, but the
+    solver continues while the restart file is written to disk. A save
+    waits for the previous write to complete, as does the final save.
+
+    By default, the entire solver (including all the monitored entries) is
+    saved to the restart file each time. With incremental=True, the solver
+    is saved once, and then only the changes since the last save (i.e. the
+    population, energies, new monitor entries, and random state) are
+    appended to the file. LoadSolver reads either type of restart file."""
         self._saveiter = generations
-       #self._saveeval = evaluations
+        self._saveeval = evaluations
+        self._savetime = seconds
         self._state = filename
+        self._incremental = bool(incremental)
+        if not background:
+            self._wait_save()
+            self._writer = None
+        elif self._writer is None:
+            from mystic._checkpoint import Writer
+            self._writer = Writer()
         return
 
     def SetEvaluationLimits(self, generations=None, evaluations=None, \
@@ -516,8 +581,14 @@ Note::
         """
         if termination == None:
             termination = self._termination
-        # check for termination messages
-        msg = termination(self, info=True)
+        termination = self._timed('termination', termination)
+        # check for termination messages (only if the message is requested),
+        # while sharing intermediate results between the conditions
+        self._termcache = {}
+        try:
+            msg = termination(self, info=bool(info))
+        finally:
+            self._termcache = None
         lim = "EvaluationLimits with %s" % {'evaluations':self._maxfun,
                                             'generations':self._maxiter}
 
@@ -547,16 +618,77 @@ Note::
         self._termination = termination
         return
 
+    def SetCache(self, cache=None, maxsize=100, tol=None, archive=None):
+        """memoize the cost function, so repeated evaluations are cached
+
+input::
+    - cache: a cache decorator from mystic.cache (e.g. lru_cache, lfu_cache)
+    - maxsize: maximum number of evaluations held in memory
+    - tol: number of decimal digits to round the parameters to, when
+      generating a cache key [default = None, i.e. no rounding]
+    - archive: a klepto archive (e.g. dir_archive('cost')), to store the
+      cached evaluations on disk [default = None, i.e. in memory only]
+
+note::
+    Evaluations found in the cache are not counted as function evaluations,
+    and are not logged to the evaluation monitor. Cache statistics are
+    available with CacheInfo. Evaluations that are purged from memory (and
+    all evaluations at the end of Solve) are written to the archive, and
+    evaluations are loaded from the archive on a cache miss.
+
+    Only evaluations of a single parameter vector, made in serial, are cached
+    (i.e. not batch cost functions, or evaluations with a parallel map).
+    The cache should be set before the objective is registered (with
+    SetObjective or Solve). SetCache(None) will disable caching."""
+        if cache is None:
+            self._cache = None
+        else:
+            self._cache = cache(maxsize=maxsize, cache=archive, tol=tol)
+        self._cached = None
+        return
+
+    def CacheInfo(self):
+        """return the cache statistics (hit, miss, load, maxsize, size)"""
+        if self._cached is None: return None
+        return self._cached.info()
+
+    def SetObjective(self, cost, ExtraArgs=None, batch=False):
+        """decorate the cost function with bounds, penalties, monitors, etc
+
+input::
+    - cost: a cost function of the form y = cost(x, *ExtraArgs),
+      where x is a parameter vector of length self.nDim
+    - ExtraArgs: a tuple of extra arguments for the cost function
+    - batch: if True, the cost function is of the form y = cost(X,
+      *ExtraArgs), where X is an array of parameter vectors of shape
+      (n, self.nDim), and y is a sequence of n costs
+
+note::
+    Solvers that evaluate a population at once (i.e. DifferentialEvolution-
+    Solver2) pass the entire trial population to a batch cost function in
+    a single call, while all other solvers pass a single parameter vector.
+    The objective is used when Solve is called without a cost function."""
+        self._batch = bool(batch)
+        self._RegisterObjective(cost, ExtraArgs)
+        return
+
     def _RegisterObjective(self, cost, ExtraArgs=None):
         """decorate cost function with bounds, penalties, monitors, etc"""
         if ExtraArgs == None: ExtraArgs = ()
-        self._fcalls, cost = wrap_function(cost, ExtraArgs, self._evalmon)
+        cost = self._timed('cost', cost)
+        if self._batch: cost = wrap_batch(cost)
+        self._fcalls, cost = wrap_function(cost, ExtraArgs, \
+                                           self._timed('monitors', self._evalmon))
+        if self._cache is not None:
+            self._cached, cost = wrap_cache(cost, self._cache)
+            cost = self._timed('cache', cost)
         if self._useStrictRange:
             for i in range(self.nPop):
                 self.population[i] = self._clipGuessWithinRangeBoundary(self.population[i])
             cost = wrap_bounds(cost, self._strictMin, self._strictMax)
-        cost = wrap_penalty(cost, self._penalty)
-        cost = wrap_nested(cost, self._constraints)
+            cost = self._timed('bounds', cost)
+        cost = wrap_penalty(cost, self._timed('penalty', self._penalty))
+        cost = wrap_nested(cost, self._timed('constraints', self._constraints))
         # hold on to the 'wrapped' cost function
         self._cost = (cost, ExtraArgs)
         return cost
@@ -580,36 +712,56 @@ Note::
 
     def SaveSolver(self, filename=None, **kwds):
         """save solver state to a restart file"""
-        import dill
+        import dill, time
+        from mystic import _checkpoint
         if filename == None: # then check if already has registered file
             if self._state == None: # then create a new one
                 import tempfile
                 self._state = tempfile.mkstemp(suffix='.pkl')[-1]
             filename = self._state
         self._state = filename
-        f = file(filename, 'wb')
-        try:
-            dill.dump(self, f, **kwds)
-            self._stepmon.info('DUMPED("%s")' % filename) #XXX: before / after ?
-        finally:
-            f.close()
+        self._lastsave = (self.evaluations, time.time())
+        writer = self._writer
+        if writer is None: # write in the calling thread
+            writer = _checkpoint._write
+        else: # the file is complete before the next write is started
+            writer.wait()
+        if self._incremental: # append the changes to the restart file
+            self._stepmon.info('DUMPED("%s")' % filename)
+            _checkpoint.write(self, filename, writer=writer, **kwds)
+            return
+        data = dill.dumps(self, **kwds)
+        writer(filename, data)
+        self._stepmon.info('DUMPED("%s")' % filename) #XXX: before / after ?
+        return
+
+    def _wait_save(self):
+        """wait for any restart file being written in the background"""
+        if self._writer is not None: self._writer.wait()
         return
 
     def __save_state(self, force=False):
         """save the solver state, if chosen save frequency is met"""
+        import time
         # save the last iteration
         if force and bool(self._state):
-            self.SaveSolver()
+            self._timed('checkpoint', self.SaveSolver)()
+            self._wait_save()
             return
         # save the zeroth iteration
         nonzero = True #XXX: or bool(self.generations) ?
         # after _saveiter generations, then save state
         iters = self._saveiter
         saveiter = bool(iters) and not bool(self.generations % iters)
-        if nonzero and saveiter:
-            self.SaveSolver()
-        #FIXME: if _saveeval (or more) since last check, then save state
-       #save = self.evaluations % self._saveeval
+        # after _saveeval evaluations or _savetime seconds since the last save
+        if self._lastsave is None: # count from the first check
+            self._lastsave = (self.evaluations, time.time())
+        evals, secs = self._saveeval, self._savetime
+        saveeval = bool(evals) and \
+                   self.evaluations - self._lastsave[0] >= evals
+        savetime = bool(secs) and time.time() - self._lastsave[1] >= secs
+        if nonzero and (saveiter or saveeval or savetime):
+            self._timed('checkpoint', self.SaveSolver)()
         return
 
     def __load_state(self, solver, **kwds):
@@ -684,36 +836,59 @@ Further Inputs:
         # register termination function
         if termination is not None:
             self.SetTermination(termination)
+        # time each iteration, if profiling
+        step = self._timed('step', self.Step)
+        stats = self._stats
+
+        try:
+            # the initital optimization iteration
+            if not len(self._stepmon): # do generation = 0
+                step()
+                if stats is not None: stats.mark()
+                if callback is not None:
+                    callback(self.bestSolution)
+             
+                # initialize termination conditions, if needed
+                self._termination(self) #XXX: call at generation 0 or always?
+            # impose the evaluation limits
+            self._SetEvaluationLimits()
+
+            # the main optimization loop
+            while not self.CheckTermination() and not self._EARLYEXIT:
+                step(**settings)
+                if stats is not None: stats.mark()
+                if callback is not None:
+                    callback(self.bestSolution)
+            else: self._exitMain()
+
+            # handle signal interrupts (only in the main thread)
+            if self._handle_sigint:
+                signal.signal(signal.SIGINT,signal.default_int_handler)
+
+            # log any termination messages
+            msg = self.CheckTermination(disp=disp, info=True)
+            if msg: self._stepmon.info('STOP("%s")' % msg)
+            # save final state
+            self.__save_state(force=True)
+        finally: # write any buffered monitor output, and cached evaluations
+            self._flush_monitors()
+            self._dump_cache()
+        return
+
+    def _dump_cache(self):
+        """write the cached evaluations to the cache archive, if archived"""
+        cached = self._cached
+        if cached is not None and cached.archived(): cached.dump()
+        return
 
-        # the initital optimization iteration
-        if not len(self._stepmon): # do generation = 0
-            self.Step()
-            if callback is not None:
-                callback(self.bestSolution)
-         
-            # initialize termination conditions, if needed
-            self._termination(self) #XXX: call at generation 0 or always?
-        # impose the evaluation limits
-        self._SetEvaluationLimits()
-
-        # the main optimization loop
-        while not self.CheckTermination() and not self._EARLYEXIT:
-            self.Step(**settings)
-            if callback is not None:
-                callback(self.bestSolution)
-        else: self._exitMain()
-
-        # handle signal interrupts
-        signal.signal(signal.SIGINT,signal.default_int_handler)
-
-        # log any termination messages
-        msg = self.CheckTermination(disp=disp, info=True)
-        if msg: self._stepmon.info('STOP("%s")' % msg)
-        # save final state
-        self.__save_state(force=True)
+    def _flush_monitors(self):
+        """write any buffered output of the generation and evaluation monitors"""
+        for monitor in (self._stepmon, self._evalmon):
+            if hasattr(monitor, 'flush'): monitor.flush()
         return
 
     # extensions to the solver interface
+    stats = property(__stats )
     evaluations = property(__evaluations )
     generations = property(__generations )
     energy_history = property(__energy_history,__set_energy_history )
@@ -0,0 +1,591 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+"""
+benchmarks: timing and solution quality of mystic's solvers
+
+Each solver in `mystic.solvers` is run on the test functions provided by
+`mystic.models`, at one or more dimensions.  Each run is seeded, so the number
+of evaluations and the solution are reproducible on a given platform, and
+records the following::
+    solver      -- name of the solver
+    problem     -- name of the test function
+    dim         -- dimensionality of the problem
+    seconds     -- wall time of the solve
+    evaluations -- number of function evaluations (summed over the nested
+                   solvers of an ensemble solver)
+    rate        -- function evaluations per second
+    memory      -- peak resident memory of the process, in MB
+    energy      -- the lowest cost found
+    error       -- the difference between the lowest cost found and the
+                   known minimum of the test function
+
+The records may be saved to (and loaded from) a JSON file, and compared
+against a saved baseline, where a run is reported as a regression if it
+is slower, uses more evaluations or memory, or finds a worse solution.
+
+
+Usage
+=====
+
+A typical benchmarking session will roughly follow this example:
+
+    >>> from mystic import benchmarks
+    >>>
+    >>> # run the suite, and save the results as a baseline
+    >>> results = benchmarks.suite()
+    >>> benchmarks.save(results, 'baseline.json')
+    >>>
+    >>> # (after a change) run the suite, and check for regressions
+    >>> results = benchmarks.suite()
+    >>> for regression in benchmarks.compare(results, 'baseline.json'):
+    >>>     print regression
+
+or equivalently, from the command line:
+
+    $ python -m mystic.benchmarks --save baseline.json
+    $ python -m mystic.benchmarks --compare baseline.json
+
+By default, each run is made in a new worker process, so the peak memory is
+that of the given run.  Timings should only be compared against a baseline
+made on the same machine.
+
+
+Parallel Scaling
+================
+
+The map solvers (DifferentialEvolutionSolver2 and LatticeSolver) are also
+run on a synthetic cost function of a given duration, serially and with each
+of the available worker pools, for a range of worker counts.  The strong and
+weak scaling efficiency, the overhead of each map call, and the bytes
+serialized per evaluation show where the overhead of the map outweighs the
+gain from running in parallel:
+
+    >>> records = benchmarks.scaling(nodes=(1,2,4), durations=(0.001,0.01))
+
+or equivalently, from the command line:
+
+    $ python -m mystic.benchmarks --scaling --nodes 1,2,4 --durations 0.001,0.01
+"""
+__all__ = ['problems', 'solvers', 'run', 'suite', 'save', 'load', 'compare',
+           'pools', 'scaling']
+
+from timeit import default_timer as _timer
+
+
+class Problem(object):
+    """a test function, with its bounds and known minimum"""
+    def __init__(self, function, dims, lower, upper, minimum=0.0, \
+                 scalable=False, maxdim=None):
+        """
+Inputs::
+    function -- the cost function
+    dims     -- the dimensions run by default
+    lower    -- the lower bound on each parameter
+    upper    -- the upper bound on each parameter
+    minimum  -- the known minimum of the cost function
+    scalable -- if True, the function takes any dimension up to maxdim,
+                otherwise only the given dims are allowed
+    maxdim   -- the largest dimension of a scalable function
+        """
+        self.function = function
+        self.dims = tuple(dims)
+        self.lower = lower
+        self.upper = upper
+        self.minimum = minimum
+        self.scalable = scalable
+        self.maxdim = maxdim
+        return
+    def allows(self, dim):
+        """True if the function can be run at the given dimension"""
+        if not self.scalable: return dim in self.dims
+        return dim > 0 and (self.maxdim is None or dim <= self.maxdim)
+    pass
+
+
+def _problems():
+    """build the test problems"""
+    from mystic.models import rosen, griewangk, corana, zimmermann
+    from mystic.models import shekel, fosc3d
+    from mystic.models.poly import chebyshev8cost
+    return {
+        'rosen':      Problem(rosen, (2, 4, 8), -5., 5., scalable=True),
+        'griewangk':  Problem(griewangk, (2, 10), -400., 400., \
+                              scalable=True, maxdim=10),
+        'corana':     Problem(corana, (4,), -100., 100.),
+        'zimmermann': Problem(zimmermann, (2,), 0., 100.),
+        'shekel':     Problem(shekel, (2,), -50., 50.),
+        'fosc3d':     Problem(fosc3d, (2,), -2., 2., -4.5010697425),
+        'chebyshev8': Problem(chebyshev8cost, (9,), -100., 100.),
+    }
+
+# the test problems, by name
+problems = _all_problems = _problems()
+
+# the solvers, by name
+solvers = _all_solvers = \
+          ('DifferentialEvolutionSolver', 'DifferentialEvolutionSolver2',
+           'AsyncDifferentialEvolutionSolver', 'NelderMeadSimplexSolver',
+           'PowellDirectionalSolver', 'BuckshotSolver', 'LatticeSolver',
+           'ClusterSolver')
+
+
+def _configure(name, dim, lower, upper, evaluations):
+    """build and configure the named solver; returns (solver, termination,
+and the settings for Solve), where termination=None is the solver's default"""
+    import mystic.solvers as _solvers
+    from mystic.termination import ChangeOverGeneration as COG
+    from mystic.strategy import Best1Exp
+    from mystic.abstract_ensemble_solver import AbstractEnsembleSolver
+    lower, upper = [lower]*dim, [upper]*dim
+    Solver = getattr(_solvers, name)
+    settings = {}
+    if issubclass(Solver, AbstractEnsembleSolver):
+        if name == 'LatticeSolver': # 8 grid points (or fewer)
+            nbins = tuple([2]*min(dim, 3) + [1]*max(0, dim - 3))
+            solver = Solver(dim, nbins)
+        else:
+            solver = Solver(dim, 8)
+        nested = _solvers.NelderMeadSimplexSolver(dim)
+        nested.SetEvaluationLimits(evaluations=evaluations)
+        solver.SetNestedSolver(nested)
+        termination = None
+    elif name.startswith('DifferentialEvolution') or \
+         name.startswith('AsyncDifferentialEvolution'):
+        solver = Solver(dim, 10*dim)
+        solver.SetRandomInitialPoints(lower, upper)
+        termination = COG(1e-8, 100)
+        settings['strategy'] = Best1Exp
+    else: # a local solver, from a random point
+        solver = Solver(dim)
+        solver.SetRandomInitialPoints(lower, upper)
+        termination = None
+    solver.SetStrictRanges(lower, upper)
+    solver.SetEvaluationLimits(evaluations=evaluations)
+    return solver, termination, settings
+
+def _peak_memory():
+    """get the peak resident memory of the process, in MB"""
+    try:
+        import resource
+    except ImportError: # not available on windows
+        return None
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin': return peak / 1048576. # bytes
+    return peak / 1024. # kilobytes
+
+
+def run(solver, problem, dim=None, seed=123, evaluations=None):
+    """run the named solver on the named problem, returning a record (dict)
+
+Inputs::
+    solver      -- name of a solver, as found in mystic.solvers
+    problem     -- name of a test problem (see benchmarks.problems)
+    dim         -- dimensionality [default = first of the problem's dims]
+    seed        -- seed for the random number generators
+    evaluations -- limit on function evaluations (of each nested solver,
+                   for an ensemble solver)  [default = 10000 * dim]
+    """
+    from mystic.tools import random_seed
+    _problem = problems[problem]
+    if dim is None: dim = _problem.dims[0]
+    if not _problem.allows(dim):
+        raise ValueError, "%s can not be run with dim=%s" % (problem, dim)
+    if evaluations is None: evaluations = 10000 * dim
+    random_seed(seed)
+    _solver, termination, settings = _configure(solver, dim, _problem.lower, \
+                                                _problem.upper, evaluations)
+    start = _timer()
+    _solver.Solve(_problem.function, termination, **settings)
+    seconds = _timer() - start
+    calls = getattr(_solver, '_total_evals', None) # ensemble solvers
+    if calls is None: calls = _solver.evaluations
+    energy = float(_solver.bestEnergy)
+    return {'solver': solver, 'problem': problem, 'dim': dim,
+            'seconds': seconds, 'evaluations': calls,
+            'rate': calls / seconds if seconds else None,
+            'memory': _peak_memory(), 'energy': energy,
+            'error': energy - _problem.minimum}
+
+
+def _run(args):
+    """run a benchmark from a tuple of arguments"""
+    return run(*args)
+
+def suite(solvers=None, problems=None, dims=None, seed=123, \
+          evaluations=None, isolate=True, verbose=False):
+    """run each of the solvers on each of the problems, returning the records
+
+Inputs::
+    solvers     -- names of the solvers  [default = all solvers]
+    problems    -- names of the problems  [default = all problems]
+    dims        -- dimensions to run on the scalable problems  [default =
+                   the dims of each problem]
+    seed        -- seed for the random number generators
+    evaluations -- limit on function evaluations  [see run]
+    isolate     -- if True, run each benchmark in a new worker process
+    verbose     -- if True, print each record as it is completed
+    """
+    if solvers is None: solvers = _all_solvers
+    if problems is None: problems = sorted(_all_problems)
+    jobs = []
+    for problem in problems:
+        _problem = _all_problems[problem]
+        if dims is None or not _problem.scalable:
+            _dims = _problem.dims
+        else:
+            _dims = [dim for dim in dims if _problem.allows(dim)]
+        for dim in _dims:
+            for solver in solvers:
+                jobs.append((solver, problem, dim, seed, evaluations))
+    pool = None
+    if isolate:
+        from multiprocessing import Pool
+        pool = Pool(1, maxtasksperchild=1)
+    results = []
+    try:
+        for job in jobs:
+            result = pool.apply(_run, (job,)) if pool else _run(job)
+            if verbose: print _format(result)
+            results.append(result)
+    finally:
+        if pool is not None:
+            pool.close(); pool.join()
+    return results
+
+
+def _format(record):
+    """format a record as a line of text"""
+    memory = record['memory']
+    memory = '-' if memory is None else '%.1f' % memory
+    return "%-32s %-10s %3d %9.3fs %9d evals %10.0f/s %7sMB  error=%.3g" % \
+           (record['solver'], record['problem'], record['dim'],
+            record['seconds'], record['evaluations'], record['rate'] or 0,
+            memory, record['error'])
+
+def save(results, filename):
+    """save the records to a JSON file, with the platform details"""
+    import json, platform, numpy
+    data = {'python': platform.python_version(), 'numpy': numpy.__version__,
+            'platform': platform.platform(), 'results': results}
+    f = open(filename, 'w')
+    try:
+        json.dump(data, f, indent=1, sort_keys=True)
+    finally:
+        f.close()
+    return
+
+def load(filename):
+    """load the records from a JSON file"""
+    import json
+    f = open(filename)
+    try:
+        return json.load(f)['results']
+    finally:
+        f.close()
+
+def compare(results, baseline, time=0.5, evaluations=0.0, memory=0.5, \
+            error=1e-6):
+    """compare the records against baseline records (or a baseline file),
+returning a message for each regression
+
+Inputs::
+    results     -- list of records (see run)
+    baseline    -- list of baseline records, or name of a baseline file
+    time        -- allowed fractional increase in wall time
+    evaluations -- allowed fractional increase in function evaluations
+    memory      -- allowed fractional increase in peak memory
+    error       -- allowed increase in the error of the solution
+
+Records without a matching baseline record (by solver, problem, and dim)
+are not compared."""
+    if isinstance(baseline, basestring): baseline = load(baseline)
+    key = lambda record: (record['solver'], record['problem'], record['dim'])
+    baseline = dict((key(record), record) for record in baseline)
+    limits = (('seconds', time), ('evaluations', evaluations), \
+              ('memory', memory))
+    regressions = []
+    for record in results:
+        base = baseline.get(key(record))
+        if base is None: continue
+        name = "%s on %s (dim=%s)" % key(record)
+        for field, tol in limits:
+            new, old = record[field], base[field]
+            if new is None or old is None: continue
+            if new > old * (1 + tol):
+                regressions.append("%s: %s increased from %s to %s" % \
+                                   (name, field, old, new))
+        if record['error'] > base['error'] + error:
+            regressions.append("%s: error increased from %s to %s" % \
+                               (name, base['error'], record['error']))
+    return regressions
+
+
+class _Synthetic(object):
+    """a cost function that takes the given time for each evaluation"""
+    def __init__(self, seconds=0.0, busy=True):
+        """
+Inputs::
+    seconds -- time taken by each evaluation
+    busy    -- if True, spin the processor (like a cost implemented in
+               python), otherwise sleep (like a cost that releases the GIL)
+        """
+        self.seconds = seconds
+        self.busy = busy
+        return
+    def __call__(self, x):
+        if self.busy:
+            end = _timer() + self.seconds
+            while _timer() < end: pass
+        elif self.seconds:
+            import time
+            time.sleep(self.seconds)
+        return float(sum(xi*xi for xi in x))
+    pass
+
+
+def pools():
+    """get the available worker pools, as {name: pool class}
+
+The thread and process pools are always available, while the pathos pool
+is included if pathos is installed."""
+    from mystic.threads import ThreadPool
+    from mystic.multiprocess import ProcessPool
+    _pools = {'threads': ThreadPool, 'processes': ProcessPool}
+    try:
+        from pathos.multiprocessing import ProcessingPool
+        _pools['pathos'] = ProcessingPool
+    except ImportError:
+        pass
+    return _pools
+
+_available_pools = pools
+
+def _shares_memory(pool):
+    """True if the pool evaluates in this process (i.e. does not serialize)"""
+    from mystic.threads import ThreadPool
+    return pool is None or isinstance(pool, ThreadPool)
+
+def _scaling_solver(name, dim, size, generations):
+    """build a map solver that does a fixed amount of work for the given size"""
+    from mystic.solvers import DifferentialEvolutionSolver2, LatticeSolver
+    from mystic.solvers import NelderMeadSimplexSolver
+    from mystic.termination import VTR
+    never = VTR(-1.) # never met; the solvers run to their generation limits
+    lower, upper = [-5.]*dim, [5.]*dim
+    if name == 'DifferentialEvolutionSolver2': # size is the population
+        solver = DifferentialEvolutionSolver2(dim, size)
+        solver.SetRandomInitialPoints(lower, upper)
+        solver.SetEvaluationLimits(generations=generations)
+        solver.SetTermination(never)
+    elif name == 'LatticeSolver': # size is the number of nested solvers
+        solver = LatticeSolver(dim, (size,) + (1,)*(dim - 1))
+        solver.SetStrictRanges(lower, upper) # the bounds of the lattice
+        nested = NelderMeadSimplexSolver(dim)
+        nested.SetEvaluationLimits(generations=generations)
+        nested.SetTermination(never)
+        solver.SetNestedSolver(nested)
+    else:
+        raise ValueError, "scaling is not measured for %s" % name
+    return solver
+
+def _counted(pool):
+    """get (map, count) for a worker pool, where count() returns the bytes
+serialized by the map so far
+
+The bytes are counted by a ProcessPool, and are zero for a pool that does
+not serialize.  For other pools, the bytes of the arguments and the results,
+serialized with dill, are counted."""
+    if _shares_memory(pool): return (pool and pool.map), lambda: 0
+    if hasattr(pool, 'sent') and hasattr(pool, 'received'):
+        return pool.map, lambda: pool.sent + pool.received
+    import dill
+    from itertools import izip
+    nbytes = [0]
+    def map(f, *args, **kwds):
+        results = pool.map(f, *args, **kwds)
+        nbytes[0] += sum(len(dill.dumps(arg, -1)) for arg in izip(*args))
+        nbytes[0] += sum(len(dill.dumps(result, -1)) for result in results)
+        return results
+    return map, lambda: nbytes[0]
+
+def _overhead(map, nodes, size, dim, cost, repeat=3):
+    """get the time in a map call that is not spent evaluating the cost"""
+    x = [[0.5]*dim] * size
+    map(cost, x) # start the workers
+    seconds = []
+    for i in range(repeat):
+        start = _timer()
+        map(cost, x)
+        seconds.append(_timer() - start)
+    ideal = -(-size // nodes) * cost.seconds # the cost, with perfect balance
+    return min(seconds) - ideal
+
+def scaling(solvers=('DifferentialEvolutionSolver2', 'LatticeSolver'), \
+            pools=None, nodes=(1, 2, 4), durations=(0.0, 0.001, 0.01), \
+            size=8, dim=4, generations=5, busy=True, seed=123, verbose=False):
+    """measure how the map solvers scale with the number of workers
+
+Inputs::
+    solvers     -- names of the map solvers
+    pools       -- names of the worker pools  [default = all available
+                   pools (see benchmarks.pools)]
+    nodes       -- numbers of workers
+    durations   -- seconds taken by each evaluation of the synthetic cost
+    size        -- population size (or number of nested solvers) for one
+                   worker; for weak scaling, the size grows with the workers
+    dim         -- dimensionality of the synthetic cost
+    generations -- number of generations (of the nested solvers, for an
+                   ensemble solver)
+    busy        -- if True, the cost spins the processor, otherwise it sleeps
+    seed        -- seed for the random number generators
+    verbose     -- if True, print each record as it is completed
+
+Each solver is first run serially (with python_map), and then with each pool
+and number of workers, for a fixed size (strong scaling) and for a size that
+grows with the workers (weak scaling).  The solvers do a fixed amount of work
+for each size (i.e. they run to a fixed number of generations).  Returns a
+list of records (dict), holding::
+    solver, pool, nodes, duration, mode ('serial', 'strong', or 'weak'),
+    size, seconds, evaluations
+    speedup    -- the serial time for the same work, divided by seconds
+    efficiency -- speedup / nodes
+    overhead   -- seconds in each map call (of size evaluations, between
+                  calls to the same function) not spent evaluating the cost
+    bytes      -- bytes serialized per function evaluation, by the pool in
+                  each call to map (see ProcessPool.sent and received);
+                  for other pools that run in another process, the size of
+                  the arguments and results when serialized with dill
+    """
+    from mystic.tools import random_seed
+    available = _available_pools()
+    if pools is None: pools = sorted(available)
+    records = []
+    def solve(name, size, pool=None):
+        random_seed(seed)
+        solver = _scaling_solver(name, dim, size, generations)
+        mapper, count = _counted(pool)
+        if mapper is not None: solver.SetMapper(mapper)
+        nbytes = count()
+        start = _timer()
+        solver.Solve(cost)
+        seconds = _timer() - start
+        nbytes = count() - nbytes
+        calls = getattr(solver, '_total_evals', None) # ensemble solvers
+        if calls is None: calls = solver.evaluations
+        if name == 'DifferentialEvolutionSolver2' and not calls:
+            calls = size * (generations + 1) # not counted in other processes
+        return seconds, calls, nbytes / float(calls)
+    def record(**kwds):
+        if verbose: print _format_scaling(kwds)
+        records.append(kwds)
+        return
+    for duration in durations:
+        cost = _Synthetic(duration, busy)
+        serial = {} # serial time for each solver
+        from mystic.python_map import python_map
+        overhead = _overhead(python_map, 1, size, dim, cost)
+        for name in solvers:
+            seconds, calls, nbytes = solve(name, size)
+            serial[name] = seconds
+            record(solver=name, pool='serial', nodes=1, duration=duration, \
+                   mode='serial', size=size, seconds=seconds, \
+                   evaluations=calls, speedup=1.0, efficiency=1.0, \
+                   overhead=overhead, bytes=nbytes)
+        for pool_name in pools:
+            for n in nodes:
+                pool = available[pool_name](nodes=n)
+                try:
+                    overhead = _overhead(pool.map, n, size, dim, cost)
+                    for name in solvers:
+                        for mode, _size in (('strong', size), ('weak', size*n)):
+                            seconds, calls, nbytes = solve(name, _size, pool)
+                            speedup = serial[name] / seconds
+                            if mode == 'weak': speedup *= n # scaled speedup
+                            record(solver=name, pool=pool_name, nodes=n, \
+                                   duration=duration, mode=mode, \
+                                   size=_size, seconds=seconds, \
+                                   evaluations=calls, speedup=speedup, \
+                                   efficiency=speedup / n, \
+                                   overhead=overhead, bytes=nbytes)
+                finally:
+                    pool.close(); pool.join()
+    return records
+
+def _format_scaling(record):
+    """format a scaling record as a line of text"""
+    return "%-28s %-9s %2d %7.4fs %-6s %4d %8.3fs %6d evals speedup=%5.2f" \
+           " efficiency=%4.2f overhead=%.2gs bytes/eval=%.0f" % \
+           (record['solver'], record['pool'], record['nodes'],
+            record['duration'], record['mode'], record['size'],
+            record['seconds'], record['evaluations'], record['speedup'],
+            record['efficiency'], record['overhead'], record['bytes'])
+
+
+if __name__ == '__main__':
+    #XXX: note that 'argparse' is new as of python2.7
+    from optparse import OptionParser
+    import sys
+    parser = OptionParser(usage="python -m mystic.benchmarks [options]")
+    parser.add_option("-s","--solvers",action="store",dest="solvers",\
+                      metavar="STR",default=None,
+                      help="comma-separated names of the solvers")
+    parser.add_option("-p","--problems",action="store",dest="problems",\
+                      metavar="STR",default=None,
+                      help="comma-separated names of the problems")
+    parser.add_option("-d","--dims",action="store",dest="dims",\
+                      metavar="STR",default=None,
+                      help="comma-separated dimensions of scalable problems")
+    parser.add_option("--save",action="store",dest="save",\
+                      metavar="FILE",default=None,
+                      help="save the results to a JSON file")
+    parser.add_option("--compare",action="store",dest="compare",\
+                      metavar="FILE",default=None,
+                      help="compare the results to a saved baseline")
+    parser.add_option("--inline",action="store_false",dest="isolate",\
+                      default=True,
+                      help="run in this process (peak memory is cumulative)")
+    parser.add_option("--scaling",action="store_true",dest="scaling",\
+                      default=False,
+                      help="measure the parallel scaling of the map solvers")
+    parser.add_option("--pools",action="store",dest="pools",\
+                      metavar="STR",default=None,
+                      help="comma-separated names of the worker pools")
+    parser.add_option("--nodes",action="store",dest="nodes",\
+                      metavar="STR",default="1,2,4",
+                      help="comma-separated numbers of workers")
+    parser.add_option("--durations",action="store",dest="durations",\
+                      metavar="STR",default="0,0.001,0.01",
+                      help="comma-separated seconds for each evaluation")
+    options, args = parser.parse_args()
+    split = lambda text: None if text is None else text.split(',')
+    dims = split(options.dims)
+    if dims is not None: dims = [int(dim) for dim in dims]
+
+    if options.scaling:
+        kwds = {}
+        if options.solvers: kwds['solvers'] = split(options.solvers)
+        results = scaling(pools=split(options.pools), \
+                          nodes=[int(n) for n in split(options.nodes)], \
+                          durations=[float(t) for t in \
+                                     split(options.durations)], \
+                          verbose=True, **kwds)
+        if options.save: save(results, options.save)
+        sys.exit(0)
+
+    results = suite(split(options.solvers), split(options.problems), dims, \
+                    isolate=options.isolate, verbose=True)
+    if options.save:
+        save(results, options.save)
+    if options.compare:
+        regressions = compare(results, options.compare)
+        for regression in regressions:
+            print "REGRESSION: %s" % regression
+        if regressions: sys.exit(1)
+
+
+# end of file
@@ -53,6 +53,7 @@ Minimal function interface to optimization routines::
 The corresponding solvers built on mystic's AbstractSolver are::
     DifferentialEvolutionSolver  -- a DE solver
     DifferentialEvolutionSolver2 -- Storn & Price's DE solver
+    AsyncDifferentialEvolutionSolver -- an asynchronous steady-state DE solver
 
 Mystic solver behavior activated in diffev and diffev2::
     - EvaluationMonitor = Monitor()
@@ -142,16 +143,34 @@ A Practical Approach to Global Optimization. Springer, 1st Edition, 2005
 
 """
 __all__ = ['DifferentialEvolutionSolver','DifferentialEvolutionSolver2',\
-           'diffev','diffev2']
+           'AsyncDifferentialEvolutionSolver','diffev','diffev2']
 
 from mystic.tools import wrap_function, unpair
-from mystic.tools import wrap_bounds, wrap_penalty
+from mystic.tools import wrap_bounds, wrap_penalty, wrap_batch, wrap_cache
 
 from mystic.abstract_solver import AbstractSolver
 from mystic.abstract_map_solver import AbstractMapSolver
 
 from numpy import asfarray
 
+def _genealogy(NP, records=None):
+    """build genealogy records for a population of size NP, where each
+candidate keeps (at most) the last 'records' accepted trial solutions"""
+    from collections import deque
+    return [deque(maxlen=records) for j in range(NP)]
+
+def _write_genealogy(solver):
+    """append any pending genealogy records to the genealogy file"""
+    pending = solver._genealogy_pending
+    if not pending: return
+    f = open(solver._genealogy_file, 'a')
+    try:
+        f.writelines("  %s   %s\n" % (step, x.tolist()) for (step,x) in pending)
+    finally:
+        f.close()
+    del pending[:]
+    return
+
 class DifferentialEvolutionSolver(AbstractSolver):
     """
 Differential Evolution optimization.
@@ -167,7 +186,9 @@ All important class members are inherited from AbstractSolver.
         """
         NP = max(NP, dim, 4) #XXX: raise Error if npop <= 4?
         AbstractSolver.__init__(self,dim,npop=NP)
-        self.genealogy     = [ [] for j in range(NP)]
+        self._genealogy_file    = None # file for all genealogy records
+        self._genealogy_pending = []   # records not yet written to file
+        self.genealogy     = _genealogy(NP, 100) # keep the last 100 records
         self.scale         = 0.8
         self.probability   = 0.9
         ftol = 5e-3
@@ -191,23 +212,50 @@ All important class members are inherited from AbstractSolver.
 #               self.trialSolution[i] = random.uniform(base[i],max[i])
 #       return
 
+    def SetGenealogy(self, records=100, filename=None):
+        """set the number of genealogy records kept for each candidate
+
+input::
+    - records = maximum number of accepted trial solutions kept in memory
+      for each candidate (records=None keeps all; records=0 keeps none)
+    - filename = name of file in which to append all accepted trial
+      solutions, written as '(generation, id)  parameters' at each step
+
+note::
+    SetGenealogy(0) will disable genealogy recording"""
+        if records is not None and records < 0:
+            raise ValueError, "records must be a non-negative integer"
+        self.genealogy = _genealogy(self.nPop, records)
+        self._genealogy_file = filename
+        self._genealogy_pending = []
+        return
+
     def UpdateGenealogyRecords(self, id, newchild):
         """
-Override me for more refined behavior. Currently all changes
-are logged.
+Override me for more refined behavior. Currently the last changes
+are logged, as configured with SetGenealogy.
         """
         self.genealogy[id].append(newchild)
+        if self._genealogy_file:
+            self._genealogy_pending.append(((len(self._stepmon), id), newchild))
         return
 
     def _RegisterObjective(self, cost, ExtraArgs=None):
         """decorate cost function with bounds, penalties, monitors, etc"""
         if ExtraArgs == None: ExtraArgs = ()
-        self._fcalls, cost = wrap_function(cost, ExtraArgs, self._evalmon)
+        cost = self._timed('cost', cost)
+        if self._batch: cost = wrap_batch(cost)
+        self._fcalls, cost = wrap_function(cost, ExtraArgs, \
+                                           self._timed('monitors', self._evalmon))
+        if self._cache is not None:
+            self._cached, cost = wrap_cache(cost, self._cache)
+            cost = self._timed('cache', cost)
         if self._useStrictRange:
             for i in range(self.nPop):
                 self.population[i] = self._clipGuessWithinRangeBoundary(self.population[i])
             cost = wrap_bounds(cost, self._strictMin, self._strictMax)
-        cost = wrap_penalty(cost, self._penalty)
+            cost = self._timed('bounds', cost)
+        cost = wrap_penalty(cost, self._timed('penalty', self._penalty))
         # hold on to the 'wrapped' cost function
         self._cost = (cost, ExtraArgs)
         return cost
@@ -217,6 +265,9 @@ are logged.
         Note that ExtraArgs should be a *tuple* of extra arguments"""
         # HACK to enable not explicitly calling _RegisterObjective
         cost = self._bootstrap_decorate(cost, ExtraArgs)
+        # time the strategy and constraints, if profiling
+        if strategy: strategy = self._timed('strategy', strategy)
+        constraints = self._timed('constraints', self._constraints)
 
         if not len(self._stepmon): # do generation = 0
             self.population[0] = asfarray(self.population[0])
@@ -232,7 +283,7 @@ are logged.
                 # generate trialSolution (within valid range)
                 strategy(self, candidate)
             # apply constraints
-            self.trialSolution[:] = self._constraints(self.trialSolution)
+            self.trialSolution[:] = constraints(self.trialSolution)
             # apply penalty
            #trialEnergy = self._penalty(self.trialSolution)
             # calculate cost
@@ -242,13 +293,15 @@ are logged.
                 # New low for this candidate
                 self.popEnergy[candidate] = trialEnergy
                 self.population[candidate][:] = self.trialSolution
-                self.UpdateGenealogyRecords(candidate, self.trialSolution[:])
+                self.UpdateGenealogyRecords(candidate, self.trialSolution.copy())
 
                 # Check if all-time low
                 if trialEnergy < self.bestEnergy:
                     self.bestEnergy = trialEnergy
                     self.bestSolution[:] = self.trialSolution
 
+        # write any pending genealogy records
+        _write_genealogy(self)
         # log bestSolution and bestEnergy (includes penalty)
         self._stepmon(self.bestSolution[:], self.bestEnergy, self.id)
         # if savefrequency matches, then save state
@@ -326,41 +379,75 @@ All important class members are inherited from AbstractSolver.
         """
         #XXX: raise Error if npop <= 4?
         super(DifferentialEvolutionSolver2, self).__init__(dim, npop=NP)
-        self.genealogy     = [ [] for j in range(NP)]
+        self._genealogy_file    = None # file for all genealogy records
+        self._genealogy_pending = []   # records not yet written to file
+        self.genealogy     = _genealogy(NP, 100) # keep the last 100 records
         self.scale         = 0.8
         self.probability   = 0.9
         
+    def SetGenealogy(self, records=100, filename=None):
+        """set the number of genealogy records kept for each candidate
+
+input::
+    - records = maximum number of accepted trial solutions kept in memory
+      for each candidate (records=None keeps all; records=0 keeps none)
+    - filename = name of file in which to append all accepted trial
+      solutions, written as '(generation, id)  parameters' at each step
+
+note::
+    SetGenealogy(0) will disable genealogy recording"""
+        if records is not None and records < 0:
+            raise ValueError, "records must be a non-negative integer"
+        self.genealogy = _genealogy(self.nPop, records)
+        self._genealogy_file = filename
+        self._genealogy_pending = []
+        return
+
     def UpdateGenealogyRecords(self, id, newchild):
         """
-Override me for more refined behavior. Currently all changes
-are logged.
+Override me for more refined behavior. Currently the last changes
+are logged, as configured with SetGenealogy.
         """
         self.genealogy[id].append(newchild)
+        if self._genealogy_file:
+            self._genealogy_pending.append(((len(self._stepmon), id), newchild))
         return
 
     def _RegisterObjective(self, cost, ExtraArgs=None):
         """decorate cost function with bounds, penalties, monitors, etc"""
         if ExtraArgs == None: ExtraArgs = ()
        #FIXME: EvaluationMonitor fails for MPI, throws error for 'pp'
-        from python_map import python_map
-        if self._map != python_map:
+        batch = self._batch # evaluate the trial population in a single call
+        if not self._shared_map() and not batch:
             self._fcalls = [0] #FIXME: temporary patch for removing the following line
         else:
-            self._fcalls, cost = wrap_function(cost, ExtraArgs, self._evalmon)
+            cost = self._timed('cost', cost)
+            self._fcalls, cost = wrap_function(cost, ExtraArgs, \
+                                 self._timed('monitors', self._evalmon), batch, \
+                                 self._map_lock())
+            from python_map import python_map
+            if self._cache is not None and not batch and self._map == python_map:
+                self._cached, cost = wrap_cache(cost, self._cache)
+                cost = self._timed('cache', cost)
         if self._useStrictRange:
             for i in range(self.nPop):
                 self.population[i] = self._clipGuessWithinRangeBoundary(self.population[i])
-            cost = wrap_bounds(cost, self._strictMin, self._strictMax)
-        cost = wrap_penalty(cost, self._penalty)
+            cost = wrap_bounds(cost, self._strictMin, self._strictMax, batch)
+            cost = self._timed('bounds', cost)
+        cost = wrap_penalty(cost, self._timed('penalty', self._penalty), batch)
         # hold on to the 'wrapped' cost function
         self._cost = (cost, ExtraArgs)
         return cost
 
-    def Step(self, cost=None, ExtraArgs=None, strategy=None, **kwds):
+    def Step(self, cost=None, ExtraArgs=None, strategy=None, vectorize=False,
+                                                                 **kwds):
         """perform a single optimization iteration
         Note that ExtraArgs should be a *tuple* of extra arguments"""
         # HACK to enable not explicitly calling _RegisterObjective
         cost = self._bootstrap_decorate(cost, ExtraArgs)
+        # time the strategy and constraints, if profiling
+        if strategy: strategy = self._timed('strategy', strategy)
+        constraints = self._timed('constraints', self._constraints)
 
         if not len(self._stepmon): # do generation = 0
             self.population[0] = asfarray(self.population[0])
@@ -372,29 +459,39 @@ are logged.
             if not len(self._stepmon):
                 # generate trialSolution (within valid range)
                 self.trialSolution[candidate][:] = self.population[candidate]
-            if strategy:
+            if strategy and not vectorize:
                 # generate trialSolution (within valid range)
                 strategy(self, candidate)
+        if strategy and vectorize:
+            # generate the entire trial population at once
+            strategy(self)
+
+        for candidate in range(self.nPop):
             # apply constraints
-            self.trialSolution[candidate][:] = self._constraints(self.trialSolution[candidate])
+            self.trialSolution[candidate][:] = constraints(self.trialSolution[candidate])
 
         # apply penalty
        #trialEnergy = map(self._penalty, self.trialSolution)#,**self._mapconfig)
         # calculate cost
-        trialEnergy = self._map(cost, self.trialSolution, **self._mapconfig)
+        if self._batch:
+            trialEnergy = cost(self.trialSolution)
+        else:
+            trialEnergy = self._map(cost, self.trialSolution, **self._mapconfig)
 
         for candidate in range(self.nPop):
             if trialEnergy[candidate] < self.popEnergy[candidate]:
                 # New low for this candidate
                 self.popEnergy[candidate] = trialEnergy[candidate]
                 self.population[candidate][:] = self.trialSolution[candidate]
-                self.UpdateGenealogyRecords(candidate, self.trialSolution[candidate][:])
+                self.UpdateGenealogyRecords(candidate, self.trialSolution[candidate].copy())
 
                 # Check if all-time low
                 if trialEnergy[candidate] < self.bestEnergy:
                     self.bestEnergy = trialEnergy[candidate]
                     self.bestSolution[:] = self.trialSolution[candidate]
 
+        # write any pending genealogy records
+        _write_genealogy(self)
         # log bestSolution and bestEnergy (includes penalty)
        #FIXME: StepMonitor works for 'pp'?
         self._stepmon(self.bestSolution[:], self.bestEnergy, self.id)
@@ -408,7 +505,8 @@ are logged.
         settings = super(DifferentialEvolutionSolver2, self)._process_inputs(kwds)
         from mystic.strategy import Best1Bin
         settings.update({\
-        'strategy':Best1Bin})#mutation strategy (see mystic.strategy)
+        'strategy':Best1Bin, #mutation strategy (see mystic.strategy)
+        'vectorize':False})  #generate the trial population at once
         probability=0.9      #potential for parameter cross-mutation
         scale=0.8            #multiplier for mutation impact
         [settings.update({i:j}) for (i,j) in kwds.items() if i in settings]
@@ -444,6 +542,9 @@ Further Inputs:
         [default = 0.9]
     ScalingFactor -- multiplier for the impact of mutations on the
         trial solution [default = 0.8]
+    vectorize -- if True, generate the entire trial population in a
+        single call to the strategy, using numpy array operations
+        [default = False]
     callback -- an optional user-supplied function to call after each
         iteration.  It is called as callback(xk), where xk is
         the current parameter vector.  [default = None]
@@ -454,6 +555,233 @@ Further Inputs:
         return 
 
 
+class AsyncDifferentialEvolutionSolver(DifferentialEvolutionSolver2):
+    """
+Differential Evolution optimization, using asynchronous steady-state updates.
+
+Alternate implementation:
+    - each candidate has one trial solution under evaluation at a time
+    - a candidate is replaced as soon as its trial is evaluated, and a new
+      trial is generated (from the current population) and submitted
+    - an iteration is complete when nPop trial solutions have been evaluated
+    - trials are not submitted beyond the evaluation limit, and the trials
+      still pending when Solve exits are collected (and counted)
+
+Use an asynchronous map, such as SetMapper(pool.amap), to keep all workers
+busy; trials are evaluated with one call to map per trial solution.  The
+evaluation cache (see SetCache) is not supported.
+    """
+    def __init__(self, dim, NP=4):
+        """
+Takes two initial inputs: 
+    dim  -- dimensionality of the problem
+    NP   -- size of the trial solution population. [requires: NP >= 4]
+
+All important class members are inherited from AbstractSolver.
+        """
+        super(AsyncDifferentialEvolutionSolver, self).__init__(dim, NP)
+        self._pending = [] # submitted (candidate, trial, result)
+        self._started = False # True after the initial population is submitted
+        self._poll = 1e-3 # seconds to wait between checks for results
+
+    def __getstate__(self):
+        # results of submitted trials are not saved
+        state = self.__dict__.copy()
+        state['_pending'] = []
+        return state
+
+    def SetCache(self, cache=None, maxsize=100, tol=None, archive=None):
+        """not supported, as trials are evaluated asynchronously by the map"""
+        if cache is not None:
+            raise NotImplementedError, "evaluations are not cached by %s" % \
+                                       self.__class__.__name__
+        super(AsyncDifferentialEvolutionSolver, self).SetCache(None)
+        return
+
+    def _RegisterObjective(self, cost, ExtraArgs=None):
+        """decorate cost function with bounds, penalties, monitors, etc"""
+        if ExtraArgs == None: ExtraArgs = ()
+        # evaluations are counted (and monitored) as results are collected
+        self._fcalls = [0]
+        cost = self._timed('cost', cost)
+        # each trial solution is evaluated alone
+        if self._batch: cost = wrap_batch(cost)
+        min = max = None
+        if self._useStrictRange:
+            for i in range(self.nPop):
+                self.population[i] = self._clipGuessWithinRangeBoundary(self.population[i])
+            min, max = self._strictMin, self._strictMax
+        cost = _async_cost(cost, ExtraArgs, \
+                           self._timed('penalty', self._penalty), min, max)
+        # hold on to the 'wrapped' cost function
+        self._cost = (cost, ExtraArgs)
+        return cost
+
+    def __submit(self, cost, candidate, strategy=None):
+        """generate and submit a trial solution for the given candidate;
+if strategy is None, submit the candidate itself (i.e. the initial population)"""
+        if strategy is None:
+            self.trialSolution[candidate][:] = self.population[candidate]
+        else:
+            # generate trialSolution (within valid range)
+            strategy(self, candidate)
+        # apply constraints
+        constraints = self._timed('constraints', self._constraints)
+        self.trialSolution[candidate][:] = constraints(self.trialSolution[candidate])
+        trial = self.trialSolution[candidate].copy()
+        result = self._map(cost, [trial], **self._mapconfig)
+        self._pending.append((candidate, trial, result))
+        return
+
+    def __submittable(self):
+        """True if a trial can be submitted within the evaluation limit"""
+        if self._maxfun is None: return True
+        return self._fcalls[0] + len(self._pending) < self._maxfun
+
+    def __collect(self):
+        """get (candidate, trial, result) for the first available result"""
+        import time
+        while True:
+            for i,(candidate, trial, result) in enumerate(self._pending):
+                # a result without 'ready' is taken (and waited for) in turn
+                if not hasattr(result, 'ready') or result.ready(): break
+            else:
+                # wait on the oldest result, checking the others periodically
+                result = self._pending[0][2]
+                if hasattr(result, 'wait'): result.wait(self._poll)
+                else: time.sleep(self._poll)
+                continue
+            del self._pending[i]
+            if hasattr(result, 'get'): result = result.get()
+            return candidate, trial, list(result)[0]
+
+    def __update(self, candidate, trial, fval, trialEnergy, evalmon):
+        """count and monitor the evaluation, and update the candidate"""
+        if fval is not None:
+            self._fcalls[0] += 1
+            evalmon(trial, fval)
+        if trialEnergy < self.popEnergy[candidate]:
+            # New low for this candidate
+            self.popEnergy[candidate] = trialEnergy
+            self.population[candidate][:] = trial
+            self.UpdateGenealogyRecords(candidate, trial)
+
+            # Check if all-time low
+            if trialEnergy < self.bestEnergy:
+                self.bestEnergy = trialEnergy
+                self.bestSolution[:] = trial
+        return
+
+    def Step(self, cost=None, ExtraArgs=None, strategy=None, **kwds):
+        """perform a single optimization iteration
+        Note that ExtraArgs should be a *tuple* of extra arguments"""
+        # HACK to enable not explicitly calling _RegisterObjective
+        cost = self._bootstrap_decorate(cost, ExtraArgs)
+
+        if not len(self._stepmon): # do generation = 0
+            self.population[0] = asfarray(self.population[0])
+            # decouple bestSolution from population and bestEnergy from popEnergy
+            self.bestSolution = self.population[0]
+            self.bestEnergy = self.popEnergy[0]
+        # use the default strategy, if none is given
+        if strategy is None:
+            from mystic.strategy import Best1Bin as strategy
+        # time the strategy and evaluation monitor, if profiling
+        strategy = self._timed('strategy', strategy)
+        evalmon = self._timed('monitors', self._evalmon)
+
+        initial = not self._started
+        if initial: # submit the initial population
+            for candidate in range(self.nPop):
+                self.__submit(cost, candidate)
+            self._started = True
+        else: # keep a trial solution submitted for each candidate
+            pending = set(candidate for (candidate,_,_) in self._pending)
+            for candidate in range(self.nPop):
+                if candidate not in pending and self.__submittable():
+                    self.__submit(cost, candidate, strategy)
+
+        for i in range(self.nPop):
+            if not self._pending: break # the evaluation limit is reached
+            # update the population with the next available result
+            candidate, trial, (fval, trialEnergy) = self.__collect()
+            self.__update(candidate, trial, fval, trialEnergy, evalmon)
+            # submit a new trial solution for the candidate, once the
+            # initial population has been evaluated
+            if not initial and self.__submittable():
+                self.__submit(cost, candidate, strategy)
+
+        # write any pending genealogy records
+        _write_genealogy(self)
+        # log bestSolution and bestEnergy (includes penalty)
+        self._stepmon(self.bestSolution[:], self.bestEnergy, self.id)
+        # if savefrequency matches, then save state
+        self._AbstractSolver__save_state()
+        return #XXX: call CheckTermination ?
+
+    def _exitMain(self, **kwds):
+        """cleanup upon exiting the main optimization loop"""
+        # collect (and count) the trials that are still being evaluated
+        evalmon = self._timed('monitors', self._evalmon)
+        while self._pending:
+            candidate, trial, (fval, trialEnergy) = self.__collect()
+            self.__update(candidate, trial, fval, trialEnergy, evalmon)
+        _write_genealogy(self)
+        return
+
+    def Solve(self, cost=None, termination=None, sigint_callback=None,
+                                                 ExtraArgs=None, **kwds):
+        """Minimize a function using asynchronous differential evolution.
+
+Description:
+
+    Uses a differential evolution algorith to find the minimum of
+    a function of one or more variables. This implementation replaces
+    each candidate as soon as its trial solution has been evaluated.
+
+Inputs:
+
+    cost -- the Python function or method to be minimized.
+
+Additional Inputs:
+
+    termination -- callable object providing termination conditions.
+    sigint_callback -- callback function for signal handler.
+    ExtraArgs -- extra arguments for cost.
+
+Further Inputs:
+
+    strategy -- the mutation strategy for generating new trial
+        solutions [default = Best1Bin]
+    CrossProbability -- the probability of cross-parameter mutations
+        [default = 0.9]
+    ScalingFactor -- multiplier for the impact of mutations on the
+        trial solution [default = 0.8]
+    callback -- an optional user-supplied function to call after each
+        iteration.  It is called as callback(xk), where xk is
+        the current parameter vector.  [default = None]
+    disp -- non-zero to print convergence messages.
+        """
+        super(AsyncDifferentialEvolutionSolver, self).Solve(cost, termination,\
+                                      sigint_callback, ExtraArgs, **kwds)
+        return
+
+
+def _async_cost(cost, args=(), penalty=None, min=None, max=None):
+    """build a function that returns (cost(x), cost(x) + penalty(x)), where
+(None, inf) is returned if x is outside the bounds defined by min and max"""
+    from numpy import asarray, any, inf
+    if min is not None: min = asarray(min)
+    if max is not None: max = asarray(max)
+    def function(x):
+        if min is not None and any(x < min): return None, inf
+        if max is not None and any(x > max): return None, inf
+        fval = cost(x, *args)
+        if penalty is None: return fval, fval
+        return fval, fval + penalty(x)
+    return function
+
+
 def diffev2(cost,x0,npop=4,args=(),bounds=None,ftol=5e-3,gtol=None,
             maxiter=None,maxfun=None,cross=0.9,scale=0.8,
             full_output=0,disp=1,retall=0,callback=None,**kwds):
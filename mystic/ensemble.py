@@ -16,6 +16,7 @@ becomes the target of the map function.
 The set of solvers built on mystic's AbstractEnsembleSolver are::
    LatticeSolver -- start from center of N grid points
    BuckshotSolver -- start from N random points in parameter space
+   ClusterSolver -- start from the N random points not in a known basin
 
 
 Usage
@@ -28,8 +29,9 @@ or an example of using LatticeSolver.
 All solvers included in this module provide the standard signal handling.
 For more information, see `mystic.mystic.abstract_solver`.
 """
-__all__ = ['LatticeSolver','BuckshotSolver']
+__all__ = ['LatticeSolver','BuckshotSolver','ClusterSolver']
 
+import numpy
 from mystic.tools import wrap_function
 
 from mystic.abstract_ensemble_solver import AbstractEnsembleSolver
@@ -48,6 +50,7 @@ Takes two initial inputs:
 All important class members are inherited from AbstractEnsembleSolver.
         """
         super(LatticeSolver, self).__init__(dim, nbins=nbins)
+        self._chunksize = 1024 # number of grid points sent to the mapper
         from mystic.termination import NormalizedChangeOverGeneration
         convergence_tol = 1e-4
         self._termination = NormalizedChangeOverGeneration(convergence_tol)
@@ -95,11 +98,11 @@ Further Inputs:
        #self._EARLYEXIT = False
 
        #FIXME: EvaluationMonitor fails for MPI, throws error for 'pp'
-        from python_map import python_map
-        if self._map != python_map:
+        if not self._shared_map():
             self._fcalls = [0] #FIXME: temporary patch for removing the following line
         else:
-            self._fcalls, cost = wrap_function(cost, ExtraArgs, self._evalmon)
+            self._fcalls, cost = wrap_function(cost, ExtraArgs, \
+                                 self._evalmon, lock=self._map_lock())
 
         #generate signal_handler
         self._generateHandler(sigint_callback) 
@@ -128,79 +131,25 @@ Further Inputs:
             step = abs(upper[i] - lower[i])/nbins[i]
             bins.append( [lower[i] + (j+0.5)*step for j in range(nbins[i])] )
 
-        # build a grid of starting points
-        from mystic.math import gridpts
-        initial_values = gridpts(bins)
-
-        # run optimizer for each grid point
-        from copy import deepcopy as copy
-        op = [copy(solver) for i in range(len(initial_values))]
-       #cf = [cost for i in range(len(initial_values))]
-       #vb = [verbose for i in range(len(initial_values))]
-        id = range(len(initial_values))
-
-        # generate the local_optimize function
-        def local_optimize(solver, x0, rank=None, disp=verbose):
-            solver.id = rank
-            solver.SetInitialPoints(x0)
-            if solver._useStrictRange: #XXX: always, settable, or sync'd ?
-                solver.SetStrictRanges(min=solver._strictMin, \
-                                       max=solver._strictMax) # or lower,upper ?
-            solver.Solve(cost, disp=disp)
-            return solver
-
-        # map:: solver = local_optimize(solver, x0, id, verbose)
-        results = self._map(local_optimize, op, initial_values, id, \
-                                                **self._mapconfig)
-
-        # save initial state
-        self._AbstractSolver__save_state()
-        # get the results with the lowest energy
-        self._bestSolver = results[0]
-        bestpath = self._bestSolver._stepmon
-        besteval = self._bestSolver._evalmon
-        self._total_evals = self._bestSolver.evaluations
-        for solver in results[1:]:
-            self._total_evals += solver.evaluations # add func evals
-            if solver.bestEnergy < self._bestSolver.bestEnergy:
-                self._bestSolver = solver
-                bestpath = solver._stepmon
-                besteval = solver._evalmon
-
-        # return results to internals
-        self.population = self._bestSolver.population #XXX: pointer? copy?
-        self.popEnergy = self._bestSolver.popEnergy #XXX: pointer? copy?
-        self.bestSolution = self._bestSolver.bestSolution #XXX: pointer? copy?
-        self.bestEnergy = self._bestSolver.bestEnergy
-        self.trialSolution = self._bestSolver.trialSolution #XXX: pointer? copy?
-        self._fcalls = self._bestSolver._fcalls #XXX: pointer? copy?
-        self._maxiter = self._bestSolver._maxiter
-        self._maxfun = self._bestSolver._maxfun
-
-        # write 'bests' to monitors  #XXX: non-best monitors may be useful too
-        self._stepmon = bestpath #XXX: pointer? copy?
-        self._evalmon = besteval #XXX: pointer? copy?
-       #from mystic.tools import isNull
-       #if isNull(bestpath):
-       #    self._stepmon = bestpath
-       #else:
-       #    for i in range(len(bestpath.y)):
-       #        self._stepmon(bestpath.x[i], bestpath.y[i], self.id)
-       #        #XXX: could apply callback here, or in exec'd code
-       #if isNull(besteval):
-       #    self._evalmon = besteval
-       #else:
-       #    for i in range(len(besteval.y)):
-       #        self._evalmon(besteval.x[i], besteval.y[i])
+        # iterate over chunks of the grid of starting points
+        from mystic.math.grid import igridpts
+        initial_values = igridpts(bins, self._chunksize)
+
+        # run optimizer for each starting point, collecting the results
+        self._AbstractEnsembleSolver__solve(cost, solver, initial_values, \
+                                            verbose, settings['callback'])
         #-------------------------------------------------------------
 
-        signal.signal(signal.SIGINT,signal.default_int_handler)
+        if self._handle_sigint: # (signals are only handled in the main thread)
+            signal.signal(signal.SIGINT,signal.default_int_handler)
 
         # log any termination messages
         msg = self.CheckTermination(disp=disp, info=True)
         if msg: self._stepmon.info('STOP("%s")' % msg)
         # save final state
         self._AbstractSolver__save_state(force=True)
+        # write any buffered monitor output
+        self._flush_monitors()
         return 
 
 class BuckshotSolver(AbstractEnsembleSolver):
@@ -259,11 +208,11 @@ Further Inputs:
        #self._EARLYEXIT = False
 
        #FIXME: EvaluationMonitor fails for MPI, throws error for 'pp'
-        from python_map import python_map
-        if self._map != python_map:
+        if not self._shared_map():
             self._fcalls = [0] #FIXME: temporary patch for removing the following line
         else:
-            self._fcalls, cost = wrap_function(cost, ExtraArgs, self._evalmon)
+            self._fcalls, cost = wrap_function(cost, ExtraArgs, \
+                                 self._evalmon, lock=self._map_lock())
 
         #generate signal_handler
         self._generateHandler(sigint_callback) 
@@ -287,77 +236,195 @@ Further Inputs:
 
         # generate a set of starting points
         from mystic.math import samplepts
-        initial_values = samplepts(lower,upper,npts)
-
-        # run optimizer for each grid point
-        from copy import deepcopy as copy
-        op = [copy(solver) for i in range(len(initial_values))]
-       #cf = [cost for i in range(len(initial_values))]
-       #vb = [verbose for i in range(len(initial_values))]
-        id = range(len(initial_values))
-
-        # generate the local_optimize function
-        def local_optimize(solver, x0, rank=None, disp=verbose):
-            solver.id = rank
-            solver.SetInitialPoints(x0)
-            if solver._useStrictRange: #XXX: always, settable, or sync'd ?
-                solver.SetStrictRanges(min=solver._strictMin, \
-                                       max=solver._strictMax) # or lower,upper ?
-            solver.Solve(cost, disp=disp)
-            return solver
-
-        # map:: solver = local_optimize(solver, x0, id, verbose)
-        results = self._map(local_optimize, op, initial_values, id, \
-                                                **self._mapconfig)
-
-        # save initial state
-        self._AbstractSolver__save_state()
-        # get the results with the lowest energy
-        self._bestSolver = results[0]
-        bestpath = self._bestSolver._stepmon
-        besteval = self._bestSolver._evalmon
-        self._total_evals = self._bestSolver.evaluations
-        for solver in results[1:]:
-            self._total_evals += solver.evaluations # add func evals
-            if solver.bestEnergy < self._bestSolver.bestEnergy:
-                self._bestSolver = solver
-                bestpath = solver._stepmon
-                besteval = solver._evalmon
-
-        # return results to internals
-        self.population = self._bestSolver.population #XXX: pointer? copy?
-        self.popEnergy = self._bestSolver.popEnergy #XXX: pointer? copy?
-        self.bestSolution = self._bestSolver.bestSolution #XXX: pointer? copy?
-        self.bestEnergy = self._bestSolver.bestEnergy
-        self.trialSolution = self._bestSolver.trialSolution #XXX: pointer? copy?
-        self._fcalls = self._bestSolver._fcalls #XXX: pointer? copy?
-        self._maxiter = self._bestSolver._maxiter
-        self._maxfun = self._bestSolver._maxfun
-
-        # write 'bests' to monitors  #XXX: non-best monitors may be useful too
-        self._stepmon = bestpath #XXX: pointer? copy?
-        self._evalmon = besteval #XXX: pointer? copy?
-       #from mystic.tools import isNull
-       #if isNull(bestpath):
-       #    self._stepmon = bestpath
-       #else:
-       #    for i in range(len(bestpath.y)):
-       #        self._stepmon(bestpath.x[i], bestpath.y[i], self.id)
-       #        #XXX: could apply callback here, or in exec'd code
-       #if isNull(besteval):
-       #    self._evalmon = besteval
-       #else:
-       #    for i in range(len(besteval.y)):
-       #        self._evalmon(besteval.x[i], besteval.y[i])
+        initial_values = [samplepts(lower,upper,npts)]
+
+        # run optimizer for each starting point, collecting the results
+        self._AbstractEnsembleSolver__solve(cost, solver, initial_values, \
+                                            verbose, settings['callback'])
+        #-------------------------------------------------------------
+
+        if self._handle_sigint: # (signals are only handled in the main thread)
+            signal.signal(signal.SIGINT,signal.default_int_handler)
+
+        # log any termination messages
+        msg = self.CheckTermination(disp=disp, info=True)
+        if msg: self._stepmon.info('STOP("%s")' % msg)
+        # save final state
+        self._AbstractSolver__save_state(force=True)
+        # write any buffered monitor output
+        self._flush_monitors()
+        return 
+
+class ClusterSolver(AbstractEnsembleSolver):
+    """
+parallel mapped optimization starting from random points, skipping points
+that are likely in the basin of an already-found (or already-started) minimum
+    """
+    def __init__(self, dim, npts, rounds=4, sigma=4.0, gamma=0.2):
+        """
+Takes two initial inputs: 
+    dim    -- dimensionality of the problem
+    npts   -- number of points sampled in each round
+
+Additional inputs:
+    rounds -- number of rounds of sampling                  [default = 4]
+    sigma  -- scale of the critical distance (sigma > 0)    [default = 4.0]
+    gamma  -- fraction of the best points that may be used
+              as starting points (0 < gamma <= 1)           [default = 0.2]
+
+All other important class members are inherited from AbstractEnsembleSolver.
+        """
+        super(ClusterSolver, self).__init__(dim, npts=npts)
+        from mystic.termination import NormalizedChangeOverGeneration
+        convergence_tol = 1e-4
+        self._termination = NormalizedChangeOverGeneration(convergence_tol)
+        self._rounds = rounds
+        self._sigma = sigma
+        self._gamma = gamma
+
+    def _critical_distance(self, volume, npts):
+        """get the critical distance, given the number of sampled points
+and the volume of the sampled region (see Rinnooy Kan and Timmer, 1987)"""
+        if npts < 2: return numpy.inf
+        n = self.nDim
+        gamma, x = 1.0, 1 + 0.5*n # gamma(1 + n/2)
+        while x > 2:
+            x -= 1
+            gamma *= x
+        if x == 1.5: gamma *= 0.5 * numpy.sqrt(numpy.pi)
+        r = gamma * volume * self._sigma * numpy.log(npts) / npts
+        return (r ** (1./n)) / numpy.sqrt(numpy.pi)
+
+    def _select(self, x, y, started, minima, radius):
+        """get the indices of the points in x to start a local solver from
+
+A point is selected if it is among the best gamma fraction of points, and
+there is no point with a lower energy within the critical radius, and it is
+not within the critical radius of a known minimum. Points already used as a
+starting point (in 'started') are not selected."""
+        ny = len(y)
+        order = numpy.argsort(y)
+        best = order[:max(1, int(self._gamma * ny))]
+        selected = []
+        for i in best:
+            if i in started: continue
+            near = numpy.sqrt(((x - x[i])**2).sum(axis=1)) <= radius
+            if (y[near] < y[i]).any(): continue
+            if len(minima) and \
+               (numpy.sqrt(((minima - x[i])**2).sum(axis=1)) <= radius).any():
+                continue
+            selected.append(i)
+        return selected
+
+    def Solve(self, cost, termination=None, sigint_callback=None,
+                                            ExtraArgs=(), **kwds):
+        """Minimize a function using multi-level single linkage optimization.
+
+Description:
+
+    Uses parallel mapping of solvers on randomly selected points to
+    find the minimum of a function of one or more variables, where in
+    each round new points are sampled and evaluated, and solvers are
+    only started from the points that are not near a point with lower
+    energy, or near a minimum that has already been found.
+
+Inputs:
+
+    cost -- the Python function or method to be minimized.
+
+Additional Inputs:
+
+    termination -- callable object providing termination conditions.
+    sigint_callback -- callback function for signal handler.
+    ExtraArgs -- extra arguments for cost.
+
+Further Inputs:
+
+    callback -- an optional user-supplied function to call after each
+        iteration.  It is called as callback(xk), where xk is the
+        current parameter vector.                           [default = None]
+    disp -- non-zero to print convergence messages.         [default = 0]
+        """
+        # process and activate input settings
+        settings = self._process_inputs(kwds)
+        disp=0
+#       for key in settings:
+#           exec "%s = settings['%s']" % (key,key)
+        if disp in ['verbose', 'all']: verbose = True
+        else: verbose = False
+        #-------------------------------------------------------------
+
+        import signal
+       #self._EARLYEXIT = False
+
+       #FIXME: EvaluationMonitor fails for MPI, throws error for 'pp'
+        if not self._shared_map():
+            self._fcalls = [0] #FIXME: temporary patch for removing the following line
+            energy = lambda x: cost(x, *ExtraArgs)
+        else:
+            self._fcalls, cost = wrap_function(cost, ExtraArgs, \
+                                 self._evalmon, lock=self._map_lock())
+            energy = cost
+
+        #generate signal_handler
+        self._generateHandler(sigint_callback) 
+        if self._handle_sigint: signal.signal(signal.SIGINT,self.signal_handler)
+
+        # register termination function
+        if termination is not None:
+            self.SetTermination(termination)
+
+        # get the nested solver instance
+        solver = self._AbstractEnsembleSolver__get_solver_instance()
+        #-------------------------------------------------------------
+
+        npts = self._npts
+        if len(self._strictMax): upper = list(self._strictMax)
+        else:
+            upper = list(self._defaultMax)
+        if len(self._strictMin): lower = list(self._strictMin)
+        else:
+            lower = list(self._defaultMin)
+        volume = numpy.prod(numpy.subtract(upper, lower, dtype=float))
+
+        # the energy of a sampled point includes the penalty
+        from mystic.tools import wrap_penalty
+        energy = wrap_penalty(energy, self._penalty)
+        samples = [numpy.empty((0,self.nDim)), numpy.empty(0)] # x, y
+        started = set()
+
+        # in each round, sample and evaluate a set of random points, then
+        # generate the starting points (after all previous results arrive)
+        def initial_values():
+            from mystic.math import samplepts
+            for k in range(self._rounds):
+                x = samplepts(lower,upper,npts)
+                y = self._map(energy, x, **self._mapconfig)
+                samples[0] = numpy.vstack((samples[0], x))
+                samples[1] = numpy.hstack((samples[1], y))
+                radius = self._critical_distance(volume, len(samples[1]))
+                minima = numpy.array([r.x for r in self._results], dtype=float)
+                index = self._select(samples[0], samples[1], started, \
+                                     minima, radius)
+                started.update(index)
+                if index: yield [list(samples[0][i]) for i in index]
+
+        # run optimizer for each promising starting point
+        self._AbstractEnsembleSolver__solve(cost, solver, initial_values(), \
+                                            verbose, settings['callback'])
+        self._total_evals += len(samples[1]) # add sampled func evals
         #-------------------------------------------------------------
 
-        signal.signal(signal.SIGINT,signal.default_int_handler)
+        if self._handle_sigint: # (signals are only handled in the main thread)
+            signal.signal(signal.SIGINT,signal.default_int_handler)
 
         # log any termination messages
         msg = self.CheckTermination(disp=disp, info=True)
         if msg: self._stepmon.info('STOP("%s")' % msg)
         # save final state
         self._AbstractSolver__save_state(force=True)
+        # write any buffered monitor output
+        self._flush_monitors()
         return 
 
 # backward compatibility
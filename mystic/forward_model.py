@@ -50,13 +50,23 @@ See the examples contained in `mystic.models` for more information.
 The CostFactory can be used to couple models together into a single cost
 function. For an example, see `mystic.examples.forward_model`.
 
+The cost functions also accept a batch of parameter vectors (i.e. an array of
+shape (npts,nparams)), and then return one cost for each parameter vector.
+If each model is added with a 'batch' forward model (as is done for the models
+in `mystic.models`), the batch is evaluated with numpy broadcasting.  Thus,
+the cost function may be used as a batch cost function for a solver:
+
+    >>> solver.SetObjective(costfunction, batch=True)
+
 """
 
 from mystic.filters import Identity, PickComponent
 from mystic.filters import NullChecker
+from mystic.tools import isbatch
 
 from inspect import getargspec
 from numpy import pi, sqrt, array, mgrid, random, real, conjugate, arange, sum
+from numpy import asarray
 #from numpy.random import rand
 
 
@@ -111,9 +121,10 @@ Takes no initial inputs.
         self._inputFilters = {}
         self._outputFilters = []
         self._inputCheckers = []
+        self._batches = []
         pass
 
-    def addModel(self, model, name, inputs, outputFilter = Identity, inputChecker = NullChecker):
+    def addModel(self, model, name, inputs, outputFilter = Identity, inputChecker = NullChecker, batch = None):
         """
 Adds a forward model factory to the cost factory.
 
@@ -121,6 +132,9 @@ Inputs:
     model   -- a callable function factory object
     name    -- a string representing the model name
     inputs  -- number of input arguments to model
+    batch   -- a function of (params, evalpts), that for an array of params
+               (of shape (npts,inputs)) returns the forward model evaluated
+               at evalpts for each row of params [default => None]
         """
         if name in self._names:
              print "Model [%s] already in database." % name
@@ -130,6 +144,19 @@ Inputs:
         self._inputs.append(inputs)
         self._outputFilters.append(outputFilter)
         self._inputCheckers.append(inputChecker)
+        self._batches.append(batch)
+
+    def _models(self):
+        """get a list of (factory, slice of params, outputFilter, inputChecker,
+batch) for each of the models"""
+        models = []
+        ind = 0
+        for F, n, ofilt, icheck, batch in zip(self._forwardFactories, \
+                       self._inputs, self._outputFilters, self._inputCheckers, \
+                       self._batches):
+            models.append((F, slice(ind, ind+n), ofilt, icheck, batch))
+            ind = ind+n
+        return models
 
     #XXX: addModelNew is a work in progress...
     '''
@@ -161,16 +188,15 @@ for the same set of evaluation points.
 
 Inputs:
     evalpts -- a list of evaluation points
+
+NOTE: The models and evalpts are fixed when the evaluator is built.
         """
         #NOTE: does NOT go through inputChecker
+        models = self._models()
+        evalpts = asarray(evalpts)
         def _(params):
-            out = []
-            ind = 0
-            for F, n, ofilt in zip(self._forwardFactories, self._inputs, self._outputFilters):
-                m = F(params[ind:ind+n])
-                out.append(ofilt(m(evalpts)))
-                ind = ind+n
-            return out
+            return [ofilt(F(params[s])(evalpts)) for (F,s,ofilt,icheck,batch) \
+                                                  in models]
         return _
 
     def getVectorCostFunction(self, evalpts, observations):
@@ -187,8 +213,9 @@ getForwardEvaluator(evalpts) and the observations.
 
 NOTE: Input parameters do NOT go through filters registered as inputCheckers.
         """
+        forward = self.getForwardEvaluator(evalpts)
+        observations = asarray(observations)
         def _(params):
-            forward = self.getForwardEvaluator(evalpts)
             return sum(forward(params)) - observations
         return _
 
@@ -207,33 +234,56 @@ The cost metric should be a function of one parameter (possibly an array)
 that returns a scalar. The default is L2. When called, the "misfit" will
 be passed in.
 
+The cost function also accepts an array of params, of shape (npts,nparams),
+and returns the cost for each row of params.  The forward models are then
+evaluated with numpy broadcasting if all the models provide a batch forward
+model, use the Identity outputFilter, and use the NullChecker inputChecker;
+otherwise, the cost is evaluated for each row in turn.
+
 NOTE: Input parameters WILL go through filters registered as inputCheckers.
+NOTE: The models, evalpts, and observations are fixed when the cost function
+is built.
         """
         #XXX: better interface for sigma?
-        def _(params):
-            ind = 0
-            for F, n, ofilt, icheck in zip(self._forwardFactories, self._inputs, \
-                                       self._outputFilters, self._inputCheckers):
-                # check input  #XXX: is this worthwile to do?
-                my_params = params[ind:ind+n]
-                checkQ = icheck(my_params, evalpts)
+        models = self._models()
+        evalpts = asarray(evalpts)
+        observations = asarray(observations)
+        checks = [(icheck, s) for (F,s,ofilt,icheck,batch) in models \
+                                       if icheck is not NullChecker]
+        vectorized = not checks and all(batch is not None and ofilt is Identity \
+                                        for (F,s,ofilt,icheck,batch) in models)
+        def misfit(x):
+            if sigma is None:
+                return x - observations
+            return (x - observations) / sigma
+
+        def cost(params):
+            # check input  #XXX: is this worthwile to do?
+            for icheck, s in checks:
+                checkQ = icheck(params[s], evalpts)
                 if checkQ is not None:
                     # some parameters are out of range... returns "cost"
                     return checkQ
-
-                Gm = F(params[ind:ind+n])
-                if ind == 0:
-                    x = ofilt(Gm(evalpts)) 
-                else:
-                    x = x + ofilt(Gm(evalpts)) 
-                ind = ind+n
-            if sigma == None:
-                x = x - observations
-            else:
-                x = (x - observations) / sigma
+            x = None
+            for F, s, ofilt, icheck, batch in models:
+                Gm = F(params[s])
+                x = ofilt(Gm(evalpts)) if x is None else x + ofilt(Gm(evalpts))
             #return sum(real((conjugate(x)*x)))
             #return sum(x*x) 
-            return metric(x)
+            return metric(misfit(x))
+
+        def batchcost(params):
+            if not vectorized:
+                return asarray([cost(p) for p in params])
+            x = None
+            for F, s, ofilt, icheck, batch in models:
+                Gm = batch(params[:,s], evalpts)
+                x = Gm if x is None else x + Gm
+            return asarray([metric(xi) for xi in misfit(x)])
+
+        def _(params):
+            if isbatch(params): return batchcost(asarray(params))
+            return cost(params)
         return _
 
     def getCostFunctionSlow(self, evalpts, observations):
@@ -251,8 +301,8 @@ where x is the VectorCostFunction for a given set of parameters.
 NOTE: Input parameters do NOT go through filters registered as inputCheckers.
         """
         #XXX: update interface to allow metric?
+        v = self.getVectorCostFunction(evalpts, observations)
         def _(params):
-            v = self.getVectorCostFunction(evalpts, observations)
             x = v(params)
             return sum(real((conjugate(x)*x)))
         return _
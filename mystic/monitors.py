@@ -20,6 +20,11 @@ for mystic's analysis viewers. Each of mystic's monitors are customizable,
 and provide the user with a different type of output. The following
 monitors are available::
     - Monitor        -- the basic monitor; only writes to internal state
+    - ArrayMonitor   -- a basic monitor that stores its data in numpy arrays
+    - DecimatingMonitor -- a basic monitor; keeps evenly spaced entries
+    - ReservoirMonitor  -- a basic monitor; keeps a random sample of entries
+    - BestMonitor       -- a basic monitor; keeps the entries with lowest cost
+    - ImprovingMonitor  -- a basic monitor; keeps entries that improve cost
     - LoggingMonitor -- a logging monitor; also writes to a logfile
     - VerboseMonitor -- a verbose monitor; also writes to stdout/stderr
     - VerboseLoggingMonitor -- a verbose logging monitor; best of both worlds
@@ -59,10 +64,15 @@ or bound to a cost function by a Solver.  The typical usage pattern is::
 
 
 """
-__all__ = ['Null','Monitor', 'VerboseMonitor', 'LoggingMonitor',
+__all__ = ['Null','Monitor', 'ArrayMonitor', 'DecimatingMonitor',
+           'ReservoirMonitor', 'BestMonitor', 'ImprovingMonitor',
+           'VerboseMonitor', 'LoggingMonitor',
            'VerboseLoggingMonitor', 'CustomMonitor']
 
 import numpy
+import time
+import atexit
+import weakref
 from mystic.tools import list_or_tuple_or_ndarray
 from mystic.tools import listify
 
@@ -187,6 +197,293 @@ example usage...
     id = property(get_id, doc = "Id")
     pass
 
+class ArrayMonitor(Monitor):
+    """A basic Monitor that stores parameters, costs, and ids in numpy arrays.
+
+Storage is preallocated for 'size' entries, and the capacity is doubled
+whenever more space is needed. The x, y, and id members are array views
+of the stored data.
+
+example usage...
+    >>> sow = ArrayMonitor()
+    >>> sow([1,2],3)
+    >>> sow([4,5],6)
+    >>> sow.x
+    array([[ 1.,  2.],
+           [ 4.,  5.]])
+    >>> sow.y
+    array([ 3.,  6.])
+
+    """
+    def __init__(self, size=1024, **kwds):
+        super(ArrayMonitor,self).__init__(**kwds)
+        self._size = max(1, int(size))
+        self._n = 0          # number of stored entries
+        self._xa = None      # storage for params
+        self._ya = None      # storage for costs
+        self._ida = None     # storage for ids
+
+    def __call__(self, x, y, id=None, **kwds):
+        if self._xa is None:
+            self.__allocate(numpy.shape(x), numpy.shape(y))
+        elif self._n == len(self._xa):
+            self.__reserve(self._n + 1)
+        n = self._n
+        self._xa[n] = x
+        self._ya[n] = y
+        self._ida[n] = id
+        self._n = n + 1
+
+    def __allocate(self, xshape, yshape, size=None):
+        """allocate empty storage, given the shape of each entry"""
+        size = max(self._size, size or 0)
+        self._xa = numpy.empty((size,)+tuple(xshape))
+        self._ya = numpy.empty((size,)+tuple(yshape))
+        self._ida = numpy.empty(size, dtype=object)
+        self._n = 0
+        return
+
+    def __reserve(self, size):
+        """ensure storage exists for at least 'size' entries"""
+        capacity = len(self._xa)
+        if size <= capacity: return
+        capacity = max(size, 2*capacity)
+        n = self._n
+        xa, ya, ida = self._xa, self._ya, self._ida
+        self._xa = numpy.empty((capacity,)+xa.shape[1:])
+        self._ya = numpy.empty((capacity,)+ya.shape[1:])
+        self._ida = numpy.empty(capacity, dtype=object)
+        self._xa[:n] = xa[:n]
+        self._ya[:n] = ya[:n]
+        self._ida[:n] = ida[:n]
+        return
+
+    def __insert(self, monitor, append=True):
+        """insert the contents of the given monitor at the end (or start)"""
+        if isinstance(monitor, Monitor): # is Monitor()
+            pass
+        elif (monitor == Null) or isinstance(monitor, Null): # is Null or Null()
+            return
+        elif hasattr(monitor, '__module__') and \
+            monitor.__module__ in ['mystic._genSow']: # is CustomMonitor()
+                pass #XXX: CustomMonitor may fail...
+        else:
+            raise TypeError, "'%s' is not a monitor instance" % monitor
+        if append: self._info.extend(monitor._info)
+        else: self._info[:0] = monitor._info
+        k = len(monitor._x)
+        if not k: return
+        x = numpy.asarray(monitor._x, dtype=float)
+        y = numpy.asarray(monitor._y, dtype=float)
+        id = numpy.empty(k, dtype=object)
+        if len(monitor._id) == k: id[:] = list(monitor._id)
+        if self._xa is None:
+            self.__allocate(x.shape[1:], y.shape[1:], k)
+        else:
+            self.__reserve(self._n + k)
+        n = self._n
+        index = n if append else 0
+        if index < n: # shift existing entries to make room
+            self._xa[index+k:n+k] = self._xa[index:n].copy()
+            self._ya[index+k:n+k] = self._ya[index:n].copy()
+            self._ida[index+k:n+k] = self._ida[index:n].copy()
+        self._xa[index:index+k] = x
+        self._ya[index:index+k] = y
+        self._ida[index:index+k] = id
+        self._n = n + k
+        return
+
+    def extend(self, monitor):
+        """append the contents of the given monitor"""
+        self.__insert(monitor)
+
+    def prepend(self, monitor):
+        """prepend the contents of the given monitor"""
+        self.__insert(monitor, append=False)
+
+    def __get_x(self):
+        if self._xa is None: return numpy.empty(0)
+        return self._xa[:self._n]
+
+    def __get_y(self):
+        if self._ya is None: return numpy.empty(0)
+        return self._ya[:self._n]
+
+    def __get_id(self):
+        if self._ida is None: return numpy.empty(0, dtype=object)
+        return self._ida[:self._n]
+
+    def __clear(self, values):
+        """clear the stored entries (as Monitor.__init__ sets empty lists)"""
+        if len(values):
+            raise AttributeError, "stored entries can only be cleared"
+        self._xa = self._ya = self._ida = None
+        self._n = 0
+        return
+
+    _x = property(__get_x, __clear)
+    _y = property(__get_y, __clear)
+    _id = property(__get_id, __clear)
+    pass
+
+class _BoundedMonitor(Monitor):
+    """A basic Monitor that keeps a fixed-size selection of the logged data.
+
+Subclasses select which entries are kept in the _record method."""
+    def __init__(self, size=1000, **kwds):
+        super(_BoundedMonitor,self).__init__(**kwds)
+        self._size = max(1, int(size))
+        self._count = 0 # number of calls to the monitor
+        return
+
+    def __call__(self, x, y, id=None, **kwds):
+        self._count += 1
+        self._record(x, y, id)
+
+    def _record(self, x, y, id):
+        """select if the given entry is kept"""
+        raise NotImplementedError, "must be overwritten..."
+
+    def _keep(self, x, y, id):
+        """append the given entry"""
+        self._x.append(listify(x))
+        self._y.append(listify(y))
+        self._id.append(id)
+
+    def _drop(self, index):
+        """remove the entry at the given index"""
+        del self._x[index]
+        del self._y[index]
+        del self._id[index]
+
+    def __entries(self, monitor):
+        """get the (x,y,id) entries and the info of the given monitor"""
+        if isinstance(monitor, Monitor): # is Monitor()
+            pass
+        elif (monitor == Null) or isinstance(monitor, Null): # is Null or Null()
+            return [], []
+        elif hasattr(monitor, '__module__') and \
+            monitor.__module__ in ['mystic._genSow']: # is CustomMonitor()
+                pass #XXX: CustomMonitor may fail...
+        else:
+            raise TypeError, "'%s' is not a monitor instance" % monitor
+        ids = list(monitor._id)
+        if len(ids) != len(monitor._x): ids = [None]*len(monitor._x)
+        return zip(monitor._x, monitor._y, ids), list(monitor._info)
+
+    def extend(self, monitor):
+        """append the contents of the given monitor
+
+note::
+    the entries of the given monitor are selected as if logged by self"""
+        entries, info = self.__entries(monitor)
+        for (x,y,id) in entries:
+            self(x, y, id)
+        self._info.extend(info)
+
+    def prepend(self, monitor):
+        """prepend the contents of the given monitor
+
+note::
+    the entries of the given monitor are selected as if logged by self,
+    then the entries currently kept by self are logged again"""
+        entries, info = self.__entries(monitor)
+        self._info[:0] = info
+        if not entries: return
+        current = zip(self._x, self._y, self._id)
+        del self._x[:], self._y[:], self._id[:]
+        self._count = 0
+        self._reset()
+        for (x,y,id) in entries + current:
+            self(x, y, id)
+
+    def _reset(self):
+        """reset the selection state, when all entries are removed"""
+        return
+    pass
+
+class DecimatingMonitor(_BoundedMonitor):
+    """A Monitor that keeps every k-th entry, for at most 'size' entries.
+
+Logs every 'step' calls. When 'size' entries have been kept, every other
+kept entry is discarded and 'step' is doubled, so the kept entries are
+always evenly spaced over the full history.
+    """
+    def __init__(self, size=1000, step=1, **kwds):
+        super(DecimatingMonitor,self).__init__(size, **kwds)
+        self._step0 = max(1, int(step))
+        self._stride = self._step0
+        return
+    def _reset(self):
+        self._stride = self._step0
+    def _record(self, x, y, id):
+        if (self._count - 1) % self._stride: return
+        if len(self._x) == self._size: # discard every other entry
+            del self._x[1::2], self._y[1::2], self._id[1::2]
+            self._stride *= 2
+            if (self._count - 1) % self._stride: return
+        self._keep(x, y, id)
+    pass
+
+class ReservoirMonitor(_BoundedMonitor):
+    """A Monitor that keeps a uniform random sample of 'size' entries.
+
+Entries are selected by reservoir sampling, using a random number generator
+seeded with 'seed' (and thus not altering the state of the global random
+number generator). Kept entries are in the order they were logged.
+    """
+    def __init__(self, size=1000, seed=None, **kwds):
+        import random
+        super(ReservoirMonitor,self).__init__(size, **kwds)
+        self._random = random.Random(seed)
+        return
+    def _record(self, x, y, id):
+        if len(self._x) == self._size:
+            index = self._random.randrange(self._count)
+            if index >= self._size: return
+            self._drop(index)
+        self._keep(x, y, id)
+    pass
+
+class BestMonitor(_BoundedMonitor):
+    """A Monitor that keeps the 'size' entries with the lowest cost.
+
+Kept entries are in the order they were logged.
+    """
+    def __init__(self, size=100, **kwds):
+        super(BestMonitor,self).__init__(size, **kwds)
+        self._worst = None # index of the kept entry with the highest cost
+        return
+    def _reset(self):
+        self._worst = None
+    def _record(self, x, y, id):
+        if len(self._x) == self._size:
+            if self._worst is None:
+                self._worst = self._y.index(max(self._y))
+            if not y < self._y[self._worst]: return
+            self._drop(self._worst)
+            self._worst = None
+        self._keep(x, y, id)
+    pass
+
+class ImprovingMonitor(_BoundedMonitor):
+    """A Monitor that only keeps entries that improve on the lowest cost.
+
+Keeps the most recent 'size' improving entries.
+    """
+    def __init__(self, size=1000, **kwds):
+        super(ImprovingMonitor,self).__init__(size, **kwds)
+        self._best = numpy.inf # lowest cost seen
+        return
+    def _reset(self):
+        self._best = numpy.inf
+    def _record(self, x, y, id):
+        if not y < self._best: return
+        self._best = y
+        if len(self._x) == self._size: self._drop(0)
+        self._keep(x, y, id)
+    pass
+
 class VerboseMonitor(Monitor):
     """A verbose version of the basic Monitor.
 
@@ -238,62 +535,153 @@ current parameters every 'xinterval'.
         return
     pass
 
+# the logging monitors with buffered writes, flushed at exit
+_buffered = weakref.WeakSet()
+
+def _flush_buffered():
+    """flush the buffered writes of all logging monitors"""
+    for monitor in list(_buffered):
+        monitor.flush()
+    return
+
+atexit.register(_flush_buffered)
+
 class LoggingMonitor(Monitor):
     """A basic Monitor that writes to a file at specified intervals.
 
 Logs ChiSq and parameters to a file every 'interval'
+
+By default, the log file is opened and closed for each entry. If 'bufsize'
+is given, the log file is kept open, and writes are buffered for up to
+'bufsize' bytes or 'flushtime' seconds (bufsize=0 writes immediately;
+flushtime=None only flushes when the buffer is full). Buffered writes are
+also flushed when a solver exits Solve, when the monitor is deleted, and
+when the interpreter exits (but not if the process is killed). With
+binary=True, each log entry is written as a row
+of float64 values (step, id, cost, params), following a header of two
+float64 values giving the number of costs and params in each row; a
+missing id is written as nan, and info messages are not written.
     """
-    def __init__(self, interval=1, filename='log.txt', new=False, all=True, info=None):
+    def __init__(self, interval=1, filename='log.txt', new=False, all=True, info=None, bufsize=None, flushtime=5, binary=False):
         import datetime
+        import os
         super(LoggingMonitor,self).__init__()
         self._filename = filename
         if not interval or interval is numpy.nan: interval = numpy.inf
+        if not flushtime or flushtime is numpy.nan: flushtime = numpy.inf
         self._yinterval = interval
         self._xinterval = interval
+        self._bufsize = bufsize
+        self._flushtime = flushtime
+        self._binary = binary
         if new: ind = 'w'
         else: ind = 'a'
-        self._file = open(self._filename,ind)
-        self._file.write("# %s\n" % datetime.datetime.now().ctime() )
-        if info: self._file.write("# %s\n" % str(info))
-        self._file.write("# ___#___  __ChiSq__  __params__\n")
-        self._file.close()
+        if binary: # header is written with the first entry
+            ind += 'b'
+            self._header = new or not os.path.exists(filename) or \
+                                  not os.path.getsize(filename)
+        self._file = None
+        self._open(ind)
+        if not binary:
+            self._file.write("# %s\n" % datetime.datetime.now().ctime() )
+            if info: self._file.write("# %s\n" % str(info))
+            self._file.write("# ___#___  __ChiSq__  __params__\n")
+        self._release()
         self._all = all
         return
+    def _open(self, ind=None):
+        """get the open log file"""
+        if self._file is None or self._file.closed:
+            if ind is None: ind = 'ab' if self._binary else 'a'
+            if self._bufsize is None:
+                self._file = open(self._filename,ind)
+            else: # buffered, so flush at exit
+                self._file = open(self._filename,ind,self._bufsize)
+                _buffered.add(self)
+            self._flushed = time.time()
+        return self._file
+    def _release(self):
+        """close the log file, unless writes are buffered"""
+        if self._bufsize is None: self.close()
+        else: self.flush()
+        return
+    def flush(self):
+        """write any buffered entries to the log file"""
+        if self._file is not None and not self._file.closed:
+            self._file.flush()
+        self._flushed = time.time()
+        return
+    def close(self):
+        """flush and close the log file (reopened if more entries are logged)"""
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        return
+    def __getstate__(self):
+        self.flush()
+        state = self.__dict__.copy()
+        state['_file'] = None
+        return state
     def info(self, message):
         super(LoggingMonitor,self).info(message)
-        self._file = open(self._filename,'a')
-        self._file.write("# %s\n" % str(message))
-        self._file.close()
+        if self._binary: return
+        self._open().write("# %s\n" % str(message))
+        self._release()
         return
     def __call__(self, x, y, id=None, best=0):
-        self._file = open(self._filename,'a')
         super(LoggingMonitor,self).__call__(x, y, id)
         if self._yinterval is not numpy.inf and \
            int((self._step-1) % self._yinterval) == 0:
-            if not list_or_tuple_or_ndarray(y):
-                y = "%f" % self._y[-1]
-            elif self._all:
-                y = "%s" % self._y[-1]
+            if self._binary:
+                self._write_row(id, best)
             else:
-                y = "%f" % self._y[-1][best]
-            if not list_or_tuple_or_ndarray(x):
-                x = "[%f]" % self._x[-1]
-            elif self._all:
-                xa = self._x[-1]
-                if not list_or_tuple_or_ndarray(xa):
-                  x = "[%f]" % xa
-                else:
-                  x = "%s" % xa
+                self._write_line(id, best)
+            if self._bufsize is None:
+                self.close()
+            elif self._flushtime is not numpy.inf and \
+                 time.time() - self._flushed >= self._flushtime:
+                self.flush()
+        return
+    def _write_line(self, id, best):
+        """write the last entry as a line of text"""
+        if not list_or_tuple_or_ndarray(self._y[-1]):
+            y = "%f" % self._y[-1]
+        elif self._all:
+            y = "%s" % self._y[-1]
+        else:
+            y = "%f" % self._y[-1][best]
+        if not list_or_tuple_or_ndarray(self._x[-1]):
+            x = "[%f]" % self._x[-1]
+        elif self._all:
+            xa = self._x[-1]
+            if not list_or_tuple_or_ndarray(xa):
+              x = "[%f]" % xa
             else:
-                xb = self._x[-1][best]
-                if not list_or_tuple_or_ndarray(xb):
-                  x = "[%f]" % xb
-                else:
-                  x = "%s" % xb
-            step = [self._step-1]
-            if id != None: step.append(id)
-            self._file.write("  %s     %s   %s\n" % (tuple(step), y, x))
-        self._file.close()
+              x = "%s" % xa
+        else:
+            xb = self._x[-1][best]
+            if not list_or_tuple_or_ndarray(xb):
+              x = "[%f]" % xb
+            else:
+              x = "%s" % xb
+        step = [self._step-1]
+        if id != None: step.append(id)
+        self._open().write("  %s     %s   %s\n" % (tuple(step), y, x))
+        return
+    def _write_row(self, id, best):
+        """write the last entry as a row of float64 values"""
+        y = self._y[-1]
+        x = self._x[-1]
+        if not self._all:
+            if list_or_tuple_or_ndarray(y): y = y[best]
+            if list_or_tuple_or_ndarray(x): x = x[best]
+        y = numpy.ravel(y)
+        x = numpy.ravel(x)
+        file = self._open()
+        if self._header:
+            file.write(numpy.array([y.size, x.size], 'f8').tostring())
+            self._header = False
+        step = [self._step-1, numpy.nan if id is None else id]
+        file.write(numpy.concatenate((step, y, x)).astype('f8').tostring())
         return
     pass
 
@@ -302,8 +690,8 @@ class VerboseLoggingMonitor(LoggingMonitor):
 
 Logs ChiSq and parameters to a file every 'interval', print every 'yinterval'
     """
-    def __init__(self, interval=1, yinterval=10, xinterval=numpy.inf, filename='log.txt', new=False, all=True, info=None):
-        super(VerboseLoggingMonitor,self).__init__(interval,filename,new,all,info)
+    def __init__(self, interval=1, yinterval=10, xinterval=numpy.inf, filename='log.txt', new=False, all=True, info=None, **kwds):
+        super(VerboseLoggingMonitor,self).__init__(interval,filename,new,all,info,**kwds)
         if not yinterval or yinterval is numpy.nan: yinterval = numpy.inf
         if not xinterval or xinterval is numpy.nan: xinterval = numpy.inf
         self._vyinterval = yinterval
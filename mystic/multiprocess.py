@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+"""
+This module contains map and pipe interfaces to python's multiprocessing module.
+
+Pipe methods provided:
+    pipe        - blocking communication pipe             [returns: value]
+    apipe       - asynchronous communication pipe         [returns: object]
+
+Map methods provided:
+    map         - blocking and ordered worker pool        [returns: list]
+    imap        - non-blocking and ordered worker pool    [returns: iterator]
+    uimap       - non-blocking and unordered worker pool  [returns: iterator]
+    amap        - asynchronous worker pool                [returns: object]
+
+
+Usage
+=====
+
+A typical call to a mystic multiprocessing map will roughly follow this example:
+
+    >>> # instantiate and configure the worker pool
+    >>> from mystic.multiprocess import ProcessPool
+    >>> pool = ProcessPool(nodes=4)
+    >>>
+    >>> # do a blocking map on the chosen function
+    >>> results = pool.map(pow, [1,2,3,4], [5,6,7,8])
+    >>>
+    >>> # do a non-blocking map, then extract the results from the iterator
+    >>> results = pool.imap(pow, [1,2,3,4], [5,6,7,8])
+    >>> results = list(results)
+    >>>
+    >>> # do an asynchronous map, then get the results
+    >>> results = pool.amap(pow, [1,2,3,4], [5,6,7,8])
+    >>> while not results.ready():
+    >>>     time.sleep(5); print ".",
+    >>> results = results.get()
+    >>>
+    >>> # use the worker pool with a map solver
+    >>> solver.SetMapper(pool.map)
+    >>>
+    >>> # shut down the workers
+    >>> pool.close(); pool.join()
+
+
+Notes
+=====
+
+The workers are persistent.  They are forked when the pool is first given a
+function, and they hold on to that function, so it is inherited by the
+workers and does not need to be serialized.  The workers are kept when a
+different function is mapped; the function is then serialized (once) with
+dill, and sent with each chunk of jobs, while each worker loads the function
+only once (a few of the most recently used functions are held by each worker).
+A bound method is treated as the same function each time it is accessed.
+A function that can not be serialized starts a new set of workers (the old
+workers finish any submitted jobs, and exit, before the new ones start).
+
+The arguments and the results are serialized with dill.  The function should
+not rely on changes to global state (or to the objects it refers to) made
+after it was first given to the pool.  Changes made to objects (such as
+monitors) within the workers are not seen by the caller.
+
+The number of jobs sent to a worker at once is set with 'chunksize'.  If
+chunksize is None, then the jobs are split into chunks of about four per
+worker.  Use chunksize=1 when the runtime of the function varies widely.
+
+The pool counts the bytes of the serialized arguments (and functions) sent to
+the workers ('sent'), and of the serialized results received from the
+workers ('received'), as a measure of the communication cost of each call.
+
+"""
+__all__ = ['ProcessPool']
+
+from abstract_launcher import AbstractWorkerPool
+from itertools import izip as _izip
+import dill
+
+# the function held by a worker, from when it was started
+_func = None
+# the functions sent to a worker, by token
+_funcs = {}
+# the number of functions held by a worker (or by the pool, as serialized)
+_cachesize = 8
+
+def _init(func):
+    """set the function held by a worker"""
+    global _func
+    _func = func
+    _funcs.clear()
+    return
+
+def _function(token, func):
+    """get the function for the token, where token is None for the function
+the worker was started with; otherwise, the (serialized) func is loaded once"""
+    if token is None: return _func
+    function = _funcs.get(token)
+    if function is None:
+        if len(_funcs) >= _cachesize: _funcs.clear()
+        function = _funcs[token] = dill.loads(func)
+    return function
+
+def _apply(task):
+    """apply a function to a chunk of (serialized) arguments"""
+    token, func, chunk = task
+    function = _function(token, func)
+    return [dill.dumps(function(*dill.loads(args)), -1) for args in chunk]
+
+def _pipe(task):
+    """apply a function to (serialized) args and kwds"""
+    token, func, args = task
+    args, kwds = dill.loads(args)
+    return dill.dumps(_function(token, func)(*args, **kwds), -1)
+
+def _same(f, g):
+    """True if f and g are the same function (or bound method)"""
+    if f is g: return True
+    func = getattr(f, '__func__', None)
+    return func is not None and func is getattr(g, '__func__', None) and \
+           getattr(f, '__self__', None) is getattr(g, '__self__', None)
+
+def _dumps(args):
+    """serialize each set of arguments for the workers"""
+    return [dill.dumps(arg, -1) for arg in _izip(*args)]
+
+def _flatten(chunks):
+    """get the results from each chunk of results"""
+    for chunk in chunks:
+        for result in chunk:
+            yield result
+
+def _loads(results, count=None):
+    """deserialize each result from the workers; if given, count(result) is
+called with each serialized result"""
+    for result in results:
+        if count is not None: count(result)
+        yield dill.loads(result)
+
+
+class _AsyncResult(object):
+    """results object for an asynchronous job, deserialized on get"""
+    def __init__(self, result, map=True, count=None):
+        self.__result = result
+        self.__map = map
+        self.__count = count
+        return
+    def ready(self):
+        return self.__result.ready()
+    def successful(self):
+        return self.__result.successful()
+    def wait(self, timeout=None):
+        return self.__result.wait(timeout)
+    def get(self, timeout=None):
+        result = self.__result.get(timeout)
+        if self.__map: return list(_loads(_flatten(result), self.__count))
+        return list(_loads([result], self.__count))[0]
+    pass
+
+
+class ProcessPool(AbstractWorkerPool):
+    """
+Mapper that leverages python's multiprocessing, with persistent workers.
+    """
+    def __init__(self, *args, **kwds):
+        """
+Important class members:
+    nodes       - number of worker processes  [default = # of processors]
+    chunksize   - number of jobs sent to a worker at once  [default = None]
+    sent        - bytes of serialized arguments sent to the workers
+    received    - bytes of serialized results received from the workers
+        """
+        self.__nodes = 1
+        self.chunksize = kwds.pop('chunksize', None)
+        self.sent = 0
+        self.received = 0
+        self.__pool = None # the worker pool
+        self.__func = None # the function the workers were started with
+        self.__sent = [] # recently sent functions, as (function, token, func)
+        self.__token = 0 # the token of the last function sent
+        self.__closed = [] # closed worker pools, with jobs outstanding
+        if not args: kwds.setdefault('nodes', None)
+        AbstractWorkerPool.__init__(self, *args, **kwds)
+        return
+    def __serve(self, f):
+        """get the worker pool, starting it if needed, and the (token, func)
+that gets function f in the workers"""
+        if self.__pool is None:
+            from multiprocessing import Pool
+            self.__pool = Pool(self.__nodes, _init, (f,))
+            self.__func = f
+        if _same(f, self.__func): # the workers hold the function
+            return self.__pool, (None, None)
+        for i,(function, token, func) in enumerate(self.__sent):
+            if _same(f, function): # the function is serialized
+                self.__sent.append(self.__sent.pop(i))
+                return self.__pool, (token, func)
+        try:
+            func = dill.dumps(f, -1)
+        except Exception: # start workers that hold the function
+            self.__supersede()
+            return self.__serve(f)
+        self.__token += 1
+        if len(self.__sent) >= _cachesize: del self.__sent[0]
+        self.__sent.append((f, self.__token, func))
+        return self.__pool, (self.__token, func)
+    def __supersede(self):
+        """stop the workers, waiting for any submitted jobs to complete"""
+        pool = self.__pool
+        self.close()
+        if pool is not None:
+            self.__closed.remove(pool)
+            pool.join()
+        return
+    def __tasks(self, f, args):
+        """get the pool, and the tasks (i.e. chunks of serialized arguments)
+for mapping f over args, counting the bytes sent"""
+        args = _dumps(args)
+        pool, (token, func) = self.__serve(f)
+        size = self.__chunksize(len(args))
+        tasks = [(token, func, args[i:i+size]) \
+                 for i in range(0, len(args), size)]
+        self.sent += sum(len(arg) for arg in args)
+        if func is not None: self.sent += len(func) * len(tasks)
+        return pool, tasks
+    def __pipe(self, f, args, kwds):
+        """get the pool, and the task for piping f, counting the bytes sent"""
+        args = dill.dumps((args, kwds), -1)
+        pool, (token, func) = self.__serve(f)
+        self.sent += len(args) + (0 if func is None else len(func))
+        return pool, (token, func, args)
+    def __received(self, result):
+        """count the bytes of a serialized result"""
+        self.received += len(result)
+        return
+    def __chunksize(self, n):
+        """get the number of jobs sent to a worker at once"""
+        if self.chunksize: return self.chunksize
+        chunksize, extra = divmod(n, self.__nodes * 4)
+        return chunksize + bool(extra) or 1
+    def map(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__map(self, f, *args, **kwds)
+        pool, tasks = self.__tasks(f, args)
+        results = _flatten(pool.map(_apply, tasks, 1))
+        return list(_loads(results, self.__received))
+    map.__doc__ = AbstractWorkerPool.map.__doc__
+    def imap(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__imap(self, f, *args, **kwds)
+        pool, tasks = self.__tasks(f, args)
+        results = _flatten(pool.imap(_apply, tasks, 1))
+        return _loads(results, self.__received)
+    imap.__doc__ = AbstractWorkerPool.imap.__doc__
+    def uimap(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__imap(self, f, *args, **kwds)
+        pool, tasks = self.__tasks(f, args)
+        results = _flatten(pool.imap_unordered(_apply, tasks, 1))
+        return _loads(results, self.__received)
+    uimap.__doc__ = AbstractWorkerPool.uimap.__doc__
+    def amap(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__map(self, f, *args, **kwds)
+        pool, tasks = self.__tasks(f, args)
+        return _AsyncResult(pool.map_async(_apply, tasks, 1), \
+                            count=self.__received)
+    amap.__doc__ = AbstractWorkerPool.amap.__doc__
+    ########################################################################
+    # PIPES
+    def pipe(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__pipe(self, f, *args, **kwds)
+        pool, task = self.__pipe(f, args, kwds)
+        return list(_loads([pool.apply(_pipe, (task,))], self.__received))[0]
+    pipe.__doc__ = AbstractWorkerPool.pipe.__doc__
+    def apipe(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__pipe(self, f, *args, **kwds)
+        pool, task = self.__pipe(f, args, kwds)
+        return _AsyncResult(pool.apply_async(_pipe, (task,)), map=False, \
+                            count=self.__received)
+    apipe.__doc__ = AbstractWorkerPool.apipe.__doc__
+    ########################################################################
+    def close(self):
+        """stop the workers, once all submitted jobs are complete"""
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__closed.append(self.__pool)
+            self.__pool = None
+            self.__func = None
+        return
+    def join(self):
+        """wait for the closed workers to exit"""
+        while self.__closed:
+            self.__closed.pop(0).join()
+        return
+    def terminate(self):
+        """stop the workers immediately"""
+        self.close()
+        for pool in self.__closed:
+            pool.terminate()
+        return
+    def __exit__(self, *args):
+        self.close()
+        return
+    def __getstate__(self):
+        # the workers are not saved (i.e. with a solver's mapper)
+        state = self.__dict__.copy()
+        state['_ProcessPool__pool'] = None
+        state['_ProcessPool__func'] = None
+        state['_ProcessPool__sent'] = []
+        state['_ProcessPool__closed'] = []
+        return state
+    def __repr__(self):
+        return "<pool %s(nodes=%s)>" % (self.__class__.__name__, self.__nodes)
+    ########################################################################
+    # interface
+    def __get_nodes(self):
+        """get the number of nodes in the pool"""
+        return self.__nodes
+    def __set_nodes(self, nodes):
+        """set the number of nodes in the pool"""
+        if nodes is None:
+            from multiprocessing import cpu_count
+            nodes = cpu_count()
+        nodes = int(nodes)
+        if nodes < 1:
+            raise ValueError, "nodes must be a positive integer"
+        if nodes != self.__nodes: self.__supersede() # restart with new nodes
+        self.__nodes = nodes
+        return
+    nodes = property(__get_nodes, __set_nodes)
+    pass
+
+
@@ -7,34 +7,121 @@
 
 from mystic.tools import list_or_tuple_or_ndarray as sequence
 from mystic.tools import isNull
+import numpy
+import os
 
 # logfile reader
 
-def logfile_reader(filename):
+def _select(iter=None, id=None):
+  "generate a filter for (i,id), for i in range 'iter' and id in 'id'"
+  if iter is None: start, stop = None, None
+  elif sequence(iter): start, stop = iter
+  else: start, stop = None, iter
+  if id is not None and not sequence(id): id = [id]
+  def select(step):
+    if start is not None and step[0] < start: return False
+    if stop is not None and step[0] >= stop: return False
+    if id is not None and (len(step) < 2 or step[1] not in id): return False
+    return True
+  return select
+
+def _is_binary(filename):
+  "check if the logfile was written in binary format"
+  f = open(filename,"rb")
+  head = f.read(1)
+  f.close()
+  return bool(head) and head != "#"
+
+def logfile_reader(filename, iter=None, id=None):
+  """read a logfile written with 'LoggingMonitor'
+
+input::
+    - filename = name of the text (or binary) logfile
+    - iter = an int 'stop' or tuple (start, stop), selecting iterations i
+      where start <= i < stop
+    - id = an int (or list of ints), selecting the ids to read
+
+returns the list of (i,id) (or (i,) without ids), params, and costs"""
+  if _is_binary(filename):
+    step, param, cost = binary_logfile_reader(filename, iter, id)
+    iters = step[:,0].astype(int).tolist()
+    if numpy.isnan(step[:,1]).all(): # no id was logged
+      step = [(i,) for i in iters]
+    else:
+      step = zip(iters, step[:,1].astype(int).tolist())
+    return step, param.tolist(), cost.tolist()
   f = open(filename,"r")
   file = f.read()
   f.close()
   contents = file.split("\n")
+  select = _select(iter, id)
   # parse file contents to get (i,id), cost, and parameters
   step = []; cost = []; param = [];
   for line in contents[:-1]:
     if line.startswith("#"): pass
     else:
       values = line.split("   ")
-      step.append(eval(values[0]))  #XXX: yields (i,id)
+      _step = eval(values[0])  #XXX: yields (i,id)
+      if not select(_step): continue
+      step.append(_step)
       cost.append(eval(values[1]))
       param.append(eval(values[2]))
   return step, param, cost
 
+def binary_logfile_reader(filename, iter=None, id=None):
+  """read a logfile written with 'LoggingMonitor(binary=True)'
+
+input::
+    - filename = name of the binary logfile
+    - iter = an int 'stop' or tuple (start, stop), selecting iterations i
+      where start <= i < stop
+    - id = an int (or list of ints), selecting the ids to read
+
+returns arrays of (i,id), params, and costs, where a missing id is nan
+
+note::
+    the logfile is memory-mapped, and only the selected rows are copied;
+    however, selecting by iter or id reads the (i,id) of every row, since
+    the iterations in a (restarted) logfile are not necessarily in order"""
+  header = numpy.fromfile(filename, dtype='f8', count=2)
+  if len(header) < 2:
+    return numpy.empty((0,2)), numpy.empty((0,0)), numpy.empty(0)
+  ny, nx = header.astype(int)
+  width = 2 + ny + nx
+  size = (os.path.getsize(filename) - header.nbytes) // (8 * width)
+  if not size:
+    data = numpy.empty((0,width))
+  else: # ignore any partially written row
+    data = numpy.memmap(filename, dtype='f8', mode='r', offset=header.nbytes,
+                        shape=(size,width))
+  # select the requested rows
+  mask = None
+  if iter is not None:
+    start, stop = iter if sequence(iter) else (None, iter)
+    if start is not None: mask = data[:,0] >= start
+    if stop is not None:
+      mask = data[:,0] < stop if mask is None else mask & (data[:,0] < stop)
+  if id is not None:
+    _mask = numpy.in1d(data[:,1], id)
+    mask = _mask if mask is None else mask & _mask
+  data = numpy.array(data if mask is None else data[mask])
+  cost = data[:,2] if ny == 1 else data[:,2:2+ny]
+  return data[:,:2], data[:,2+ny:], cost
+
 
 # read and write monitor (to and from raw data)
 
+def _copy(data):
+  "copy monitor data as a list (array-backed data is converted to a list)"
+  if hasattr(data, 'tolist'): return data.tolist()
+  return data[:]
+
 def read_monitor(mon, id=False):
-  steps = mon.x[:]
-  energy = mon.y[:]
+  steps = _copy(mon.x)
+  energy = _copy(mon.y)
   if not id:
     return steps, energy
-  id = mon.id[:]
+  id = _copy(mon.id)
   return steps, energy, id 
 
 def write_monitor(steps, energy, id=[]):
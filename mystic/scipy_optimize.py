@@ -89,8 +89,8 @@ The size of the simplex is dim+1.
         simplex = dim+1
         #XXX: cleaner to set npop=simplex, and use 'population' as simplex
         AbstractSolver.__init__(self,dim) #,npop=simplex)
-        self.popEnergy.append(self._init_popEnergy)
-        self.population.append([0.0 for i in range(dim)])
+        self.popEnergy = numpy.append(self.popEnergy, self._init_popEnergy)
+        self.population = numpy.vstack((self.population, numpy.zeros(dim)))
         xtol, ftol = 1e-4, 1e-4
         from mystic.termination import CandidateRelativeTolerance as CRT
         self._termination = CRT(xtol,ftol)
@@ -501,7 +501,7 @@ Takes one initial input:
                 # apply constraints
                 x = asfarray(self._constraints(x))
             # decouple from 'best' energy
-            self.energy_history = self.energy_history + [fval]
+            self.energy_history = list(self.energy_history) + [fval]
 
         else: # do generations > 1
             # Construct the extrapolated point
@@ -547,7 +547,7 @@ Takes one initial input:
                 x = asfarray(self._constraints(x))
 
             # decouple from 'best' energy
-            self.energy_history = self.energy_history + [fval]
+            self.energy_history = list(self.energy_history) + [fval]
 
         self.__internals = [x1, fx, bigind, delta]
         self._direc = direc
@@ -18,9 +18,11 @@ and in each derived optimizer.  Mystic's optimizers are::
     == Global Optimizers ==
     DifferentialEvolutionSolver  -- Differential Evolution algorithm
     DifferentialEvolutionSolver2 -- Price & Storn's Differential Evolution
+    AsyncDifferentialEvolutionSolver -- Asynchronous Differential Evolution
     == Pseudo-Global Optimizers ==
     BuckshotSolver               -- Uniform Random Distribution of N Solvers
     LatticeSolver                -- Distribution of N Solvers on a Regular Grid
+    ClusterSolver                -- Solvers Started Only Outside Known Basins
     == Local-Search Optimizers ==
     NelderMeadSimplexSolver      -- Nelder-Mead Simplex algorithm
     PowellDirectionalSolver      -- Powell's (modified) Level Set algorithm
@@ -60,11 +62,13 @@ or the API documentation found here::
 # global optimizers
 from differential_evolution import DifferentialEvolutionSolver
 from differential_evolution import DifferentialEvolutionSolver2
+from differential_evolution import AsyncDifferentialEvolutionSolver
 from differential_evolution import diffev, diffev2
 
 # pseudo-global optimizers
 from ensemble import BuckshotSolver
 from ensemble import LatticeSolver
+from ensemble import ClusterSolver
 
 # local-search optimizers
 from scipy_optimize import NelderMeadSimplexSolver
@@ -82,10 +86,15 @@ def LoadSolver(filename=None, **kwds):
 #       solver = self
 #   else:
     import dill
+    from mystic import _checkpoint
     if filename: f = file(filename, 'rb')
     else: return
     try:
-        solver = dill.load(f)
+        if _checkpoint.isincremental(f):
+            solver, state = _checkpoint.read(f)
+            _checkpoint.set_rng_state(state) # continue the random sequence
+        else:
+            solver = dill.load(f)
         _locals = {}
         _locals['solver'] = solver
         code = "from mystic.solvers import %s;" % solver._type
@@ -98,6 +107,7 @@ def LoadSolver(filename=None, **kwds):
     # transfer state from solver to self, allowing overrides
     self._AbstractSolver__load_state(solver, **kwds)
     self._state = filename
+    self._lastsave = None # count the save frequency from the restart
     self._stepmon.info('LOADED("%s")' % filename)
     return self
 
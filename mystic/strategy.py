@@ -13,9 +13,16 @@ Differential Evolution Strategies
 These strategies are to be passed into DifferentialEvolutionSolver's
 Solve method, and determine how the candidate parameter values mutate
 across a population.
+
+Each strategy may also be called without a candidate (i.e. strategy(inst)),
+in which case the entire trial population is generated at once with numpy
+array operations. This "vectorized" mode is only available for solvers that
+keep a trial population (e.g. DifferentialEvolutionSolver2), and is enabled
+by passing 'vectorize=True' to the solver's Solve method.
 """
 
 import random
+import numpy
 
 def get_random_candidates(NP, exclude, N):
     """select N random candidates from population of size NP,
@@ -25,16 +32,67 @@ Thus, get_random_candidates(x,1,2) randomly selects two nPop[i],
 where i != 1"""
     return random.sample(range(exclude)+range(exclude+1,NP), N)
 
+def get_random_candidates_array(NP, N):
+    """select N random candidates for each member of a population of size NP,
+where each member is excluded from its own selection.
+
+Returns an integer array of shape (NP, N), where row i holds the indices
+of N distinct members of the population, each with index != i"""
+    keys = numpy.random.rand(NP, NP)
+    keys[numpy.diag_indices(NP)] = numpy.inf # always sort self to the end
+    return keys.argsort(axis=1)[:,:N]
+
+
+#################### #################### #################### ####################
+#  Code below are helpers for the vectorized (whole population) strategies
+#################### #################### #################### ####################
+
+def _population(inst):
+    """get the current population and best solution as arrays"""
+    pop = numpy.asarray(inst.population, dtype=float)
+    best = numpy.asarray(inst.bestSolution, dtype=float)
+    return pop, best
+
+def _exponential_mask(inst):
+    """crossover mask that mutates from a random index until random stop"""
+    NP, ND = inst.nPop, inst.nDim
+    n = numpy.random.randint(ND, size=NP)
+    # count the consecutive mutations until the first random stop
+    keep = numpy.random.rand(NP, ND) < inst.probability
+    length = numpy.cumprod(keep, axis=1).sum(axis=1)
+    return (numpy.arange(ND) - n[:,None]) % ND < length[:,None]
+
+def _binomial_mask(inst):
+    """crossover mask that mutates at random, always including a random index"""
+    NP, ND = inst.nPop, inst.nDim
+    mask = numpy.random.rand(NP, ND) < inst.probability
+    mask[numpy.arange(NP), numpy.random.randint(ND, size=NP)] = True
+    return mask
+
+def _crossover(inst, pop, mutant, mask):
+    """write the crossover of population and mutant to the trial population"""
+    if not inst._map_solver:
+        raise TypeError, "vectorized strategies require a trial population"
+    inst.trialSolution[:] = numpy.where(mask, mutant, pop)
+    return
+
 
 #################### #################### #################### ####################
 #  Code below are the different crossovers/mutation strategies
 #################### #################### #################### ####################
 
-def Best1Exp(inst, candidate):
+def Best1Exp(inst, candidate=None):
     """trial solution is current best solution plus scaled difference
 of two randomly chosen candidates; mutates until random stop
 
 trial = best + scale*(candidate1 - candidate2)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2 = get_random_candidates_array(inst.nPop, 2).T
+        mutant = best + inst.scale * (pop[r1] - pop[r2])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2 = get_random_candidates(inst.nPop, candidate, 2) 
     n = random.randrange(inst.nDim)
 
@@ -57,13 +115,20 @@ trial = best + scale*(candidate1 - candidate2)"""
 #   inst._keepSolutionWithinRangeBoundary(inst.bestSolution)
     return
 
-def Best1Bin(inst, candidate):
+def Best1Bin(inst, candidate=None):
     """trial solution is current best solution plus scaled difference
 of two randomly chosen candidates; mutates at random
 
 trial = best + scale*(candidate1 - candidate2)"""
     # In DESolve, Best1Bin was identical to Best1Exp.
     # But the logic of Best1Bin is different from [1]. Reimplementing here.
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2 = get_random_candidates_array(inst.nPop, 2).T
+        mutant = best + inst.scale * (pop[r1] - pop[r2])
+        _crossover(inst, pop, mutant, _binomial_mask(inst))
+        return
+
     r1,r2 = get_random_candidates(inst.nPop, candidate, 2) 
 
     if inst._map_solver:
@@ -86,11 +151,18 @@ trial = best + scale*(candidate1 - candidate2)"""
 #   inst._keepSolutionWithinRangeBoundary(inst.bestSolution)
     return
 
-def Rand1Exp(inst, candidate):
+def Rand1Exp(inst, candidate=None):
     """trial solution is randomly chosen candidate plus scaled difference
 of two other randomly chosen candidates; mutates until random stop
 
 trial = candidate1 + scale*(candidate2 - candidate3)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2,r3 = get_random_candidates_array(inst.nPop, 3).T
+        mutant = pop[r1] + inst.scale * (pop[r2] - pop[r3])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2,r3 = get_random_candidates(inst.nPop, candidate, 3) 
     n = random.randrange(inst.nDim)
 
@@ -115,12 +187,20 @@ trial = candidate1 + scale*(candidate2 - candidate3)"""
 
 # WARNING, stuff below are not debugged
 
-def RandToBest1Exp(inst, candidate):
+def RandToBest1Exp(inst, candidate=None):
     """trial solution is itself plus scaled difference of best solution
 and trial solution, plus the difference of two randomly chosen candidates;
 mutates at random
 
 trial += scale*(best - trial) + scale*(candidate1 - candidate2)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2 = get_random_candidates_array(inst.nPop, 2).T
+        mutant = pop + inst.scale * (best - pop) + \
+                 inst.scale * (pop[r1] - pop[r2])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2 = get_random_candidates(inst.nPop, candidate, 2) 
     n = random.randrange(inst.nDim)
 
@@ -143,11 +223,18 @@ trial += scale*(best - trial) + scale*(candidate1 - candidate2)"""
 #   inst._keepSolutionWithinRangeBoundary(inst.trialSolution)
     return
 
-def Best2Exp(inst, candidate):
+def Best2Exp(inst, candidate=None):
     """trial solution is current best solution plus scaled contributions
 from four randomly chosen candidates; mutates until random stop
 
 trial = best + scale*(candidate1 + candidate2 - candidate3 - candidate4)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2,r3,r4 = get_random_candidates_array(inst.nPop, 4).T
+        mutant = best + inst.scale * (pop[r1] + pop[r2] - pop[r3] - pop[r4])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2,r3,r4 = get_random_candidates(inst.nPop, candidate, 4) 
     n = random.randrange(inst.nDim)
 
@@ -171,11 +258,18 @@ trial = best + scale*(candidate1 + candidate2 - candidate3 - candidate4)"""
 #   inst._keepSolutionWithinRangeBoundary(inst.bestSolution)
     return
 
-def Rand2Exp(inst, candidate):
+def Rand2Exp(inst, candidate=None):
     """trial solution is randomly chosen candidate plus scaled contributions
 from four other randomly chosen candidates; mutates until random stop
 
 trial = candidate1 + scale*(candidate2 + candidate3 - candidate4 - candidate5)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2,r3,r4,r5 = get_random_candidates_array(inst.nPop, 5).T
+        mutant = pop[r1] + inst.scale * (pop[r2] + pop[r3] - pop[r4] - pop[r5])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2,r3,r4,r5 = get_random_candidates(inst.nPop, candidate, 5) 
     n = random.randrange(inst.nDim)
 
@@ -199,11 +293,18 @@ trial = candidate1 + scale*(candidate2 + candidate3 - candidate4 - candidate5)""
 #   inst._keepSolutionWithinRangeBoundary(inst.population[r1])
     return
 
-def Rand1Bin(inst, candidate):
+def Rand1Bin(inst, candidate=None):
     """trial solution is randomly chosen candidate plus scaled difference
 of two other randomly chosen candidates; mutates at random
 
 trial = candidate1 + scale*(candidate2 - candidate3)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2,r3 = get_random_candidates_array(inst.nPop, 3).T
+        mutant = pop[r1] + inst.scale * (pop[r2] - pop[r3])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2,r3 = get_random_candidates(inst.nPop, candidate, 3) 
     n = random.randrange(inst.nDim)
 
@@ -225,12 +326,20 @@ trial = candidate1 + scale*(candidate2 - candidate3)"""
 #   inst._keepSolutionWithinRangeBoundary(inst.population[r1])
     return
 
-def RandToBest1Bin(inst, candidate):
+def RandToBest1Bin(inst, candidate=None):
     """trial solution is itself plus scaled difference of best solution
 and trial solution, plus the difference of two randomly chosen candidates;
 mutates until random stop
 
 trial += scale*(best - trial) + scale*(candidate1 - candidate2)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2 = get_random_candidates_array(inst.nPop, 2).T
+        mutant = pop + inst.scale * (best - pop) + \
+                 inst.scale * (pop[r1] - pop[r2])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2 = get_random_candidates(inst.nPop, candidate, 2) 
     n = random.randrange(inst.nDim)
 
@@ -253,11 +362,18 @@ trial += scale*(best - trial) + scale*(candidate1 - candidate2)"""
 #   inst._keepSolutionWithinRangeBoundary(inst.trialSolution)
     return
 
-def Best2Bin(inst, candidate):
+def Best2Bin(inst, candidate=None):
     """trial solution is current best solution plus scaled contributions
 of four randomly chosen candidates; mutates at random
 
 trial = best + scale*(candidate1 - candidate2 - candidate3 - candidate4)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2,r3,r4 = get_random_candidates_array(inst.nPop, 4).T
+        mutant = best + inst.scale * (pop[r1] + pop[r2] - pop[r3] - pop[r4])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2,r3,r4 = get_random_candidates(inst.nPop, candidate, 4) 
     n = random.randrange(inst.nDim)
 
@@ -281,11 +397,18 @@ trial = best + scale*(candidate1 - candidate2 - candidate3 - candidate4)"""
 #   inst._keepSolutionWithinRangeBoundary(inst.bestSolution)
     return
 
-def Rand2Bin(inst, candidate):
+def Rand2Bin(inst, candidate=None):
     """trial solution is randomly chosen candidate plus scaled contributions
 of four other randomly chosen candidates; mutates at random
 
 trial = candidate1 + scale*(candidate2 - candidate3 - candidate4 - candidate5)"""
+    if candidate is None: # generate the entire trial population at once
+        pop, best = _population(inst)
+        r1,r2,r3,r4,r5 = get_random_candidates_array(inst.nPop, 5).T
+        mutant = pop[r1] + inst.scale * (pop[r2] + pop[r3] - pop[r4] - pop[r5])
+        _crossover(inst, pop, mutant, _exponential_mask(inst))
+        return
+
     r1,r2,r3,r4,r5 = get_random_candidates(inst.nPop, candidate, 5) 
     n = random.randrange(inst.nDim)
 
@@ -465,17 +465,24 @@ Additional Inputs:
       for func in conditions:
         fid = str(id(func))
         fdict = {'name':fid, 'equation':func, 'container':funcs}
-        # build the condition function
-        code = """
-def %(container)s_%(name)s(x): return eval('%(equation)s')
+        # build the condition function, with the equation compiled inline;
+        # if the equation is not valid python, it is eval'd (and fails) per call
+        for body in ("%(equation)s", "eval('%(equation)s')"):
+            fdict['body'] = body % fdict
+            code = """
+def %(container)s_%(name)s(x): return %(body)s
 %(container)s_%(name)s.__name__ = '%(container)s'
 %(container)s_%(name)s.__doc__ = '%(equation)s'""" % fdict
-        #XXX: should locals just be the above dict of functions, or should we...
-        # add the condition to container then delete the condition
-        code += """
+            #XXX: should locals just be the above dict of functions, or should we...
+            # add the condition to container then delete the condition
+            code += """
 %(container)s.append(%(container)s_%(name)s)
 del %(container)s_%(name)s""" % fdict
-        code = compile(code, '<string>', 'exec')
+            try:
+                code = compile(code, '<string>', 'exec')
+                break
+            except SyntaxError:
+                pass
         exec code in globals, results
 
     #XXX: what's best form to return?  will couple these with ptypes
@@ -538,20 +545,27 @@ Additional Inputs:
     for func in _constraints:
         fid = str(id(func))
         fdict = {'name':fid, 'equation':func, 'container':'solver'}
-        # build the condition function
-        code = """
+        # build the condition function, with the equation compiled inline;
+        # if the equation is not valid python, it is exec'd (and fails) per call
+        for body in ("%(equation)s", "exec('%(equation)s')"):
+            fdict['body'] = body % fdict
+            code = """
 def %(container)s_%(name)s(x):
     '''%(equation)s'''
-    exec('%(equation)s')
+    %(body)s
     return x
 %(container)s_%(name)s.__name__ = '%(container)s'
 """ % fdict #XXX: better, check if constraint satisfied... if not, then solve
-        #XXX: should locals just be the above dict of functions, or should we...
-        # add the condition to container then delete the condition
-        code += """
+            #XXX: should locals just be the above dict of functions, or should we...
+            # add the condition to container then delete the condition
+            code += """
 %(container)s.append(%(container)s_%(name)s)
 del %(container)s_%(name)s""" % fdict
-        code = compile(code, '<string>', 'exec')
+            try:
+                code = compile(code, '<string>', 'exec')
+                break
+            except SyntaxError:
+                pass
         exec code in globals, results
 
     #XXX: what's best form to return?  will couple these with ctypes ?
@@ -19,6 +19,41 @@ null = ""
 # a module level singleton.
 EARLYEXIT = 0
 
+# intermediate results, shared by the conditions in a termination check
+def _shared(inst, key, function):
+  """get function(inst), computed once per termination check of the solver
+
+The solver holds a cache (inst._termcache) while checking its termination
+conditions, so compound conditions reuse any shared intermediate results.
+Outside of a check (e.g. when a condition is called directly), the result
+is computed on each call."""
+  cache = getattr(inst, '_termcache', None)
+  if cache is None: return function(inst)
+  try:
+    return cache[key]
+  except KeyError:
+    result = cache[key] = function(inst)
+    return result
+
+def _population(inst):
+  """get the solver population as an array"""
+  return _shared(inst, 'population', lambda x: numpy.asarray(x.population))
+
+def _popEnergy(inst):
+  """get the solver population energies as an array"""
+  return _shared(inst, 'popEnergy', lambda x: numpy.asarray(x.popEnergy))
+
+def _deviation(inst):
+  """get abs(population - population[0])"""
+  def deviation(inst):
+    sim = _population(inst)
+    errdict = numpy.seterr(invalid='ignore') # abs(inf - inf) is nan
+    try:
+      return abs(sim - sim[0])
+    finally:
+      numpy.seterr(**errdict)
+  return _shared(inst, 'deviation', deviation)
+
 # Factories that extend termination conditions
 class When(tuple):
   """provide a termination condition with more reporting options.
@@ -51,6 +86,8 @@ Additional Inputs:
     # return the unsatisfied conditions
     if info == 'not':
       return tuple(set([f for f in self if f not in self(solver, 'self')]))
+    # stop at the first unsatisfied condition
+    if not info: return all(f(solver, info) for f in self)
     # do some filtering...
     stop = {}
     [stop.update({f : f(solver, info)}) for f in self]
@@ -118,6 +155,8 @@ Additional Inputs:
     # return the unsatisfied conditions
     if info == 'not':
       return tuple(set([f for f in self if f not in self(solver, 'self')]))
+    # stop at the first satisfied condition
+    if not info: return any(f(solver, info) for f in self)
     # do some filtering...
     stop = {}
     [stop.update({f : f(solver, info)}) for f in self]
@@ -194,8 +233,7 @@ abs(xi-x0) <= xtol & abs(fi-f0) <= ftol, where x=params & f=cost"""
     #NOTE: this termination expects nPop > 1
     doc = "CandidateRelativeTolerance with %s" % {'xtol':xtol, 'ftol':ftol}
     def _CandidateRelativeTolerance(inst, info=False):
-        sim = numpy.array(inst.population)
-        fsim = numpy.array(inst.popEnergy)
+        fsim = _popEnergy(inst)
         if not len(fsim[1:]):
             warn = "Warning: Invalid termination condition (nPop < 2)"
             print warn
@@ -203,11 +241,13 @@ abs(xi-x0) <= xtol & abs(fi-f0) <= ftol, where x=params & f=cost"""
         #   raise ValueError, "Invalid termination condition (nPop < 2)"
         if info: info = lambda x:x
         else: info = bool
-        #FIXME: abs(inf - inf) will raise a warning...
-        errdict = numpy.seterr(invalid='ignore') #FIXME: turn off warning 
-        answer = max(numpy.ravel(abs(sim[1:]-sim[0]))) <= xtol
-        answer = answer and max(abs(fsim[0]-fsim[1:])) <= ftol
-        numpy.seterr(invalid=errdict['invalid']) #FIXME: turn on warnings
+        # check the energies first, as there are fewer of them
+        errdict = numpy.seterr(invalid='ignore') # abs(inf - inf) is nan
+        try:
+            answer = abs(fsim[0]-fsim[1:]).max() <= ftol
+        finally:
+            numpy.seterr(**errdict)
+        answer = answer and _deviation(inst)[1:].max() <= xtol
         if answer: return info(doc)
         return info(null)
     _CandidateRelativeTolerance.__doc__ = doc
@@ -221,8 +261,8 @@ sum(abs(last_params - current_params)) <= tolerance"""
     def _SolutionImprovement(inst, info=False):
         if info: info = lambda x:x
         else: info = bool
-        best = numpy.array(inst.bestSolution)
-        trial = numpy.array(inst.trialSolution)
+        best = numpy.asarray(inst.bestSolution)
+        trial = numpy.asarray(inst.trialSolution)
         update = abs(best - trial) #XXX: if inf - inf ?
         answer = numpy.add.reduce(update.T)
         if isinstance(answer, numpy.ndarray): # if trialPop, take 'best' answer
@@ -288,11 +328,11 @@ abs(params - params[0]) <= tolerance"""
     def _PopulationSpread(inst, info=False):
         if info: info = lambda x:x
         else: info = bool
-        sim = numpy.array(inst.population)
+        sim = _population(inst)
         #if not len(sim[1:]):
         #    print "Warning: Invalid termination condition (nPop < 2)"
         #    return True
-        if numpy.all(abs(sim - sim[0]) <= abs(tolerance * sim[0])): return info(doc)
+        if numpy.all(_deviation(inst) <= abs(tolerance * sim[0])): return info(doc)
         return info(null)
     _PopulationSpread.__doc__ = doc
     return _PopulationSpread
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+"""
+This module contains map and pipe interfaces to a pool of python threads.
+
+Pipe methods provided:
+    pipe        - blocking communication pipe             [returns: value]
+    apipe       - asynchronous communication pipe         [returns: object]
+
+Map methods provided:
+    map         - blocking and ordered worker pool        [returns: list]
+    imap        - non-blocking and ordered worker pool    [returns: iterator]
+    uimap       - non-blocking and unordered worker pool  [returns: iterator]
+    amap        - asynchronous worker pool                [returns: object]
+
+
+Usage
+=====
+
+A typical call to a mystic threading map will roughly follow this example:
+
+    >>> # instantiate and configure the worker pool
+    >>> from mystic.threads import ThreadPool
+    >>> pool = ThreadPool(nodes=4)
+    >>>
+    >>> # do a blocking map on the chosen function
+    >>> results = pool.map(pow, [1,2,3,4], [5,6,7,8])
+    >>>
+    >>> # do a non-blocking map, then extract the results from the iterator
+    >>> results = pool.imap(pow, [1,2,3,4], [5,6,7,8])
+    >>> results = list(results)
+    >>>
+    >>> # do an asynchronous map, then get the results
+    >>> results = pool.amap(pow, [1,2,3,4], [5,6,7,8])
+    >>> while not results.ready():
+    >>>     time.sleep(5); print ".",
+    >>> results = results.get()
+    >>>
+    >>> # use the worker pool with a map solver
+    >>> solver.SetMapper(pool.map)
+
+
+Notes
+=====
+
+The workers are threads within the calling process, so neither the function
+nor its arguments or results are serialized or copied.  Only one thread runs
+python code at a time; thus, a thread pool is faster than serial python only
+when the function spends its time outside of the interpreter (e.g. in numpy
+routines or compiled extensions that release the GIL, or waiting on files,
+sockets, or subprocesses).
+
+Since the workers share the caller's memory, evaluation monitors and counters
+bound with mystic.tools.wrap_function are updated in the calling process.
+Mystic's map solvers keep their evaluation monitors when using a thread pool.
+
+"""
+__all__ = ['ThreadPool']
+
+from abstract_launcher import AbstractWorkerPool
+from itertools import izip as _izip
+
+
+def _star(f):
+    """convert f(*args) to f(args)"""
+    def function(args):
+        return f(*args)
+    return function
+
+
+class ThreadPool(AbstractWorkerPool):
+    """
+Mapper that leverages a pool of python threads.
+    """
+    def __init__(self, *args, **kwds):
+        """
+Important class members:
+    nodes       - number of worker threads  [default = # of processors]
+    chunksize   - number of jobs sent to a worker at once  [default = None]
+        """
+        self.__nodes = 1
+        self.chunksize = kwds.pop('chunksize', None)
+        self.__pool = None # the worker pool
+        self.__closed = [] # closed worker pools, with jobs outstanding
+        if not args: kwds.setdefault('nodes', None)
+        AbstractWorkerPool.__init__(self, *args, **kwds)
+        return
+    def __serve(self):
+        """get the worker pool, starting it if needed"""
+        if self.__pool is None:
+            from multiprocessing.pool import ThreadPool as Pool
+            self.__pool = Pool(self.__nodes)
+        return self.__pool
+    def map(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__map(self, f, *args, **kwds)
+        pool = self.__serve()
+        return pool.map(_star(f), _izip(*args), self.chunksize)
+    map.__doc__ = AbstractWorkerPool.map.__doc__
+    def imap(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__imap(self, f, *args, **kwds)
+        pool = self.__serve()
+        return pool.imap(_star(f), _izip(*args), self.chunksize or 1)
+    imap.__doc__ = AbstractWorkerPool.imap.__doc__
+    def uimap(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__imap(self, f, *args, **kwds)
+        pool = self.__serve()
+        return pool.imap_unordered(_star(f), _izip(*args), self.chunksize or 1)
+    uimap.__doc__ = AbstractWorkerPool.uimap.__doc__
+    def amap(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__map(self, f, *args, **kwds)
+        pool = self.__serve()
+        return pool.map_async(_star(f), _izip(*args), self.chunksize)
+    amap.__doc__ = AbstractWorkerPool.amap.__doc__
+    ########################################################################
+    # PIPES
+    def pipe(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__pipe(self, f, *args, **kwds)
+        pool = self.__serve()
+        return pool.apply(f, args, kwds)
+    pipe.__doc__ = AbstractWorkerPool.pipe.__doc__
+    def apipe(self, f, *args, **kwds):
+        AbstractWorkerPool._AbstractWorkerPool__pipe(self, f, *args, **kwds)
+        pool = self.__serve()
+        return pool.apply_async(f, args, kwds)
+    apipe.__doc__ = AbstractWorkerPool.apipe.__doc__
+    ########################################################################
+    def close(self):
+        """stop the workers, once all submitted jobs are complete"""
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__closed.append(self.__pool)
+            self.__pool = None
+        return
+    def join(self):
+        """wait for the closed workers to exit"""
+        while self.__closed:
+            self.__closed.pop(0).join()
+        return
+    def terminate(self):
+        """stop the workers immediately"""
+        self.close()
+        for pool in self.__closed:
+            pool.terminate()
+        return
+    def __exit__(self, *args):
+        self.close()
+        return
+    def __getstate__(self):
+        # the workers are not saved (i.e. with a solver's mapper)
+        state = self.__dict__.copy()
+        state['_ThreadPool__pool'] = None
+        state['_ThreadPool__closed'] = []
+        return state
+    def __repr__(self):
+        return "<pool %s(nodes=%s)>" % (self.__class__.__name__, self.__nodes)
+    ########################################################################
+    # interface
+    def __get_nodes(self):
+        """get the number of nodes in the pool"""
+        return self.__nodes
+    def __set_nodes(self, nodes):
+        """set the number of nodes in the pool"""
+        if nodes is None:
+            from multiprocessing import cpu_count
+            nodes = cpu_count()
+        nodes = int(nodes)
+        if nodes < 1:
+            raise ValueError, "nodes must be a positive integer"
+        if nodes != self.__nodes: self.close() # restart with the new nodes
+        self.__nodes = nodes
+        return
+    nodes = property(__get_nodes, __set_nodes)
+    pass
+
+
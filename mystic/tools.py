@@ -15,6 +15,7 @@ Various python tools
 
 Main functions exported are:: 
     - isiterable: check if an object is iterable
+    - isbatch: check if an object is a batch (2-D array) of parameter vectors
     - flatten: flatten a sequence
     - flatten_array: flatten an array 
     - getch: provides "press any key to quit"
@@ -24,12 +25,17 @@ Main functions exported are::
     - wrap_function: bind an EvaluationMonitor and an evaluation counter
         to a function object
     - wrap_bounds: impose bounds on a function object
+    - wrap_batch: call a batch function object with a single parameter vector
+    - wrap_cache: memoize a function object with a cache decorator
     - unpair: convert a 1D array of N pairs to two 1D arrays of N values
     - src: extract source code from a python code object
 
 Other tools of interest are in::
     `mystic.mystic.filters` and `mystic.models.poly`
 """
+from threading import RLock as _RLock
+_lock = _RLock() # serializes updates to evaluation counters and monitors,
+                 # when the cost is mapped with a thread pool
 
 def isiterable(x):
     """check if an object is iterable"""
@@ -52,6 +58,15 @@ def list_or_tuple_or_ndarray(x):
     import numpy
     return isinstance(x, (list, tuple, numpy.ndarray))
 
+def isbatch(x):
+    "True if x is a 2-D array (or a sequence of sequences), i.e. a batch"
+    ndim = getattr(x, 'ndim', None)
+    if ndim is not None: return ndim == 2
+    try:
+        return hasattr(x[0], '__len__')
+    except (TypeError, IndexError, KeyError):
+        return False
+
 def listify(x):
     "recursivly convert all members of a sequence to a list"
     if not list_or_tuple_or_ndarray(x): return x
@@ -131,31 +146,79 @@ thus, the constraints will be enforced at every cost function evaluation.
         return function(inner_function(_x))
     return function_wrapper
 
-def wrap_penalty(function, penalty_function):
+def wrap_penalty(function, penalty_function, batch=False):
     """append a function call to a function object
 
 This is useful for binding a penalty function to a cost function;
 thus, the penalty will be evaluated at every cost function evaluation.
+
+If batch=True, the function object takes an array of parameter vectors,
+while the penalty function is evaluated for each of the parameter vectors.
     """
+    if batch:
+        from numpy import asarray
+        def function_wrapper(x):
+            _x = asarray(x, dtype=float)
+            penalty = [penalty_function(xi) for xi in _x]
+            return asarray(function(_x)) + asarray(penalty)
+        return function_wrapper
     def function_wrapper(x):
         _x = x[:] #XXX: trouble if x not a list or ndarray... maybe "deepcopy"?
         return function(_x) + penalty_function(_x)
     return function_wrapper
 
-def wrap_function(function, args, EvaluationMonitor):
+def wrap_function(function, args, EvaluationMonitor, batch=False, lock=None):
     """bind an EvaluationMonitor and an evaluation counter
-to a function object"""
+to a function object
+
+If batch=True, the function object takes an array of parameter vectors,
+and returns a sequence of costs. Each parameter vector counts as a function
+evaluation, and is logged to the EvaluationMonitor.
+
+If the function object is called from several threads at once (e.g. mapped
+with a thread pool), provide a lock; the counter and the EvaluationMonitor
+are then updated under the lock."""
     ncalls = [0]
     from numpy import array
+    if batch:
+        from numpy import asarray
+        def function_wrapper(x):
+            x = asarray(x, dtype=float)
+            if lock is None:
+                ncalls[0] += len(x)
+                fval = asarray(function(x, *args))
+                for (xi, fi) in zip(x, fval):
+                    EvaluationMonitor(xi, fi)
+                return fval
+            with lock:
+                ncalls[0] += len(x)
+            fval = asarray(function(x, *args))
+            with lock:
+                for (xi, fi) in zip(x, fval):
+                    EvaluationMonitor(xi, fi)
+            return fval
+        return ncalls, function_wrapper
+    if lock is None:
+        def function_wrapper(x):
+            ncalls[0] += 1
+            fval =  function(x, *args)
+            EvaluationMonitor(x, fval)
+            return fval
+        return ncalls, function_wrapper
     def function_wrapper(x):
-        ncalls[0] += 1
+        with lock:
+            ncalls[0] += 1
         fval =  function(x, *args)
-        EvaluationMonitor(x, fval)
+        with lock:
+            EvaluationMonitor(x, fval)
         return fval
     return ncalls, function_wrapper
 
-def wrap_bounds(function, min=None, max=None):
-    "impose bounds on a function object"
+def wrap_bounds(function, min=None, max=None, batch=False):
+    """impose bounds on a function object
+
+If batch=True, the function object takes an array of parameter vectors,
+and only the parameter vectors within bounds are passed to the function."""
     from numpy import asarray, any, inf
     bounds = True
     if min is not None and max is not None: #has upper & lower bound
@@ -169,7 +232,17 @@ def wrap_bounds(function, min=None, max=None):
         min = asarray([-inf for i in max])
     else: #not bounded
         bounds = False
-    if bounds:
+    if bounds and batch:
+        from numpy import empty
+        def function_wrapper(x):
+            x = asarray(x, dtype=float)
+            fval = empty(len(x)) #if violate bounds, evaluate as inf
+            fval.fill(inf)
+            valid = ~any((x<min)|(x>max), axis=-1)
+            if valid.any():
+                fval[valid] = function(x[valid])
+            return fval
+    elif bounds:
         def function_wrapper(x):
             if any((x<min)|(x>max)): #if violate bounds, evaluate as inf
                 return inf
@@ -179,6 +252,32 @@ def wrap_bounds(function, min=None, max=None):
             return function(x)
     return function_wrapper
 
+def wrap_batch(function):
+    """call a batch function object with a single parameter vector
+
+This is useful for using a batch cost function, of the form y = f(X) where
+X is an array of parameter vectors, with a solver that evaluates a single
+parameter vector at a time."""
+    from numpy import asarray
+    def function_wrapper(x, *args):
+        return asarray(function(asarray([x], dtype=float), *args))[0]
+    return function_wrapper
+
+def wrap_cache(function, cache):
+    """memoize a function object with a (klepto) cache decorator
+
+The function object is cached on the values of the parameter vector, rounded
+as configured in the cache decorator (i.e. with 'tol'). Returns the cached
+function, which provides the cache interface (e.g. info, dump, load), and
+the memoized function object."""
+    from numpy import asarray
+    def cached(*x):
+        return function(asarray(x))
+    cached = cache(cached)
+    def function_wrapper(x):
+        return cached(*x)
+    return cached, function_wrapper
+
 def wrap_cf(CF, REG=None, cfmult = 1.0, regmult = 0.0):
     "wrap a cost function..."
     def _(*args, **kwargs):
@@ -9,6 +9,7 @@ __doc__ = """
 mystic_log_reader.py [options] filename
 
 plot parameter convergence from file written with 'LoggingMonitor'
+(as text, or as binary with 'LoggingMonitor(binary=True)')
 
 
 Required Inputs:
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.monitors import Monitor, ArrayMonitor
+from mystic.solvers import DifferentialEvolutionSolver2, PowellDirectionalSolver
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.tools import random_seed
+from mystic.models import rosen
+import numpy
+
+def _fill(monitor, n, start=0):
+  for i in range(start, start+n):
+    monitor([i, i+1., i+2.], -i, id=i%3)
+  return monitor
+
+def _solve(solver, evalmon, stepmon):
+  random_seed(123)
+  solver = solver(3, 20) if solver is DifferentialEvolutionSolver2 \
+           else solver(3)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetGenerationMonitor(stepmon)
+  solver.SetEvaluationLimits(generations=100)
+  solver.Solve(rosen, COG(generations=20))
+  return solver
+
+
+def test_array_monitor():
+
+  mon = _fill(Monitor(), 10)
+  amon = _fill(ArrayMonitor(size=4), 10)
+  assert len(amon) == len(mon) == amon._step == 10
+  assert len(amon._xa) == 16 # capacity has doubled twice
+  assert amon.x.tolist() == mon.x
+  assert amon.y.tolist() == mon.y
+  assert amon.id.tolist() == mon.id
+  assert amon.x.base is amon._xa # a view of the storage
+  # the storage is set up after Monitor.__init__, and can be cleared
+  base = set(vars(Monitor())) - set(['_x', '_y', '_id'])
+  assert base <= set(vars(ArrayMonitor()))
+  amon._x = []
+  assert len(amon) == 0 and amon._xa is None
+  try:
+    amon._y = [1.]
+    raise AssertionError('stored entries can only be cleared')
+  except AttributeError:
+    pass
+
+
+def test_extend_prepend():
+
+  mon = _fill(Monitor(), 5)
+  mon.info('first')
+  amon = _fill(ArrayMonitor(size=2), 3, start=5)
+  amon.info('second')
+  amon.prepend(mon)
+  amon.extend(_fill(ArrayMonitor(), 2, start=8))
+  full = _fill(Monitor(), 10)
+  assert amon.x.tolist() == full.x
+  assert amon.y.tolist() == full.y
+  assert amon.id.tolist() == full.id
+  assert amon._info == ['first', 'second']
+  # a basic Monitor can also take the contents of an ArrayMonitor
+  mon = Monitor()
+  mon.extend(amon)
+  assert numpy.array(mon.x).tolist() == full.x
+
+
+def test_solver_monitors():
+
+  for solver in (DifferentialEvolutionSolver2, PowellDirectionalSolver):
+    evalmon, stepmon = Monitor(), Monitor()
+    _evalmon, _stepmon = ArrayMonitor(), ArrayMonitor()
+    s = _solve(solver, evalmon, stepmon)
+    _s = _solve(solver, _evalmon, _stepmon)
+    assert s.bestEnergy == _s.bestEnergy
+    assert s.generations == _s.generations
+    assert numpy.all(numpy.array(evalmon.x) == _evalmon.x)
+    assert numpy.all(numpy.array(stepmon.y) == _stepmon.y)
+    assert numpy.all(_s.energy_history == _stepmon.y)
+
+
+def test_support_file():
+
+  from mystic.munge import write_support_file
+  import os
+  mon = _fill(Monitor(), 10)
+  amon = _fill(ArrayMonitor(), 10)
+  write_support_file(mon, 'paramlog_a.py')
+  write_support_file(amon, 'paramlog_b.py')
+  a = {}; b = {}
+  execfile('paramlog_a.py', a)
+  execfile('paramlog_b.py', b)
+  os.remove('paramlog_a.py'); os.remove('paramlog_b.py')
+  assert a['params'] == b['params'] and a['cost'] == b['cost']
+
+
+if __name__ == '__main__':
+  test_array_monitor()
+  test_extend_prepend()
+  test_solver_monitors()
+  test_support_file()
+
+
+# EOF
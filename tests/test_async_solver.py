@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import AsyncDifferentialEvolutionSolver, LoadSolver
+from mystic.termination import VTR
+from mystic.strategy import Best1Exp
+from mystic.monitors import Monitor
+from mystic.tools import random_seed
+from mystic.models import rosen
+import numpy
+import time
+
+def slow_rosen(x):
+  time.sleep(0.002 * (1 + 9 * (x[0] > 0))) # runtime varies 10x
+  return rosen(x)
+
+def _solver(ndim=3, npop=20):
+  solver = AsyncDifferentialEvolutionSolver(ndim, npop)
+  solver.SetRandomInitialPoints([-2.]*ndim, [2.]*ndim)
+  solver.SetStrictRanges([-2.]*ndim, [2.]*ndim)
+  solver.SetEvaluationLimits(generations=1000)
+  return solver
+
+
+def test_async_serial():
+
+  random_seed(123)
+  solver = _solver()
+  evalmon, stepmon = Monitor(), Monitor()
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetGenerationMonitor(stepmon)
+  solver.Solve(rosen, VTR(1e-4), strategy=Best1Exp)
+  assert solver.bestEnergy <= 1e-4
+  assert solver.evaluations == len(evalmon) > 0
+  assert len(stepmon) == solver.generations + 1
+  assert min(evalmon.y) == solver.bestEnergy
+  # evaluations are counted within the bounds, for each iteration of nPop
+  assert solver.evaluations <= solver.nPop * len(stepmon)
+
+
+def test_async_map():
+
+  from multiprocessing.pool import ThreadPool
+  pool = ThreadPool(4)
+  def amap(f, x, **kwds):
+    return pool.map_async(f, x)
+  random_seed(123)
+  solver = _solver()
+  evalmon = Monitor()
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetMapper(amap)
+  solver.Solve(slow_rosen, VTR(1e-2), strategy=Best1Exp)
+  assert solver.bestEnergy <= 1e-2
+  assert solver.evaluations == len(evalmon)
+  # the trials still pending when Solve exits are collected
+  assert solver._pending == []
+  pool.close(); pool.join()
+
+
+def test_async_restart():
+
+  import os
+  random_seed(123)
+  solver = _solver()
+  solver.SetSaveFrequency(10, 'async_solver.pkl')
+  solver.SetEvaluationLimits(generations=20)
+  solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+  restart = LoadSolver('async_solver.pkl')
+  assert restart.generations == solver.generations == 20
+  assert restart._pending == solver._pending == []
+  assert numpy.all(restart.population == solver.population)
+  restart.SetEvaluationLimits(generations=40)
+  restart.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+  assert restart.generations == 40
+  assert restart.bestEnergy <= solver.bestEnergy
+  # the restarted solver saves its final state to the same file
+  os.remove('async_solver.pkl')
+
+
+def test_async_evaluations():
+
+  random_seed(123)
+  solver = AsyncDifferentialEvolutionSolver(3, 20)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetEvaluationLimits(generations=5)
+  trials = [0]
+  def strategy(inst, candidate):
+    trials[0] += 1
+    return Best1Exp(inst, candidate)
+  solver.Solve(rosen, VTR(0.0), strategy=strategy)
+  # the initial population is evaluated once, then only new trials
+  assert solver.evaluations == solver.nPop + trials[0]
+  # no evaluations are made beyond the evaluation limit
+  solver = _solver()
+  solver.SetEvaluationLimits(generations=1000, evaluations=150)
+  solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+  assert solver.evaluations <= 150 and solver._pending == []
+  assert solver.generations < 1000
+
+
+def test_async_batch():
+
+  random_seed(123)
+  solver = _solver()
+  batchmon = Monitor()
+  def batch_rosen(x):
+    batchmon(x, None) # each trial is evaluated alone
+    return [rosen(xi) for xi in x]
+  solver.SetObjective(batch_rosen, batch=True)
+  solver.Solve(termination=VTR(1e-4), strategy=Best1Exp)
+  assert solver.bestEnergy <= 1e-4
+  assert all(len(x) == 1 for x in batchmon.x)
+  from mystic.cache import lru_cache
+  try:
+    solver.SetCache(lru_cache)
+    assert False
+  except NotImplementedError:
+    pass
+
+
+if __name__ == '__main__':
+  test_async_serial()
+  test_async_map()
+  test_async_restart()
+  test_async_evaluations()
+  test_async_batch()
+
+
+# EOF
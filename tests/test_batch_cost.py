@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.termination import VTR, ChangeOverGeneration as COG
+from mystic.monitors import Monitor
+from mystic.tools import random_seed
+from mystic.models import rosen
+import numpy
+
+calls = [0]
+
+def batch_rosen(X, scale=1.0):
+  calls[0] += 1
+  X = numpy.asarray(X)
+  return scale * numpy.sum(100.0*(X[:,1:]-X[:,:-1]**2.0)**2.0 + \
+                           (1-X[:,:-1])**2.0, axis=1)
+
+def penalty(x):
+  return 10.0 * max(0.0, x[0] - 1.5)
+
+def _solve(batch, ndim=3, npop=20, bounds=True):
+  random_seed(321)
+  evalmon = Monitor()
+  solver = DifferentialEvolutionSolver2(ndim, npop)
+  solver.SetRandomInitialPoints([-2.]*ndim, [2.]*ndim)
+  if bounds: solver.SetStrictRanges([-2.]*ndim, [2.]*ndim)
+  solver.SetPenalty(penalty)
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetEvaluationLimits(generations=200)
+  if batch:
+    solver.SetObjective(batch_rosen, ExtraArgs=(1.0,), batch=True)
+  else:
+    solver.SetObjective(rosen, ExtraArgs=())
+  solver.Solve(termination=COG(generations=50))
+  return solver, evalmon
+
+
+def test_batch_wrappers():
+
+  from mystic.tools import wrap_function, wrap_bounds, wrap_penalty
+  from mystic.tools import wrap_batch
+  X = numpy.array([[0.,0.,0.],[1.,1.,1.],[3.,0.,0.]])
+  evalmon = Monitor()
+  ncalls, cost = wrap_function(batch_rosen, (), evalmon, batch=True)
+  cost = wrap_bounds(cost, [-2.]*3, [2.]*3, batch=True)
+  cost = wrap_penalty(cost, penalty, batch=True)
+  y = cost(X)
+  assert y[0] == rosen(X[0]) and y[1] == rosen(X[1]) and y[2] == numpy.inf
+  assert ncalls[0] == 2 and len(evalmon) == 2
+  assert wrap_batch(batch_rosen)(X[0]) == rosen(X[0])
+
+
+def test_batch_solve():
+
+  solver, evalmon = _solve(False)
+  calls[0] = 0
+  _solver, _evalmon = _solve(True)
+  # the trial population is evaluated in one call per generation
+  assert calls[0] <= _solver.generations + 1
+  # batch and single-vector costs should yield identical results
+  assert solver.bestEnergy == _solver.bestEnergy
+  assert numpy.allclose(solver.bestSolution, _solver.bestSolution)
+  assert solver.evaluations == _solver.evaluations == len(_evalmon)
+  assert len(evalmon) == len(_evalmon)
+
+
+def test_batch_single():
+
+  random_seed(321)
+  calls[0] = 0
+  solver = NelderMeadSimplexSolver(3)
+  solver.SetInitialPoints([0.5, 0.5, 0.5])
+  solver.SetObjective(batch_rosen, batch=True)
+  solver.Solve(termination=VTR(1e-6))
+  assert calls[0] == solver.evaluations
+  assert numpy.allclose(solver.bestSolution, [1,1,1], atol=1e-2)
+
+
+if __name__ == '__main__':
+  test_batch_wrappers()
+  test_batch_solve()
+  test_batch_single()
+
+
+# EOF
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic import benchmarks
+import mystic.solvers
+import tempfile
+import os
+
+
+def test_registry():
+
+  for name in benchmarks.solvers:
+    assert hasattr(mystic.solvers, name)
+  for name, problem in benchmarks.problems.items():
+    for dim in problem.dims:
+      assert problem.allows(dim)
+  assert benchmarks.problems['rosen'].allows(16)
+  assert not benchmarks.problems['griewangk'].allows(11)
+  assert not benchmarks.problems['corana'].allows(2)
+
+
+def test_run():
+
+  record = benchmarks.run('NelderMeadSimplexSolver', 'rosen', 3)
+  assert record['evaluations'] > 0 and record['seconds'] > 0
+  assert record['rate'] > 0
+  assert record['error'] < 1e-6
+  # runs are reproducible
+  again = benchmarks.run('NelderMeadSimplexSolver', 'rosen', 3)
+  assert again['evaluations'] == record['evaluations']
+  assert again['energy'] == record['energy']
+  # the nested evaluations are counted for an ensemble solver
+  record = benchmarks.run('BuckshotSolver', 'zimmermann', evaluations=500)
+  assert record['evaluations'] > 500
+  try:
+    benchmarks.run('NelderMeadSimplexSolver', 'corana', 2)
+    assert False
+  except ValueError:
+    pass
+
+
+def test_compare():
+
+  results = benchmarks.suite(['NelderMeadSimplexSolver'], ['rosen'], [2, 3], \
+                             isolate=False)
+  assert [r['dim'] for r in results] == [2, 3]
+  filename = tempfile.mktemp(suffix='.json')
+  try:
+    benchmarks.save(results, filename)
+    baseline = benchmarks.load(filename)
+  finally:
+    os.remove(filename)
+  assert baseline == results
+  assert not benchmarks.compare(results, baseline, time=1e6, memory=1e6)
+  # a slower and less accurate run is a regression
+  worse = [dict(r) for r in results]
+  worse[0]['seconds'] *= 10
+  worse[1]['error'] += 1.0
+  regressions = benchmarks.compare(worse, baseline, memory=1e6)
+  assert len(regressions) == 2
+  assert 'seconds' in regressions[0] and 'error' in regressions[1]
+
+
+def test_scaling():
+
+  records = benchmarks.scaling(pools=['threads', 'processes'], nodes=(1, 2), \
+                               durations=(0.0,), generations=2)
+  # serial, then strong and weak scaling for each pool and number of nodes
+  assert len(records) == 2 * (1 + 2*2*2)
+  for record in records:
+    assert record['seconds'] > 0 and record['speedup'] > 0
+    assert record['efficiency'] == record['speedup'] / record['nodes']
+    if record['mode'] == 'weak':
+      assert record['size'] == 8 * record['nodes']
+    # only the process pool serializes the evaluations
+    assert (record['bytes'] > 0) == (record['pool'] == 'processes')
+  # the work is the same with any pool
+  evaluations = {}
+  for record in records:
+    key = (record['solver'], record['size'])
+    assert evaluations.setdefault(key, record['evaluations']) == \
+           record['evaluations']
+  # the bytes are counted by the map, for a pool that does not count them
+  import dill
+  class Pool(object):
+    def map(self, f, *args, **kwds): return [f(*arg) for arg in zip(*args)]
+  map, count = benchmarks._counted(Pool())
+  assert map(abs, [-1., 2.]) == [1., 2.]
+  assert count() == 2 * (len(dill.dumps((1.,), -1)) + len(dill.dumps(1., -1)))
+
+
+if __name__ == '__main__':
+  test_registry()
+  test_run()
+  test_compare()
+  test_scaling()
+
+
+# EOF
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.monitors import Monitor, DecimatingMonitor, ReservoirMonitor
+from mystic.monitors import BestMonitor, ImprovingMonitor
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.tools import random_seed
+from mystic.models import rosen
+
+def _fill(monitor, n=1000):
+  for i in range(n):
+    monitor([i, -i], (i * 37) % 101, id=i)
+  return monitor
+
+
+def test_decimating():
+
+  mon = _fill(DecimatingMonitor(size=10))
+  assert len(mon) <= 10
+  step = mon.id[1] - mon.id[0]
+  assert mon.id == range(0, 1000, step)
+  mon = _fill(DecimatingMonitor(size=1000, step=7))
+  assert mon.id == range(0, 1000, 7)
+
+
+def test_reservoir():
+
+  mon = _fill(ReservoirMonitor(size=50, seed=123))
+  assert len(mon) == 50
+  assert mon.id == sorted(mon.id)
+  assert mon.id[-1] > 500 # sampled from the full history
+  assert mon.x == _fill(ReservoirMonitor(size=50, seed=123)).x
+  # the sample is uniform over the history
+  counts = [0]*10
+  for seed in range(100):
+    for i in _fill(ReservoirMonitor(size=10, seed=seed)).id:
+      counts[i/100] += 1
+  assert min(counts) > 50 and max(counts) < 150
+
+
+def test_best():
+
+  mon = _fill(BestMonitor(size=20))
+  full = _fill(Monitor())
+  assert len(mon) == 20
+  assert sorted(mon.y) == sorted(full.y)[:20]
+  assert mon.id == sorted(mon.id)
+
+
+def test_improving():
+
+  mon = _fill(ImprovingMonitor(), 100)
+  assert mon.y == [0]
+  mon = ImprovingMonitor(size=2)
+  for i in range(10):
+    mon([i], 10 - i + (i % 2) * 5)
+  assert mon.y == [4, 2]
+
+
+def test_solver_monitors():
+
+  from mystic.munge import write_support_file
+  import os
+  monitors = (DecimatingMonitor(100), ReservoirMonitor(100, seed=1),
+              BestMonitor(100), ImprovingMonitor(100))
+  for (i,monitor) in enumerate(monitors):
+    random_seed(123)
+    solver = DifferentialEvolutionSolver2(3, 20)
+    solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+    solver.SetEvaluationMonitor(monitor)
+    solver.SetEvaluationLimits(generations=100)
+    solver.Solve(rosen, COG(generations=200))
+    assert solver.evaluations > 1000
+    assert 0 < len(monitor) <= 100
+    assert min(monitor.y) == solver.bestEnergy or \
+           isinstance(monitor, (DecimatingMonitor, ReservoirMonitor))
+    filename = 'paramlog_bounded%s.py' % i
+    write_support_file(monitor, filename)
+    log = {}
+    execfile(filename, log)
+    os.remove(filename)
+    assert log['cost'] == monitor.y and len(log['params']) == 3
+    assert len(log['params'][0]) == len(monitor)
+
+
+if __name__ == '__main__':
+  test_decimating()
+  test_reservoir()
+  test_best()
+  test_improving()
+  test_solver_monitors()
+
+
+# EOF
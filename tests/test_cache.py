@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.termination import VTR, ChangeOverGeneration as COG
+from mystic.cache import lru_cache, lfu_cache, dir_archive
+from mystic.monitors import Monitor
+from mystic.tools import random_seed, wrap_cache
+from mystic.models import rosen
+import numpy
+
+calls = [0]
+
+def counted_rosen(x):
+  calls[0] += 1
+  return rosen(x)
+
+
+def test_wrap_cache():
+
+  calls[0] = 0
+  cached, cost = wrap_cache(counted_rosen, lru_cache(maxsize=10, tol=3))
+  x = numpy.array([0.5, 1.0, 1.5])
+  assert cost(x) == rosen(x)
+  assert cost(x + 1e-5) == rosen(x) # rounded to the same key
+  assert cost(x + 1e-2) == rosen(x + 1e-2)
+  assert calls[0] == 2
+  hit, miss, load, maxsize, size = cached.info()
+  assert (hit, miss, size) == (1, 2, 2)
+
+
+def _solve(cache=None, ndim=3, npop=20, **kwds):
+  random_seed(123)
+  calls[0] = 0
+  evalmon = Monitor()
+  solver = DifferentialEvolutionSolver2(ndim, npop)
+  solver.SetRandomInitialPoints([-2.]*ndim, [2.]*ndim)
+  solver.SetStrictRanges([-2.]*ndim, [2.]*ndim)
+  solver.SetConstraints(lambda x: numpy.round(x, 1)) # revisits points
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetEvaluationLimits(generations=100)
+  solver.SetCache(cache, **kwds)
+  solver.Solve(counted_rosen, COG(generations=20))
+  return solver, evalmon
+
+
+def test_solver_cache():
+
+  solver, evalmon = _solve()
+  assert solver.CacheInfo() is None
+  uncached = solver.bestEnergy
+  solver, evalmon = _solve(lfu_cache, maxsize=1000)
+  hit, miss, load, maxsize, size = solver.CacheInfo()
+  assert solver.bestEnergy == uncached
+  # cache hits are not evaluated, counted or monitored
+  assert hit > 0 and miss == calls[0] == solver.evaluations == len(evalmon)
+
+
+def test_solver_archive():
+
+  import shutil
+  archive = 'test_cache_archive'
+  solver, evalmon = _solve(lru_cache, maxsize=50, archive=dir_archive(archive))
+  hit, miss, load, maxsize, size = solver.CacheInfo()
+  assert miss == calls[0] and size <= 50
+  # evaluations are loaded from the archive when solving again
+  solver, evalmon = _solve(lru_cache, maxsize=50, archive=dir_archive(archive))
+  hit, miss, load, maxsize, size = solver.CacheInfo()
+  assert calls[0] == miss == 0 and load > 0
+  shutil.rmtree(archive)
+
+
+def test_simplex_cache():
+
+  calls[0] = 0
+  solver = NelderMeadSimplexSolver(3)
+  solver.SetInitialPoints([0.5, 0.5, 0.5])
+  solver.SetCache(lru_cache, tol=8)
+  solver.Solve(counted_rosen, VTR(1e-6))
+  hit, miss, load, maxsize, size = solver.CacheInfo()
+  assert miss == calls[0] == solver.evaluations
+
+
+if __name__ == '__main__':
+  test_wrap_cache()
+  test_solver_cache()
+  test_solver_archive()
+  test_simplex_cache()
+
+
+# EOF
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.solvers import LoadSolver
+from mystic.termination import VTR
+from mystic.strategy import Best1Exp
+from mystic.monitors import Monitor, ArrayMonitor, BestMonitor
+from mystic.tools import random_seed
+from mystic.models import rosen
+import numpy
+import time
+import os
+
+tmpfile = 'mysolver.chk'
+
+def _configure(evalmon=Monitor, ndim=3, npop=20):
+  solver = DifferentialEvolutionSolver2(ndim, npop)
+  solver.SetRandomInitialPoints([-2.]*ndim, [2.]*ndim)
+  solver.SetStrictRanges([-2.]*ndim, [2.]*ndim)
+  solver.SetEvaluationMonitor(evalmon())
+  solver.SetSaveFrequency(5, tmpfile, incremental=True)
+  return solver
+
+def _dumps(solver):
+  return len([i for i in solver._stepmon._info if i.startswith('DUMPED')])
+
+def _same(solver, _solver):
+  assert _solver.generations == solver.generations
+  assert _solver.evaluations == solver.evaluations
+  assert numpy.all(_solver.population == solver.population)
+  assert numpy.all(_solver.popEnergy == solver.popEnergy)
+  assert numpy.all(_solver.bestSolution == solver.bestSolution)
+  assert _solver.bestEnergy == solver.bestEnergy
+  for (mon, _mon) in ((solver._stepmon, _solver._stepmon), \
+                      (solver._evalmon, _solver._evalmon)):
+    assert len(_mon) == len(mon)
+    assert numpy.all(numpy.array(_mon.x) == numpy.array(mon.x))
+    assert numpy.all(numpy.array(_mon.y) == numpy.array(mon.y))
+
+
+def test_incremental():
+
+  for evalmon in (Monitor, ArrayMonitor, BestMonitor):
+    random_seed(123)
+    solver = _configure(evalmon)
+    solver.SetEvaluationLimits(generations=50)
+    solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+    _solver = LoadSolver(tmpfile)
+    _same(solver, _solver)
+    os.remove(tmpfile)
+
+  # the size of each record does not grow with the generations
+  for evalmon in (Monitor, ArrayMonitor):
+    random_seed(123)
+    solver = _configure(evalmon)
+    solver.SetGenealogy(0) # genealogy grows until the records are full
+    solver.SetEvaluationLimits(generations=5)
+    solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+    base = os.path.getsize(tmpfile)
+    solver.SaveSolver()
+    first = os.path.getsize(tmpfile) - base
+    solver.SetEvaluationLimits(generations=45)
+    solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+    size = os.path.getsize(tmpfile)
+    solver.SaveSolver()
+    assert os.path.getsize(tmpfile) - size <= first + 100
+    os.remove(tmpfile)
+
+
+def test_restart():
+
+  random_seed(123)
+  solver = _configure()
+  solver.SetEvaluationLimits(generations=20)
+  solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+  r = numpy.random.random()
+  # the random state is restored with the solver
+  _solver = LoadSolver(tmpfile)
+  assert numpy.random.random() == r
+  _same(solver, _solver)
+  # the restarted solver appends to the same file
+  _solver.SetEvaluationLimits(generations=40)
+  _solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+  assert _solver.generations == 40
+  solver = LoadSolver(tmpfile)
+  _same(_solver, solver)
+  # an incomplete record is ignored, and then overwritten
+  f = open(tmpfile, 'ab'); f.write('\x80\x02}q'); f.close()
+  solver = LoadSolver(tmpfile)
+  _same(_solver, solver)
+  solver.SaveSolver()
+  _same(_solver, LoadSolver(tmpfile))
+  os.remove(tmpfile)
+
+
+def test_restart_counts():
+
+  for evalmon in (Monitor, BestMonitor):
+    random_seed(123)
+    solver = _configure(evalmon)
+    solver.SetEvaluationLimits(generations=20)
+    solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+    evaluations = solver.evaluations
+    # the restarted solver continues to count and log its evaluations
+    _solver = LoadSolver(tmpfile)
+    assert _solver.evaluations == evaluations
+    _solver.SetEvaluationLimits(generations=30)
+    _solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+    assert _solver.evaluations > evaluations
+    if evalmon is Monitor:
+      assert len(_solver._evalmon) == _solver.evaluations
+    else:
+      assert min(_solver._evalmon.y) == _solver.bestEnergy
+    # the evaluation limit stops the restarted solver
+    _solver = LoadSolver(tmpfile)
+    evaluations = _solver.evaluations
+    _solver.SetEvaluationLimits(generations=1000, evaluations=evaluations+100)
+    _solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+    assert evaluations + 100 <= _solver.evaluations < evaluations + 200
+    assert _solver.generations < 1000
+    os.remove(tmpfile)
+
+
+def test_simplex():
+
+  solver = NelderMeadSimplexSolver(3)
+  solver.SetRandomInitialPoints([0.,0.,0.],[10.,10.,10.])
+  solver.SetSaveFrequency(10, tmpfile, incremental=True)
+  solver.Solve(rosen, VTR())
+  _solver = LoadSolver(tmpfile)
+  os.remove(tmpfile)
+  assert all(solver.bestSolution == _solver.bestSolution)
+  assert solver.bestEnergy == _solver.bestEnergy
+  assert len(solver._stepmon) == len(_solver._stepmon)
+
+
+def test_frequency():
+
+  # save after every 100 evaluations (i.e. 5 generations), and at the end
+  solver = DifferentialEvolutionSolver2(3, 20)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetSaveFrequency(filename=tmpfile, evaluations=100)
+  solver.SetEvaluationLimits(generations=20)
+  solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+  assert _dumps(solver) == 5
+  os.remove(tmpfile)
+
+  # save after every 0.1 seconds
+  def cost(x):
+    time.sleep(0.01)
+    return rosen(x)
+  solver = DifferentialEvolutionSolver2(3, 4)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetSaveFrequency(filename=tmpfile, seconds=0.1)
+  solver.SetEvaluationLimits(generations=20)
+  solver.Solve(cost, VTR(0.0), strategy=Best1Exp)
+  assert 1 < _dumps(solver) < 20
+  os.remove(tmpfile)
+
+
+def test_background():
+
+  for incremental in (False, True):
+    random_seed(123)
+    solver = _configure()
+    solver.SetSaveFrequency(1, tmpfile, incremental, background=True)
+    solver.SetEvaluationLimits(generations=20)
+    solver.Solve(rosen, VTR(0.0), strategy=Best1Exp)
+    # the final save is complete when Solve returns
+    _same(solver, LoadSolver(tmpfile))
+    os.remove(tmpfile)
+
+
+if __name__ == '__main__':
+  test_incremental()
+  test_restart()
+  test_restart_counts()
+  test_simplex()
+  test_frequency()
+  test_background()
+
+
+# EOF
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import ClusterSolver, BuckshotSolver
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.multiprocess import ProcessPool
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.tools import random_seed
+from mystic.models import rosen, shekel
+import numpy
+
+
+def _solve(ensemble, cost, bounds, map=None):
+  random_seed(123)
+  solver = ensemble
+  solver.SetNestedSolver(NelderMeadSimplexSolver(2))
+  solver.SetStrictRanges([bounds[0]]*2, [bounds[1]]*2)
+  if map is not None: solver.SetMapper(map)
+  solver.Solve(cost, COG())
+  return solver
+
+
+def test_critical_distance():
+
+  solver = ClusterSolver(2, 10)
+  r = [solver._critical_distance(16., n) for n in (1, 10, 100, 1000)]
+  assert r[0] == numpy.inf
+  assert r[1] > r[2] > r[3] > 0
+  # points near a lower point, or near a known minimum, are not selected
+  x = numpy.array([[0.,0.], [0.1,0.], [2.,2.], [-2.,2.], [2.,-2.]])
+  y = numpy.array([0., 1., 2., 3., 4.])
+  solver._gamma = 1.0
+  assert solver._select(x, y, set(), [], 0.5) == [0, 2, 3, 4]
+  assert solver._select(x, y, set([0]), [[2.,2.1]], 0.5) == [3, 4]
+
+
+def test_fewer_searches():
+
+  solver = _solve(ClusterSolver(2, 50), rosen, (-2., 2.))
+  assert solver.bestEnergy < 1e-6
+  # only a few local searches are started from the 200 sampled points
+  assert 0 < len(solver._results) < 10
+  _solver = _solve(BuckshotSolver(2, 50), rosen, (-2., 2.))
+  assert solver._total_evals < _solver._total_evals
+
+
+def test_mapped():
+
+  solver = _solve(ClusterSolver(2, 50), shekel, (-50., 50.))
+  pool = ProcessPool(2)
+  _solver = _solve(ClusterSolver(2, 50), shekel, (-50., 50.), pool.map)
+  pool.close(); pool.join()
+  # the same starting points are selected with a parallel mapper
+  assert len(solver._results) > 1
+  assert sorted(_solver.popEnergy) == sorted(solver.popEnergy)
+  assert _solver.bestEnergy == solver.bestEnergy
+
+
+if __name__ == '__main__':
+  test_critical_distance()
+  test_fewer_searches()
+  test_mapped()
+
+
+# EOF
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import LatticeSolver, BuckshotSolver
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.abstract_ensemble_solver import Result
+from mystic.multiprocess import ProcessPool
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.monitors import Monitor
+from mystic.tools import random_seed
+from mystic.models import rosen
+import numpy
+import dill
+
+
+def _configure(solver, monitors=False):
+  solver.SetNestedSolver(NelderMeadSimplexSolver(3))
+  solver.SetStrictRanges([-2.]*3, [2.]*3)
+  solver.SetNestedMonitors(monitors)
+  return solver
+
+
+def test_results():
+
+  random_seed(123)
+  best = []
+  solver = _configure(BuckshotSolver(3, 8))
+  solver.SetGenerationMonitor(Monitor())
+  solver.Solve(rosen, COG(), callback=best.append)
+  results = solver._results
+  assert len(results) == 8 and all(isinstance(r, Result) for r in results)
+  assert [r.id for r in results] == range(8)
+  assert solver._total_evals == sum(r.evaluations for r in results)
+  assert solver.bestEnergy == min(solver.popEnergy) == solver._bestResult.y
+  assert isinstance(solver.population, numpy.ndarray)
+  assert isinstance(solver.popEnergy, numpy.ndarray)
+  assert solver.population.shape == (8, 3) and solver.popEnergy.shape == (8,)
+  assert results[0].message and results[0].stepmon is None
+  # the best solution so far is logged as each result arrives
+  assert len(best) == len(solver._stepmon) == 8
+  y = solver.energy_history
+  assert all(y[i] >= y[i+1] for i in range(7))
+  # a result is much smaller than a solver
+  nested = NelderMeadSimplexSolver(3)
+  nested.SetInitialPoints([1.5, 0.5, -1.])
+  nested.Solve(rosen, COG())
+  assert 10*len(dill.dumps(Result(nested))) < len(dill.dumps(nested))
+
+
+def test_monitors():
+
+  random_seed(123)
+  solver = _configure(BuckshotSolver(3, 4), monitors=True)
+  solver.Solve(rosen, COG())
+  best = solver._bestResult
+  assert all(len(r.stepmon) == r.generations + 1 for r in solver._results)
+  # the monitors of the best nested solver are kept
+  assert solver._stepmon is best.stepmon
+  assert solver.energy_history[-1] == solver.bestEnergy
+
+
+def test_streamed():
+
+  solver = _configure(LatticeSolver(3, (2,2,2)))
+  solver.Solve(rosen, COG())
+  pool = ProcessPool(2, chunksize=1)
+  _solver = _configure(LatticeSolver(3, (2,2,2)))
+  _solver.SetMapper(pool.map)
+  _solver.Solve(rosen, COG())
+  pool.close(); pool.join()
+  # results arrive in any order, but are the same
+  assert [r.id for r in _solver._results] == range(8)
+  assert numpy.all(_solver.popEnergy == solver.popEnergy)
+  assert _solver.bestEnergy == solver.bestEnergy
+
+
+if __name__ == '__main__':
+  test_results()
+  test_monitors()
+  test_streamed()
+
+
+# EOF
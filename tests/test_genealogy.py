@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import DifferentialEvolutionSolver
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.tools import random_seed
+from mystic.models import rosen
+import os
+
+def _solve(solver, records=100, filename=None, ndim=3, npop=20):
+  random_seed(123)
+  solver = solver(ndim, npop)
+  solver.SetRandomInitialPoints([-2.]*ndim, [2.]*ndim)
+  solver.SetEvaluationLimits(generations=100)
+  if records != 100 or filename: solver.SetGenealogy(records, filename)
+  solver.Solve(rosen, COG(generations=200))
+  return solver
+
+
+def test_genealogy_bounded():
+
+  for solver in (DifferentialEvolutionSolver, DifferentialEvolutionSolver2):
+    full = _solve(solver, records=None)
+    last = _solve(solver, records=5)
+    none = _solve(solver, records=0)
+    assert full.bestEnergy == last.bestEnergy == none.bestEnergy
+    for i in range(full.nPop):
+      assert len(last.genealogy[i]) == min(5, len(full.genealogy[i]))
+      assert [x.tolist() for x in last.genealogy[i]] == \
+             [x.tolist() for x in full.genealogy[i]][-5:]
+      assert len(none.genealogy[i]) == 0
+    assert max(len(g) for g in full.genealogy) > 5
+    assert max(len(g) for g in _solve(solver).genealogy) <= 100
+
+
+def test_genealogy_file():
+
+  filename = 'genealogy_test.txt'
+  if os.path.exists(filename): os.remove(filename)
+  for solver in (DifferentialEvolutionSolver, DifferentialEvolutionSolver2):
+    full = _solve(solver, records=None)
+    disk = _solve(solver, records=0, filename=filename)
+    lines = open(filename).readlines()
+    os.remove(filename)
+    assert len(lines) == sum(len(g) for g in full.genealogy)
+    step, x = lines[-1].split('   ')
+    assert eval(step)[0] == disk.generations
+    assert eval(x) == full.genealogy[eval(step)[1]][-1].tolist()
+
+
+if __name__ == '__main__':
+  test_genealogy_bounded()
+  test_genealogy_file()
+
+
+# EOF
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.math.grid import gridpts, igridpts
+from mystic.solvers import LatticeSolver, NelderMeadSimplexSolver
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.models import rosen
+import numpy
+
+
+def test_gridpts():
+
+  assert gridpts([[1,2],[3,4]]) == [[1,3],[1,4],[2,3],[2,4]]
+  q = [[0.5,1.5,2.5],[1,2],[-1.,0.,1.,2.]]
+  g = gridpts(q)
+  assert len(g) == 3*2*4
+  assert g[0] == [0.5,1,-1.] and g[-1] == [2.5,2,2.]
+  # the values are kept as given
+  assert [type(i) for i in g[5]] == [float,int,float]
+  # the grid can be iterated over, one point or one chunk at a time
+  assert list(igridpts(q)) == g
+  chunks = list(igridpts(q, 5))
+  assert [len(i) for i in chunks] == [5,5,5,5,4]
+  assert sum(chunks, []) == g
+
+
+def test_lazy():
+
+  # a grid with 6**8 points is not built to get the first few points
+  q = [range(6)]*8
+  points = igridpts(q, 4)
+  assert points.next() == [[0]*8,[0]*7+[1],[0]*7+[2],[0]*7+[3]]
+  assert points.next()[0] == [0]*7+[4]
+
+
+def test_lattice():
+
+  results = []
+  for chunksize in (1024, 3):
+    solver = LatticeSolver(3, (2,2,2))
+    solver._chunksize = chunksize
+    solver.SetNestedSolver(NelderMeadSimplexSolver(3))
+    solver.SetStrictRanges([-2.]*3, [2.]*3)
+    solver.Solve(rosen, COG())
+    assert [r.id for r in solver._results] == range(8)
+    results.append(solver.popEnergy)
+  # the starting points do not depend on the size of the chunks
+  assert numpy.all(results[0] == results[1])
+
+
+if __name__ == '__main__':
+  test_gridpts()
+  test_lazy()
+  test_lattice()
+
+
+# EOF
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.monitors import LoggingMonitor
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.termination import CandidateRelativeTolerance as CRT
+from mystic.munge import logfile_reader
+from mystic.models import rosen
+import numpy
+import os
+
+def _solve(monitor):
+  solver = NelderMeadSimplexSolver(3)
+  solver.SetInitialPoints([0.5, 0.5, 0.5])
+  solver.SetEvaluationMonitor(monitor)
+  solver.Solve(rosen, CRT())
+  return solver
+
+
+def test_buffered_text():
+
+  filename = 'log_buffered.txt'
+  mon = LoggingMonitor(1, filename, new=True, bufsize=65536, flushtime=None)
+  for i in range(10):
+    mon([i, i+1], i*i, id=i%2)
+  # entries are buffered until flushed
+  assert len(open(filename).readlines()) == 2
+  mon.info('done')
+  mon.flush()
+  lines = open(filename).readlines()
+  assert len(lines) == 13 and lines[-1] == '# done\n'
+  assert lines[3] == "  (1, 1)     1.000000   [1, 2]\n"
+  step, param, cost = logfile_reader(filename)
+  assert step[-1] == (9, 1) and param[-1] == [9, 10] and cost[-1] == 81
+  mon.close()
+  os.remove(filename)
+
+
+def test_unbuffered():
+
+  filename = 'log_unbuffered.txt'
+  mon = LoggingMonitor(1, filename, new=True)
+  mon([1, 2], 3)
+  # each entry is written, and the log file is closed
+  assert len(open(filename).readlines()) == 3
+  assert mon._file.closed
+  mon.info('done')
+  assert open(filename).readlines()[-1] == '# done\n'
+  os.remove(filename)
+
+
+def test_exit_flush():
+
+  import subprocess
+  import sys
+  filename = 'log_exit.txt'
+  script = "from mystic.monitors import LoggingMonitor;" \
+           "mon = LoggingMonitor(1, %r, new=True, bufsize=1<<20, " \
+           "flushtime=None); mon([1, 2], 3)" % filename
+  subprocess.check_call([sys.executable, '-c', script])
+  # buffered entries are written when the interpreter exits
+  step, param, cost = logfile_reader(filename)
+  assert step == [(0,)] and param == [[1, 2]] and cost == [3]
+  os.remove(filename)
+
+
+def test_solve_flush():
+
+  filename = 'log_solve.txt'
+  mon = LoggingMonitor(1, filename, new=True, bufsize=1<<20, flushtime=None)
+  solver = _solve(mon)
+  step, param, cost = logfile_reader(filename)
+  assert len(step) == solver.evaluations
+  assert numpy.allclose(param, mon.x) and numpy.allclose(cost, mon.y, atol=1e-6)
+  mon.close()
+  os.remove(filename)
+
+
+def test_binary():
+
+  filename = 'log_binary.dat'
+  mon = LoggingMonitor(1, filename, new=True, binary=True)
+  solver = _solve(mon)
+  data = numpy.fromfile(filename, dtype='f8')
+  ny, nx = data[:2].astype(int)
+  assert (ny, nx) == (1, 3)
+  data = data[2:].reshape(-1, 2+ny+nx)
+  assert len(data) == solver.evaluations
+  assert numpy.all(data[:,0] == range(len(data)))
+  assert numpy.all(numpy.isnan(data[:,1]))
+  assert numpy.all(data[:,2] == mon.y)
+  assert numpy.all(data[:,3:] == mon.x)
+  # appending to an existing binary log does not repeat the header
+  mon.close()
+  mon = LoggingMonitor(1, filename, binary=True)
+  mon([1., 2., 3.], 4., id=5)
+  mon.close()
+  data = numpy.fromfile(filename, dtype='f8')[2:].reshape(-1, 6)
+  assert data[-1].tolist() == [0, 5, 4, 1, 2, 3]
+  os.remove(filename)
+
+
+def test_pickle():
+
+  import dill
+  filename = 'log_pickle.txt'
+  mon = LoggingMonitor(1, filename, new=True, flushtime=None)
+  mon([1, 2], 3)
+  _mon = dill.loads(dill.dumps(mon))
+  _mon([4, 5], 6)
+  _mon.close()
+  mon.close()
+  step, param, cost = logfile_reader(filename)
+  assert step == [(0,), (1,)] and cost == [3, 6]
+  os.remove(filename)
+
+
+def test_binary_reader():
+
+  from mystic.munge import binary_logfile_reader
+  text, binary = 'log_reader.txt', 'log_reader.dat'
+  mon = LoggingMonitor(1, text, new=True)
+  _mon = LoggingMonitor(1, binary, new=True, binary=True)
+  for i in range(20):
+    mon([i, -i, 0.5], 0.25*i, id=i%3)
+    _mon([i, -i, 0.5], 0.25*i, id=i%3)
+  mon.close(); _mon.close()
+  for (iter, id) in [(None, None), (10, None), ((5,15), None),
+                     (None, 1), ((2,12), [0,2])]:
+    step, param, cost = logfile_reader(text, iter, id)
+    _step, _param, _cost = logfile_reader(binary, iter, id)
+    assert step == _step and param == _param and cost == _cost
+    assert len(step)
+  step, param, cost = binary_logfile_reader(binary, (5,15), 1)
+  assert step.tolist() == [[7,1],[10,1],[13,1]]
+  assert param.shape == (3,3) and cost.tolist() == [1.75, 2.5, 3.25]
+  # a partially written row is ignored
+  f = open(binary, 'ab'); f.write(numpy.zeros(3).tostring()); f.close()
+  assert len(binary_logfile_reader(binary)[0]) == 20
+  os.remove(text); os.remove(binary)
+
+
+if __name__ == '__main__':
+  test_buffered_text()
+  test_unbuffered()
+  test_exit_flush()
+  test_solve_flush()
+  test_binary()
+  test_pickle()
+  test_binary_reader()
+
+
+# EOF
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.models import rosen, step, shekel, corana, griewangk
+from mystic.models import zimmermann, fosc3d, wavy1, wavy2
+from mystic.models.dejong import quartic
+from mystic.models import mogi, poly
+from mystic.models.br8 import cost as decaycost
+from mystic.forward_model import CostFactory
+from mystic.filters import PickComponent
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.termination import VTR
+from mystic.strategy import Best1Exp
+from mystic.monitors import Monitor
+from mystic.tools import random_seed
+from mystic.math import almostEqual
+import numpy
+
+
+def test_batch_functions():
+
+  random_seed(123)
+  for function, ndim in ((rosen, 3), (rosen, 1), (step, 5), (shekel, 2), \
+                         (corana, 4), (griewangk, 3), (griewangk, 12), \
+                         (zimmermann, 2), (fosc3d, 2)):
+    x = numpy.random.uniform(-10, 10, (50, ndim))
+    y = function(x)
+    assert y.shape == (50,)
+    assert almostEqual(y, [function(list(xi)) for xi in x], tol=1e-12)
+    # nested lists are also a batch
+    assert almostEqual(function(x.tolist()), y, tol=1e-12)
+  # elementwise functions return values of the same shape
+  for function in (wavy1, wavy2):
+    x = numpy.random.uniform(-10, 10, (50, 3))
+    assert almostEqual(function(x), [function(xi) for xi in x], tol=1e-12)
+  # quartic includes noise, in [0,1) for each coefficient
+  y = quartic(numpy.zeros((50, 4)))
+  assert y.shape == (50,) and (0 <= y).all() and (y < 4).all()
+  assert rosen([1.,1.,1.]) == 0.0
+  assert almostEqual(rosen([[1.,1.,1.],[0.,0.,0.]]), [0.,2.])
+
+
+def test_batch_solver():
+
+  random_seed(123)
+  evalmon = Monitor()
+  solver = DifferentialEvolutionSolver2(3, 30)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetEvaluationLimits(generations=1000)
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetObjective(rosen, batch=True)
+  solver.Solve(termination=VTR(1e-4), strategy=Best1Exp)
+  assert solver.bestEnergy <= 1e-4
+  assert solver.evaluations == len(evalmon) > 0
+
+
+def test_batch_costfactory():
+
+  random_seed(123)
+  # vectorized batch cost functions
+  x = numpy.linspace(-2, 2, 50)
+  for cost, p in ((decaycost, numpy.random.uniform(1, 100, (20, 5))), \
+                  (poly.CostFactory([1.,2.,3.], x), numpy.random.randn(20, 3))):
+    y = cost(p)
+    assert y.shape == (20,)
+    assert almostEqual(y, [cost(list(pi)) for pi in p], tol=1e-12)
+  # models with vector output, and the fallback for output filters
+  stations = numpy.random.uniform(-500, 500, (2, 30))
+  target = mogi.evaluate((10., 20., -100., 1e5), stations)
+  p = numpy.random.uniform(1, 30, (20, 4))
+  for filter, data in ((None, target), (PickComponent(2), target[2])):
+    F = CostFactory()
+    if filter is None:
+      F.addModel(mogi.ForwardFactory, 'mogi', 4, batch=mogi.batch)
+    else:
+      F.addModel(mogi.ForwardFactory, 'mogi', 4, outputFilter=filter)
+    cost = F.getCostFunction(stations, data)
+    assert almostEqual(cost(p), [cost(pi) for pi in p], tol=1e-12)
+    assert cost([10., 20., -100., 1e5]) == 0.0
+
+
+if __name__ == '__main__':
+  test_batch_functions()
+  test_batch_solver()
+  test_batch_costfactory()
+
+
+# EOF
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.multiprocess import ProcessPool
+from mystic.solvers import DifferentialEvolutionSolver2, LatticeSolver
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.termination import VTR, ChangeOverGeneration as COG
+from mystic.strategy import Best1Exp
+from mystic.tools import random_seed
+from mystic.models import rosen
+import os
+
+def getpid(x):
+  return os.getpid()
+
+def workers():
+  from multiprocessing import active_children
+  return set(p.pid for p in active_children())
+
+
+def test_pool_maps():
+
+  pool = ProcessPool(2, chunksize=1)
+  assert pool.nodes == 2
+  square = lambda x, y=0: x*x + y # not picklable, but is inherited
+  x = range(10)
+  assert pool.map(square, x) == [i*i for i in x]
+  assert list(pool.imap(square, x, x)) == [i*i + i for i in x]
+  assert sorted(pool.uimap(square, x)) == [i*i for i in x]
+  assert pool.amap(square, x).get() == [i*i for i in x]
+  assert pool.pipe(square, 3, y=1) == 10
+  assert pool.apipe(square, 2).get() == 4
+  # the bytes of the serialized arguments and results are counted
+  import dill
+  sent, received = pool.sent, pool.received
+  pool.map(square, x)
+  assert pool.sent - sent == sum(len(dill.dumps((i,), -1)) for i in x)
+  assert pool.received - received == sum(len(dill.dumps(i*i, -1)) for i in x)
+  pool.close(); pool.join()
+
+
+class Counter(object):
+  def __init__(self, offset):
+    self.offset = offset
+  def pid(self, x):
+    return os.getpid()
+  def add(self, x):
+    return x + self.offset
+
+
+def test_pool_persistent():
+
+  pool = ProcessPool(2)
+  # the workers are reused while the function is the same
+  pids = set()
+  for i in range(5):
+    pids.update(pool.map(getpid, range(8)))
+  assert len(pids) <= 2
+  assert pids <= workers()
+  pids = workers()
+  # the workers are kept for a new function
+  _getpid = lambda x: os.getpid()
+  assert set(pool.map(_getpid, range(8))) <= pids
+  assert set(pool.amap(_getpid, range(8)).get()) <= pids
+  assert pool.pipe(_getpid, 0) in pids
+  # a function that can not be serialized restarts the workers
+  g = (i for i in range(3))
+  _nodump = lambda x: (g, os.getpid())[1]
+  assert not set(pool.map(_nodump, range(8))) & pids
+  assert len(workers()) == 2 and not workers() & pids
+  pool.nodes = 3
+  assert pool.nodes == 3
+  pool.close(); pool.join()
+
+
+def test_pool_methods():
+
+  pool = ProcessPool(2)
+  c = Counter(10)
+  d = Counter(20)
+  pool.map(c.pid, range(8))
+  pids = workers()
+  assert len(pids) == 2
+  # bound methods, accessed anew each time, use the same workers
+  for i in range(5):
+    assert set(pool.map(c.pid, range(8))) <= pids
+    assert pool.map(c.add, range(4)) == [10, 11, 12, 13]
+    assert pool.map(d.add, range(4)) == [20, 21, 22, 23]
+  assert workers() == pids
+  pool.close(); pool.join()
+
+
+def test_pool_solvers():
+
+  pool = ProcessPool(2)
+  random_seed(123)
+  solver = DifferentialEvolutionSolver2(3, 20)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetEvaluationLimits(generations=1000)
+  solver.SetMapper(pool.map)
+  solver.Solve(rosen, VTR(1e-4), strategy=Best1Exp)
+  assert solver.bestEnergy <= 1e-4
+
+  solver = LatticeSolver(3, (2,2,2))
+  solver.SetNestedSolver(NelderMeadSimplexSolver(3))
+  solver.SetStrictRanges([-2.]*3, [2.]*3)
+  solver.SetMapper(pool.map)
+  solver.Solve(rosen, COG())
+  assert solver.bestEnergy <= 1e-3
+  pool.close(); pool.join()
+
+
+if __name__ == '__main__':
+  test_pool_maps()
+  test_pool_persistent()
+  test_pool_methods()
+  test_pool_solvers()
+
+
+# EOF
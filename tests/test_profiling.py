@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import DifferentialEvolutionSolver, NelderMeadSimplexSolver
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.strategy import Best1Bin
+from mystic.monitors import Monitor
+from mystic.tools import random_seed
+from mystic.models import rosen
+from mystic._profile import Stats
+import json
+import time
+import dill
+import os
+
+
+def test_disabled():
+
+  solver = NelderMeadSimplexSolver(3)
+  solver.SetInitialPoints([0.5, 0.5, 0.5])
+  solver.Solve(rosen, COG())
+  assert solver.stats is None
+  # the objective is not wrapped with timers
+  assert solver._timed('cost', rosen) is rosen
+
+
+def test_phases():
+
+  random_seed(123)
+  evalmon = Monitor()
+  solver = DifferentialEvolutionSolver(3, 20)
+  solver.enable_profiling()
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetStrictRanges([-2.]*3, [2.]*3)
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetPenalty(lambda x: 0.0)
+  solver.SetConstraints(lambda x: x)
+  solver.SetEvaluationLimits(generations=50)
+  solver.Solve(rosen, COG(), strategy=Best1Bin)
+  phases = solver.stats.phases
+  for phase in ('cost', 'monitors', 'bounds', 'penalty', 'constraints', \
+                'strategy', 'step', 'termination'):
+    assert phases[phase][0] > 0
+  assert phases['cost'][0] == solver.evaluations == len(evalmon)
+  assert phases['step'][0] == solver.generations + 1
+  # an entry for each iteration
+  generations = solver.stats.generations
+  assert len(generations) == solver.generations + 1
+  assert sum(g['cost'][0] for g in generations) == solver.evaluations
+  assert abs(sum(g['cost'][1] for g in generations) - phases['cost'][1]) < 1e-6
+  # exported as builtin types
+  stats = json.loads(solver.stats.json())
+  assert stats['phases']['cost']['calls'] == solver.evaluations
+  assert len(stats['generations']) == len(generations)
+  solver.disable_profiling()
+  assert solver.stats is None
+
+
+def test_exclusive():
+
+  def cost(x):
+    time.sleep(0.01)
+    return rosen(x)
+  def constraints(x):
+    time.sleep(0.005)
+    return x
+  solver = NelderMeadSimplexSolver(3)
+  solver.enable_profiling()
+  solver.SetInitialPoints([0.5, 0.5, 0.5])
+  solver.SetConstraints(constraints)
+  solver.SetEvaluationLimits(generations=5)
+  solver.Solve(cost)
+  phases = solver.stats.phases
+  calls, seconds = phases['cost']
+  assert 0.01 * calls <= seconds
+  calls, seconds = phases['constraints']
+  assert 0.005 * calls <= seconds
+  # the time in step excludes the time in cost and constraints
+  assert phases['step'][1] < phases['cost'][1]
+
+
+def test_map_solver():
+
+  random_seed(123)
+  solver = DifferentialEvolutionSolver2(3, 20)
+  solver.enable_profiling()
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetEvaluationLimits(generations=20)
+  solver.SetSaveFrequency(10, 'profiled_solver.pkl')
+  solver.Solve(rosen, COG(), strategy=Best1Bin)
+  os.remove('profiled_solver.pkl')
+  phases = solver.stats.phases
+  assert phases['cost'][0] == solver.evaluations
+  assert phases['strategy'][0] == 20 * solver.generations
+  assert phases['checkpoint'][0] == 4 # generations 0, 10, 20, and the last
+  # the stats are kept when the solver is pickled
+  solver = dill.loads(dill.dumps(solver))
+  assert isinstance(solver.stats, Stats)
+  assert solver.stats.phases == phases
+
+
+if __name__ == '__main__':
+  test_disabled()
+  test_phases()
+  test_exclusive()
+  test_map_solver()
+
+
+# EOF
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import BuckshotSolver, LatticeSolver
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.multiprocess import ProcessPool
+from mystic.threads import ThreadPool
+from mystic.termination import ChangeOverGeneration as COG
+from mystic.tools import random_seed
+from mystic.models import rosen
+
+
+def _solve(solver, racing=None, mapper=None):
+  solver.SetNestedSolver(NelderMeadSimplexSolver(3))
+  solver.SetStrictRanges([-2.]*3, [2.]*3)
+  solver.SetRacing(racing)
+  if mapper is not None: solver.SetMapper(mapper)
+  solver.Solve(rosen, COG())
+  return solver
+
+
+def test_racing():
+
+  random_seed(123)
+  full = _solve(BuckshotSolver(3, 16))
+  random_seed(123)
+  raced = _solve(BuckshotSolver(3, 16), racing=10)
+  # each starting point has a result, but fewer evaluations are used
+  assert len(raced._results) == 16
+  assert sorted(r.id for r in raced._results) == range(16)
+  assert raced._total_evals < full._total_evals
+  assert raced.bestEnergy <= 1e-3
+  # the winner runs until it terminates, while the losers are stopped
+  assert raced._bestResult.message
+  assert sum(not r.message for r in raced._results) > 0
+
+
+def test_fraction():
+
+  solver = BuckshotSolver(3, 4)
+  solver.SetRacing(5, fraction=0.25)
+  assert solver._race == (5, 0.25)
+  solver.SetRacing()
+  assert solver._race is None
+  try:
+    solver.SetRacing(5, fraction=1)
+    assert False
+  except ValueError:
+    pass
+
+
+def test_pools():
+
+  for pool in (ThreadPool(2), ProcessPool(2)):
+    solver = _solve(LatticeSolver(3, (2,2,2)), racing=10, mapper=pool.map)
+    assert len(solver._results) == 8
+    assert solver.bestEnergy <= 1e-3
+    assert solver._total_evals == sum(r.evaluations for r in solver._results)
+    pool.close(); pool.join()
+
+
+if __name__ == '__main__':
+  test_racing()
+  test_fraction()
+  test_pools()
+
+
+# EOF
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.termination import And, Or, When, VTR, EvaluationLimits
+from mystic.termination import CandidateRelativeTolerance as CRT
+from mystic.termination import PopulationSpread as PS
+from mystic.tools import random_seed
+from mystic.models import rosen
+from numpy import inf
+
+
+class CountingSolver(DifferentialEvolutionSolver2):
+  """solver that counts the reads of the population"""
+  reads = 0
+  def __get_population(self):
+    self.reads += 1
+    return self.__population
+  def __set_population(self, population):
+    self.__population = population
+  population = property(__get_population, __set_population)
+
+
+def _solver():
+  random_seed(123)
+  solver = CountingSolver(3, 20)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetEvaluationLimits(generations=10)
+  solver.Solve(rosen)
+  solver.SetEvaluationLimits(inf, inf) # check without the default limits
+  return solver
+
+
+def test_shared():
+
+  solver = _solver()
+  term = Or(CRT(inf, inf), And(PS(inf), CRT()), When(PS()))
+  # conditions called directly each read the population
+  solver.reads = 0
+  msg = term(solver, info=True)
+  assert msg and solver.reads > 1
+  # the population is read once per termination check
+  solver.reads = 0
+  assert solver.CheckTermination(info=True, termination=term) == msg
+  assert solver.reads == 1
+  assert solver.CheckTermination(termination=term) is True
+  assert solver.reads == 2
+  assert solver._termcache is None
+  # the results match, for each condition
+  for cond in (CRT(), CRT(inf, inf), PS(), PS(inf)):
+    assert solver.CheckTermination(info=True, termination=cond) == \
+           cond(solver, info=True)
+
+
+def test_short_circuit():
+
+  solver = _solver()
+  def fail(solver, info=False):
+    raise AssertionError, "condition should not be checked"
+  # a boolean check stops at the first decisive condition
+  assert Or(VTR(inf), fail)(solver) is True
+  assert And(VTR(-inf, inf), fail)(solver) is False
+  assert solver.CheckTermination(termination=Or(EvaluationLimits(5), fail))
+  assert not solver.CheckTermination(termination=And(VTR(-inf, inf), fail))
+
+
+if __name__ == '__main__':
+  test_shared()
+  test_short_circuit()
+
+
+# EOF
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.strategy import *
+from mystic.strategy import get_random_candidates_array
+from mystic.solvers import DifferentialEvolutionSolver2
+from mystic.tools import random_seed
+import numpy
+
+strategies = [Best1Exp, Best1Bin, Rand1Exp, RandToBest1Exp, Best2Exp,
+              Rand2Exp, Rand1Bin, RandToBest1Bin, Best2Bin, Rand2Bin]
+
+def _solver(ndim=8, npop=20):
+  solver = DifferentialEvolutionSolver2(ndim, npop)
+  solver.SetRandomInitialPoints([-5.]*ndim, [5.]*ndim)
+  solver.bestSolution = numpy.asfarray(solver.population[0])
+  return solver
+
+def _mutated(solver, strategy, vectorize, trials=200):
+  count = 0
+  pop = numpy.array(solver.population)
+  for i in range(trials):
+    if vectorize:
+      strategy(solver)
+    else:
+      [strategy(solver, j) for j in range(solver.nPop)]
+    count += (numpy.array(solver.trialSolution) != pop).sum()
+  return float(count) / (trials * solver.nPop)
+
+
+def test_random_candidates():
+
+  index = get_random_candidates_array(10, 5)
+  assert index.shape == (10, 5)
+  for i,row in enumerate(index):
+    assert i not in row
+    assert len(set(row)) == 5
+
+
+def test_vectorized_crossover():
+
+  random_seed(123)
+  for strategy in strategies:
+    solver = _solver()
+    pop = numpy.array(solver.population)
+    strategy(solver)
+    trial = numpy.array(solver.trialSolution)
+    assert trial.shape == pop.shape
+    # count the components that differ from the current population
+    mutated = (trial != pop).sum(axis=1)
+    assert numpy.all(mutated <= solver.nDim)
+    if strategy is Best1Bin: # binomial always mutates at least one component
+      assert numpy.all(mutated >= 1)
+
+
+def test_vectorized_statistics():
+
+  random_seed(123)
+  for strategy in strategies:
+    solver = _solver()
+    loop = _mutated(solver, strategy, False)
+    vect = _mutated(solver, strategy, True)
+    assert abs(loop - vect) < 0.1 * solver.nDim
+
+
+def test_vectorized_solve():
+
+  from mystic.models import rosen
+  from mystic.termination import VTR
+  random_seed(123)
+  solver = _solver(3, 40)
+  solver.SetEvaluationLimits(generations=2000)
+  solver.Solve(rosen, VTR(1e-4), strategy=Best1Exp, vectorize=True,
+               CrossProbability=0.9, ScalingFactor=0.8)
+  assert solver.bestEnergy <= 1e-4
+  assert numpy.allclose(solver.bestSolution, [1,1,1], atol=0.1)
+
+
+if __name__ == '__main__':
+  test_random_candidates()
+  test_vectorized_crossover()
+  test_vectorized_statistics()
+  test_vectorized_solve()
+
+
+# EOF
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.symbolic import generate_solvers, generate_conditions
+from mystic.symbolic import generate_constraint
+from mystic.math import almostEqual
+import dis
+
+constraints = """
+x2 = x0/2.
+x0 >= 0.
+x1 <= 7.0
+x1 = x0 + mean([x0,x2]) + a"""
+
+
+def _opcodes(function):
+  """get the names of the opcodes in the bytecode of the function"""
+  code = function.func_code.co_code
+  names, i = [], 0
+  while i < len(code):
+    op = ord(code[i])
+    names.append(dis.opname[op])
+    i += 3 if op >= dis.HAVE_ARGUMENT else 1
+  return names
+
+
+def test_solvers():
+
+  solvers = generate_solvers(constraints, nvars=3, locals={'a':1.0})
+  assert [s.__doc__ for s in solvers] == ['x[2] = x[0]/2.', \
+          'x[0] = max(0., x[0])', 'x[1] = min(7.0, x[1])', \
+          'x[1] = x[0] + mean([x[0],x[2]]) + a']
+  assert solvers[0]([1.,2.,3.]) == [1.,2.,.5]
+  assert solvers[1]([-1.,2.,3.]) == [0.,2.,3.]
+  assert solvers[2]([1.,8.,3.]) == [1.,7.,3.]
+  assert solvers[3]([1.,2.,3.]) == [1.,4.,3.]
+  # the equations are compiled into the functions
+  assert all(s.__name__ == 'solver' for s in solvers)
+  assert all('EXEC_STMT' not in _opcodes(s) for s in solvers)
+  constrain = generate_constraint(solvers)
+  assert constrain([1.,2.,3.]) == [1.,4.,.5]
+
+
+def test_conditions():
+
+  ineq, eq = generate_conditions(constraints, nvars=3, locals={'a':1.0})
+  assert almostEqual([f([1.,2.,3.]) for f in ineq], [-1.,-5.])
+  assert almostEqual([f([1.,2.,3.]) for f in eq], [2.5,-2.])
+  assert all('eval' not in f.func_code.co_names for f in ineq + eq)
+
+
+def test_invalid():
+
+  # an equation that can not be assigned to still fails when called
+  solver, = generate_solvers("exp(x1/x0) <= 7.0", nvars=2)
+  assert 'EXEC_STMT' in _opcodes(solver)
+  try:
+    solver([1.,2.])
+    assert False
+  except SyntaxError:
+    pass
+
+
+if __name__ == '__main__':
+  test_solvers()
+  test_conditions()
+  test_invalid()
+
+
+# EOF
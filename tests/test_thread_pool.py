@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+#
+# Author: Mike McKerns (mmckerns @caltech and @uqfoundation)
+# Copyright (c) 1997-2014 California Institute of Technology.
+# License: 3-clause BSD.  The full license text is available at:
+#  - http://trac.mystic.cacr.caltech.edu/project/mystic/browser/mystic/LICENSE
+
+from mystic.threads import ThreadPool
+from mystic.solvers import DifferentialEvolutionSolver2, BuckshotSolver
+from mystic.solvers import NelderMeadSimplexSolver
+from mystic.termination import VTR, ChangeOverGeneration as COG
+from mystic.strategy import Best1Exp
+from mystic.monitors import Monitor
+from mystic.tools import random_seed, wrap_function, _lock
+from mystic.models import rosen
+import time
+
+
+def _raise(x):
+  raise ValueError(x)
+
+def _count(cost):
+  try: cost([1.,2.,3.])
+  except ValueError: pass
+
+
+def test_pool_maps():
+
+  pool = ThreadPool(4)
+  assert pool.nodes == 4
+  square = lambda x, y=0: x*x + y
+  x = range(10)
+  assert pool.map(square, x) == [i*i for i in x]
+  assert list(pool.imap(square, x, x)) == [i*i + i for i in x]
+  assert sorted(pool.uimap(square, x)) == [i*i for i in x]
+  assert pool.amap(square, x).get() == [i*i for i in x]
+  assert pool.pipe(square, 3, y=1) == 10
+  assert pool.apipe(square, 2).get() == 4
+  # the workers run concurrently
+  start = time.time()
+  pool.map(time.sleep, [0.1]*4)
+  assert time.time() - start < 0.3
+  pool.close(); pool.join()
+
+
+def test_wrapped_counts():
+
+  pool = ThreadPool(8)
+  evalmon = Monitor()
+  ncalls, cost = wrap_function(rosen, (), evalmon, lock=_lock)
+  pool.map(cost, [[1.,2.,3.]]*1000)
+  assert ncalls[0] == len(evalmon) == 1000
+  # evaluations that raise are still counted
+  ncalls, cost = wrap_function(_raise, (), Monitor(), lock=_lock)
+  assert pool.map(_count, [cost]*10) == [None]*10
+  assert ncalls[0] == 10
+  ncalls, cost = wrap_function(_raise, (), Monitor())
+  assert _count(cost) is None and ncalls[0] == 1
+  pool.close(); pool.join()
+
+
+def test_pool_solvers():
+
+  pool = ThreadPool(4)
+  random_seed(123)
+  evalmon = Monitor()
+  solver = DifferentialEvolutionSolver2(3, 20)
+  solver.SetRandomInitialPoints([-2.]*3, [2.]*3)
+  solver.SetEvaluationLimits(generations=1000)
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetMapper(pool.map)
+  solver.Solve(rosen, VTR(1e-4), strategy=Best1Exp)
+  assert solver.bestEnergy <= 1e-4
+  # monitors and counters are kept with a thread pool
+  assert solver.evaluations == len(evalmon) > 0
+
+  evalmon = Monitor()
+  solver = BuckshotSolver(3, 8)
+  solver.SetNestedSolver(NelderMeadSimplexSolver(3))
+  solver.SetStrictRanges([-2.]*3, [2.]*3)
+  solver.SetEvaluationMonitor(evalmon)
+  solver.SetMapper(pool.map)
+  solver.Solve(rosen, COG())
+  assert solver.bestEnergy <= 1e-3
+  assert solver.evaluations > 0
+  pool.close(); pool.join()
+
+
+if __name__ == '__main__':
+  test_pool_maps()
+  test_wrapped_counts()
+  test_pool_solvers()
+
+
+# EOF